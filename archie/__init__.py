@@ -1,5 +1,5 @@
 from archie.__version__ import __version__
-from archie.triager import Triager
+from archie.triager import Triager, TriagerGroup
 
 assert __version__  # To suppress pyflakes' imported but unused warning
-__all__ = ["Triager"]
+__all__ = ["Triager", "TriagerGroup"]
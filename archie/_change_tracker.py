@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from archie.asana.models import Task
+from archie.dependencies import TaskChange
+
+
+class ChangeTracker:
+    """Remembers the last processed snapshot of each task to work out what changed.
+
+    Snapshots are only recorded once a task has been fully processed, so that a task
+    which failed part way through is processed in full the next time it's seen.
+
+    :param max_tasks: The maximum number of snapshots to remember. The least recently
+        seen tasks are forgotten first, and are treated as new when seen again.
+    """
+
+    def __init__(self, max_tasks: int = 100_000) -> None:
+        self.max_tasks = max_tasks
+        self._snapshots: "OrderedDict[str, Task]" = OrderedDict()
+        self._lock = Lock()
+
+    def change(self, task: Task) -> Optional[TaskChange]:
+        """Return what changed since the task was last recorded.
+
+        :param task: The latest snapshot of the task.
+        :return: The change, or ``None`` if the task hasn't been recorded before.
+        """
+        with self._lock:
+            previous = self._snapshots.get(task.gid)
+        if previous is None:
+            return None
+        return TaskChange.between(previous, task)
+
+    def record(self, task: Task) -> None:
+        """Record a snapshot of a task that has been fully processed.
+
+        :param task: The snapshot of the task that was processed.
+        """
+        with self._lock:
+            self._snapshots.pop(task.gid, None)
+            self._snapshots[task.gid] = task
+            while len(self._snapshots) > self.max_tasks:
+                self._snapshots.popitem(last=False)
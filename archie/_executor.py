@@ -1,6 +1,11 @@
 import logging
-from concurrent.futures import Future, ThreadPoolExecutor
-from typing import Any, Callable, Optional
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+from threading import Condition, Thread
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class LoggingThreadPoolExecutor(ThreadPoolExecutor):
@@ -31,3 +36,140 @@ class LoggingThreadPoolExecutor(ThreadPoolExecutor):
             future.result()
         except Exception:
             self._logger.error("Exception encountered in thread", exc_info=True)
+
+
+_WorkItem = Tuple[Future, Callable, Tuple[Any, ...], Dict[str, Any]]
+# Work is ordered by when it's due to run, then by when it was submitted
+_QueuedItem = Tuple[float, int, _WorkItem]
+
+
+class FairExecutor:
+    """A pool of worker threads shared fairly between several priority queues.
+
+    Work is submitted through the executors returned by :py:meth:`queue`. Workers take
+    from each queue in turn, so a queue with a large backlog can't starve the others.
+    Worker threads are started as needed, up to ``max_workers``, and live for as long as
+    the process does.
+
+    Within a queue, work with a lower priority number runs first. Work ages while it
+    waits, so that each priority level is worth ``aging`` seconds of waiting: work with
+    priority 2 runs before work with priority 0 that was submitted more than twice
+    ``aging`` seconds later. This keeps low priority work from being starved.
+
+    :param max_workers: The maximum number of worker threads.
+    :param logger: The logger to use to surface errors.
+    :param aging: How many seconds of waiting each priority level is worth.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        logger: Optional[logging.Logger] = None,
+        *,
+        aging: float = 60.0
+    ) -> None:
+        self.max_workers = max_workers
+        self.aging = aging
+        self._logger = logger or logging.getLogger(__name__)
+        # Queues with work waiting, in the order they'll next be served
+        self._queues: "OrderedDict[FairQueue, List[_QueuedItem]]" = OrderedDict()
+        self._sequence = count()
+        self._workers: List[Thread] = []
+        # The number of idle workers, and of work items waiting across all queues. An
+        # idle worker woken for an item may not have taken it yet, so the workers are
+        # only enough once there's an idle worker for every waiting item.
+        self._idle = 0
+        self._waiting = 0
+        self._condition = Condition()
+
+    def queue(self) -> "FairQueue":
+        """Return a new queue of work that shares the executor's workers."""
+        return FairQueue(self)
+
+    def _submit(self, queue: "FairQueue", priority: int, item: _WorkItem) -> None:
+        due = monotonic() + priority * self.aging
+        with self._condition:
+            items = self._queues.get(queue)
+            if items is None:
+                items = self._queues[queue] = []
+            heappush(items, (due, next(self._sequence), item))
+            self._waiting += 1
+            if self._waiting > self._idle and len(self._workers) < self.max_workers:
+                worker = Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._condition.notify()
+        item[0].add_done_callback(self._log_failure)
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._idle += 1
+                while not self._queues:
+                    self._condition.wait()
+                self._idle -= 1
+                queue, items = self._queues.popitem(last=False)
+                _, _, (future, fn, args, kwargs) = heappop(items)
+                self._waiting -= 1
+                # Move the queue to the back of the line, so the others are served first
+                if items:
+                    self._queues[queue] = items
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            queue._done()
+
+    def _log_failure(self, future: Future) -> None:
+        try:
+            future.result()
+        except Exception:
+            self._logger.error("Exception encountered in thread", exc_info=True)
+
+
+class FairQueue(Executor):
+    """An executor that submits work to one queue of a :py:class:`FairExecutor`.
+
+    Shutting down the queue waits for its own work to finish, without affecting other
+    queues sharing the same workers.
+    """
+
+    def __init__(self, executor: FairExecutor) -> None:
+        self._executor = executor
+        self._pending = 0
+        self._condition = Condition()
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable, *args: Any, **kwargs: Any
+    ) -> Future:
+        return self.submit_with_priority(0, fn, *args, **kwargs)
+
+    def submit_with_priority(
+        self, priority: int, fn: Callable, *args: Any, **kwargs: Any
+    ) -> Future:
+        """Submit work to run ahead of work with a higher priority number.
+
+        :param priority: The priority of the work, where lower numbers run first.
+        :param fn: The function to call.
+        :param args: Arguments to pass to the function.
+        :param kwargs: Keyword arguments to pass to the function.
+        :return: A future holding the function's result.
+        """
+        future: Future = Future()
+        with self._condition:
+            self._pending += 1
+        self._executor._submit(self, priority, (future, fn, args, kwargs))
+        return future
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        if not wait:
+            return
+        with self._condition:
+            while self._pending:
+                self._condition.wait()
+
+    def _done(self) -> None:
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
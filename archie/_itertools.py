@@ -1,4 +1,4 @@
-from typing import Callable, Iterable, Optional, TypeVar
+from typing import Callable, Dict, Iterable, Optional, TypeVar
 
 from archie._types import HasName
 
@@ -41,3 +41,19 @@ def find_by_name(iterable: Iterable[_S], name: str) -> Optional[_S]:
     >>> find_by_name(items, "Third")
     """
     return find(iterable, lambda item: item.name == name)
+
+
+def index_by_name(iterable: Iterable[_S]) -> Dict[str, _S]:
+    """Returns a mapping from names to items, keeping the first item with each name.
+
+    Looking names up in the mapping gives the same results as ``find_by_name``.
+
+    >>> from collections import namedtuple
+    >>> Named = namedtuple("Named", ["name", "value"])
+    >>> index_by_name([Named("First", 1), Named("Second", 2), Named("First", 3)])
+    {'First': Named(name='First', value=1), 'Second': Named(name='Second', value=2)}
+    """
+    index: Dict[str, _S] = {}
+    for item in iterable:
+        index.setdefault(item.name, item)
+    return index
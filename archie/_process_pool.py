@@ -0,0 +1,111 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import cpu_count
+from threading import Lock
+from typing import Callable, List, Optional, TypeVar
+
+import attr
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+_logger = logging.getLogger(__name__)
+
+
+@attr.s(auto_attribs=True)
+class _Pool:
+    """A process pool, and whether it has finished any work."""
+
+    executor: ProcessPoolExecutor
+    worked: bool = False
+
+
+_pool: Optional[_Pool] = None
+# Set once a pool breaks before finishing any work, after which work runs in-thread
+_disabled = False
+_lock = Lock()
+
+
+def process_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the process pool shared by CPU-bound predicates, creating it if needed.
+
+    The pool is only started once it's first needed, so triagers that don't use any
+    CPU-bound predicates never start extra processes. Workers are started from a fork
+    server where available, rather than forked from the triager, since forking a
+    process with running threads can copy locks held by other threads.
+
+    :return: The pool, or ``None`` if worker processes can't be started, in which case
+        the work should be done in the calling thread instead.
+    """
+    pool = _current_pool()
+    return pool.executor if pool is not None else None
+
+
+def _current_pool() -> Optional[_Pool]:
+    global _pool
+    with _lock:
+        if _pool is None and not _disabled:
+            methods = multiprocessing.get_all_start_methods()
+            method = "forkserver" if "forkserver" in methods else "spawn"
+            context = multiprocessing.get_context(method)
+            _pool = _Pool(ProcessPoolExecutor(mp_context=context))
+        return _pool
+
+
+def _run(submit: Callable[[ProcessPoolExecutor], _R], fallback: Callable[[], _R]) -> _R:
+    """Run work in the process pool, or in the calling thread if the pool is broken.
+
+    A pool breaks when a worker process dies. A broken pool is replaced with a new one
+    for later work, unless it broke before finishing any work at all. That usually means
+    workers can't start, such as when a script doesn't guard its entry point with
+    ``if __name__ == "__main__":`` so every worker runs the script again, and starting
+    more workers would only do the same.
+    """
+    global _pool, _disabled
+    pool = _current_pool()
+    if pool is None:
+        return fallback()
+    try:
+        result = submit(pool.executor)
+    except BrokenProcessPool:
+        with _lock:
+            # Another thread may have replaced the pool already
+            if _pool is pool:
+                _pool = None
+                if pool.worked:
+                    _logger.warning("Process pool broke, starting a new one")
+                else:
+                    _disabled = True
+                    _logger.error(
+                        "Worker processes for CPU-bound predicates failed to start, "
+                        "running them in threads instead. Scripts using CPU-bound "
+                        "predicates must guard their entry point with `if __name__ == "
+                        '"__main__":`',
+                    )
+        pool.executor.shutdown(wait=False)
+        return fallback()
+    pool.worked = True
+    return result
+
+
+def call_in_process(fn: Callable[[_T], _R], arg: _T) -> _R:
+    """Call a function in the process pool and wait for the result.
+
+    Only the function and its argument are sent to the worker process, so both must be
+    picklable.
+    """
+    return _run(lambda pool: pool.submit(fn, arg).result(), lambda: fn(arg))
+
+
+def any_in_process(fn: Callable[[_T], bool], args: List[_T]) -> bool:
+    """Return whether a function returns ``True`` for any of the arguments.
+
+    The arguments are sent to the worker processes in chunks, rather than one at a time.
+    """
+    chunksize = max(1, len(args) // (cpu_count() or 1))
+    return _run(
+        lambda pool: any(pool.map(fn, args, chunksize=chunksize)),
+        lambda: any(map(fn, args)),
+    )
@@ -0,0 +1,209 @@
+"""
+A task pass is a single round of processing of one task, such as the triager evaluating
+all of its rules against the task. Data that is expensive to fetch and that is shared by
+many predicates, such as the stories on the task, is cached on the pass so that it's
+fetched at most once no matter how many predicates need it.
+
+Each thread processes one task at a time, so the current pass is stored per thread.
+
+Writes made by the client during a pass are recorded on it, so that the rest of the pass
+reads its own writes without fetching the task again. The pass keeps a view of the task
+with each successful write applied, and adds any comments or followers it adds to the
+cached stories and followers. Some writes, such as setting the external data of the
+task, replace a whole field each time. These are deferred until the end of the pass,
+so that several writes to the same field are merged into one request. The view shows
+deferred writes straight away, even once other writes replace it with a fresh copy of
+the task. Deferred writes are made even if the pass fails, since the rest of the pass
+already treated them as made.
+
+A pass may also have a deadline, after which the remaining work for the task is
+cancelled. Requests made by the client during the pass are cut short once the deadline
+passes, and no further requests are made.
+"""
+
+from contextlib import contextmanager
+from threading import local
+from time import monotonic
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import attr
+
+from archie._text_matcher import TextMatcher
+from archie.asana._story_index import StoryIndex
+from archie.asana.models import Story, Task, User
+
+_local = local()
+
+
+class TaskBudgetExceeded(Exception):
+    """Raised when a pass over a task runs past its deadline."""
+
+
+@attr.s(auto_attribs=True)
+class TaskPass:
+    """Data cached while processing a single task.
+
+    :ivar str task_gid: The GID of the task being processed.
+    :ivar Optional[List[Story]] stories: The stories on the task, once fetched.
+    :ivar Optional[StoryIndex] story_index: The index of those stories, once built.
+    :ivar Optional[List[User]] followers: The followers of the task, once fetched.
+    :ivar Optional[TextMatcher] text_matcher: A matcher for the literal patterns that
+        predicates will search for in text during the pass, if any.
+    :ivar Dict[str, FrozenSet[str]] text_matches: The patterns found in each text
+        scanned with the matcher.
+    :ivar Optional[float] deadline: The :py:func:`time.monotonic` time by which the
+        pass must finish, if any.
+    :ivar Optional[Task] view: The task with the writes made during the pass applied,
+        once any have been made.
+    :ivar Dict[str, Tuple[Callable[[], None], Callable[[Task], Task]]]
+        pending_writes: The writes deferred until the end of the pass, by the field
+        they replace, along with how each changes the view of the task.
+    """
+
+    task_gid: str
+    stories: Optional[List[Story]] = None
+    story_index: Optional[StoryIndex] = None
+    followers: Optional[List[User]] = None
+    text_matcher: Optional[TextMatcher] = None
+    text_matches: Dict[str, FrozenSet[str]] = attr.ib(factory=dict)
+    deadline: Optional[float] = None
+    view: Optional[Task] = None
+    pending_writes: Dict[str, Tuple[Callable[[], None], Callable[[Task], Task]]] = (
+        attr.ib(factory=dict)
+    )
+
+
+@contextmanager
+def task_pass(
+    task: Task,
+    text_matcher: Optional[TextMatcher] = None,
+    budget: Optional[float] = None,
+) -> Iterator[TaskPass]:
+    """Start a pass over a task, for the duration of the context.
+
+    :param task: The task being processed.
+    :param text_matcher: An optional matcher for the literal patterns that predicates
+        will search for during the pass.
+    :param budget: If set, the number of seconds the pass may take.
+    :return: A context manager yielding the new pass.
+    """
+    previous = getattr(_local, "current", None)
+    deadline = monotonic() + budget if budget is not None else None
+    _local.current = current = TaskPass(
+        task.gid, text_matcher=text_matcher, deadline=deadline
+    )
+    try:
+        yield current
+    except Exception:
+        # Deferred writes are sent even after the deadline, so they aren't lost
+        current.deadline = None
+        flush_writes(task)
+        raise
+    else:
+        flush_writes(task)
+    finally:
+        _local.current = previous
+
+
+def current_pass(task: Task) -> Optional[TaskPass]:
+    """Return the pass over a task in progress in this thread, if any.
+
+    :param task: The task being processed.
+    :return: The current pass, if one is in progress for that task.
+    """
+    current: Optional[TaskPass] = getattr(_local, "current", None)
+    if current is not None and current.task_gid == task.gid:
+        return current
+    return None
+
+
+def current_view(task: Task) -> Task:
+    """Return a task as changed by the writes made during the pass over it, if any.
+
+    :param task: The task as it was provided to the pass.
+    :return: The task with any writes made during the pass applied.
+    """
+    current = current_pass(task)
+    if current is None or current.view is None:
+        return task
+    return current.view
+
+
+def update_view(task: Task, change: Callable[[Task], Task]) -> None:
+    """Apply a successful write to the view of a task, if a pass over it is in progress.
+
+    :param task: The task that was written to.
+    :param change: A function returning the task with the write applied, given the
+        current view of the task.
+    """
+    current = current_pass(task)
+    if current is not None:
+        current.view = change(current.view or task)
+
+
+def replace_view(task: Task, fresh: Task) -> None:
+    """Replace the view of a task with a fresh copy, if a pass over it is in progress.
+
+    Writes that are still deferred are applied on top of the fresh copy, since it
+    doesn't include them yet.
+
+    :param task: The task that was written to.
+    :param fresh: The fresh copy of the task, such as one returned by the API.
+    """
+    current = current_pass(task)
+    if current is not None:
+        for _, change in current.pending_writes.values():
+            fresh = change(fresh)
+        current.view = fresh
+
+
+def defer_write(
+    task: Task, field: str, write: Callable[[], None], change: Callable[[Task], Task]
+) -> bool:
+    """Defer a write replacing a field of a task until the end of the pass over it.
+
+    A later write to the same field replaces the deferred one, since it would overwrite
+    it anyway. The view of the task shows the write straight away.
+
+    :param task: The task being written to.
+    :param field: The field the write replaces.
+    :param write: A function making the write.
+    :param change: A function returning the task with the write applied.
+    :return: Whether the write was deferred. It wasn't if no pass over the task is in
+        progress, in which case it should be made straight away.
+    """
+    current = current_pass(task)
+    if current is None:
+        return False
+    current.pending_writes.pop(field, None)
+    current.pending_writes[field] = write, change
+    update_view(task, change)
+    return True
+
+
+def flush_writes(task: Task) -> None:
+    """Make the writes deferred during the pass over a task, in the order deferred.
+
+    :param task: The task being processed.
+    """
+    current = current_pass(task)
+    while current is not None and current.pending_writes:
+        field = next(iter(current.pending_writes))
+        write, _ = current.pending_writes.pop(field)
+        write()
+
+
+def remaining_budget() -> Optional[float]:
+    """Return the time left before the deadline of the pass in progress in this thread.
+
+    :return: The number of seconds until the deadline, or ``None`` if there's no pass in
+        progress or it has no deadline.
+    :raises TaskBudgetExceeded: If the deadline has passed.
+    """
+    current: Optional[TaskPass] = getattr(_local, "current", None)
+    if current is None or current.deadline is None:
+        return None
+    remaining = current.deadline - monotonic()
+    if remaining <= 0:
+        raise TaskBudgetExceeded(f"Ran out of time processing task {current.task_gid}")
+    return remaining
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class TTLCache(Generic[_K, _V]):
+    """A cache whose entries are loaded again once they're older than a time to live.
+
+    Entries are loaded outside of the lock, so threads missing the same entry at once
+    may each load it, with the last load winning.
+
+    :param ttl: How long an entry is used for before it's loaded again.
+    """
+
+    def __init__(self, ttl: timedelta) -> None:
+        self.ttl = ttl
+        self._entries: Dict[_K, Tuple[float, _V]] = {}
+        self._lock = Lock()
+
+    def get(self, key: _K, load: Callable[[], _V]) -> _V:
+        """Return the entry for a key, loading it if it's missing or too old.
+
+        :param key: The key of the entry.
+        :param load: A function loading the entry.
+        :return: The entry.
+        """
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and now - entry[0] < self.ttl.total_seconds():
+            return entry[1]
+        value = load()
+        with self._lock:
+            self._entries[key] = now, value
+        return value
+
+    def invalidate(self, key: _K) -> None:
+        """Drop the entry for a key, so it's loaded again the next time it's used.
+
+        :param key: The key of the entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from heapq import heappop, heappush
+from threading import Condition
+from time import monotonic
+from typing import Dict, List, Tuple
+
+
+class WakeupScheduler:
+    """A heap of times at which tasks should be revisited.
+
+    Each task has at most one pending wakeup. Scheduling an earlier wakeup for a task
+    replaces the later one, while scheduling a later wakeup is ignored until the earlier
+    one has fired.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, str]] = []
+        self._scheduled: Dict[str, datetime] = {}
+        self._condition = Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._scheduled)
+
+    def schedule(self, task_gid: str, at: datetime) -> None:
+        """Schedule a task to be revisited at a given time.
+
+        :param task_gid: The GID of the task to revisit.
+        :param at: When to revisit the task.
+        """
+        with self._condition:
+            scheduled = self._scheduled.get(task_gid)
+            if scheduled is not None and scheduled <= at:
+                return
+            self._scheduled[task_gid] = at
+            heappush(self._heap, (at, task_gid))
+            self._condition.notify_all()
+
+    def take_due(self, task_gid: str) -> bool:
+        """Remove a task's wakeup if it has already come due.
+
+        :param task_gid: The GID of the task.
+        :return: Whether the task had a wakeup that was due.
+        """
+        with self._condition:
+            scheduled = self._scheduled.get(task_gid)
+            if scheduled is None or scheduled > datetime.now(timezone.utc):
+                return False
+            # The heap entry is discarded lazily once it reaches the top
+            del self._scheduled[task_gid]
+            return True
+
+    def wait(self, timeout: float) -> List[str]:
+        """Wait for wakeups to come due.
+
+        :param timeout: The maximum number of seconds to wait.
+        :return: The GIDs of tasks whose wakeups are due, or an empty list if none came
+            due before the timeout.
+        """
+        end = monotonic() + timeout
+        with self._condition:
+            while True:
+                due = self._pop_due()
+                remaining = end - monotonic()
+                if due or remaining <= 0:
+                    return due
+                # Wake early if the next wakeup comes due, or an earlier one is added
+                self._condition.wait(min(remaining, self._seconds_until_due()))
+
+    def _seconds_until_due(self) -> float:
+        self._discard_replaced()
+        if not self._heap:
+            return float("inf")
+        return (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+
+    def _pop_due(self) -> List[str]:
+        due = []
+        while self._seconds_until_due() <= 0:
+            _, task_gid = heappop(self._heap)
+            del self._scheduled[task_gid]
+            due.append(task_gid)
+        return due
+
+    def _discard_replaced(self) -> None:
+        # Entries superseded by an earlier wakeup for the same task are left in the heap
+        # and skipped here, rather than being removed when they're replaced
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heappop(self._heap)
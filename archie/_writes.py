@@ -0,0 +1,18 @@
+import logging
+
+from archie.asana.models import Task
+from archie.metrics import metrics
+
+_logger = logging.getLogger(__name__)
+
+
+def skip_write(task: Task, write: str) -> None:
+    """Record that a write was skipped because the task is already up to date.
+
+    Skipped writes are counted in the ``actions.writes_skipped`` metric.
+
+    :param task: The task that wasn't written to.
+    :param write: The name of the action or workflow that skipped the write.
+    """
+    _logger.debug(f"{task} is already up to date for {write}, skipping")
+    metrics.increment("actions.writes_skipped", write=write)
@@ -4,6 +4,10 @@ indicate what should happen as a result of some task satisfying a predicate, suc
 that task being assigned, receiving a comment, or having a custom field set to some
 value. Actions to not have to be restricted to the provided task, and can change any
 state in Asana, such as creating a brand new task in a separate project.
+
+The built-in actions are idempotent: each compares the change it would make against the
+current state of the task, and skips the write if it wouldn't change anything. Skipped
+writes are counted in the ``actions.writes_skipped`` metric.
 """
 
 import logging
@@ -11,8 +15,12 @@ from abc import ABC, abstractmethod
 from typing import Optional
 
 from archie._itertools import find_by_name
+from archie._task_pass import current_pass
+from archie._writes import skip_write
+from archie.asana._followers import followers_by_task
 from archie.asana.client import Client
 from archie.asana.models import External, Task
+from archie.dependencies import EVERYTHING, NOTHING, Dependencies
 
 _logger = logging.getLogger(__name__)
 
@@ -28,6 +36,15 @@ class Action(ABC):
         :param client: A client to access the Asana API.
         """
 
+    def dependencies(self) -> Dependencies:
+        """Return the parts of a task this action reads to decide what to do.
+
+        Actions that don't override this are assumed to read the entire task.
+
+        :return: The dependencies of this action.
+        """
+        return EVERYTHING
+
     def __str__(self) -> str:
         return self.__class__.__name__
 
@@ -44,6 +61,9 @@ class AddComment(Action):
     def __call__(self, task: Task, client: Client) -> None:
         client.add_comment(task, self.text)
 
+    def dependencies(self) -> Dependencies:
+        return NOTHING
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.text})"
 
@@ -51,14 +71,35 @@ class AddComment(Action):
 class AddFollower(Action):
     """Add a follower to a task.
 
-    :param follower: The email of the user to add as a follower.
+    The followers of the task are fetched first, once per pass over the task, and the
+    follower is only added if they aren't following the task already, after which
+    they're added to the followers cached on the pass. The follower is looked up through
+    the client's cache of users, and is compared and added by GID.
+
+    :param follower: The email or GID of the user to add as a follower.
     """
 
     def __init__(self, follower: str) -> None:
         self.follower = follower
 
     def __call__(self, task: Task, client: Client) -> None:
-        client.add_follower(task, self.follower)
+        follower = client.user(self.follower)
+        followers = followers_by_task(task, client)
+        if any(user.gid == follower.gid for user in followers):
+            skip_write(task, self.__class__.__name__)
+            return
+        client.add_follower(task, follower.gid)
+        current = current_pass(task)
+        if current is not None:
+            # Keep whatever the client cached from the response, adding the follower in
+            # case the response left them out
+            current.followers = [
+                *(user for user in current.followers or [] if user.gid != follower.gid),
+                follower,
+            ]
+
+    def dependencies(self) -> Dependencies:
+        return NOTHING
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.follower})"
@@ -67,14 +108,25 @@ class AddFollower(Action):
 class AssignTo(Action):
     """Assign or unassign a task.
 
-    :param assignee: The email of the new assignee, or ``None`` to unassign.
+    The assignee is looked up through the client's cache of users, and is compared and
+    assigned by GID.
+
+    :param assignee: The email or GID of the new assignee, or ``None`` to unassign.
     """
 
     def __init__(self, assignee: Optional[str]) -> None:
         self.assignee = assignee
 
     def __call__(self, task: Task, client: Client) -> None:
-        client.set_assignee(task, self.assignee)
+        gid = client.user(self.assignee).gid if self.assignee is not None else None
+        current = task.assignee.gid if task.assignee is not None else None
+        if current == gid:
+            skip_write(task, self.__class__.__name__)
+            return
+        client.set_assignee(task, gid)
+
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"assignee"})
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.assignee})"
@@ -110,8 +162,13 @@ class SetEnumCustomField(Action):
                 f"{custom_field} has no enum option '{self.enum_value_name}'"
             )
             return None
-        if new_enum_value != custom_field.enum_value:
-            client.set_enum_custom_field(task, custom_field, new_enum_value)
+        if new_enum_value == custom_field.enum_value:
+            skip_write(task, self.__class__.__name__)
+            return
+        client.set_enum_custom_field(task, custom_field, new_enum_value)
+
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"custom_fields"})
 
     def __str__(self) -> str:
         return (
@@ -141,7 +198,13 @@ class SetExternal(Action):
         super().__init__()
 
     def __call__(self, task: Task, client: Client) -> None:
+        if task.external == self.external:
+            skip_write(task, self.__class__.__name__)
+            return
         client.set_external(task, self.external)
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"external"})
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.external})"
@@ -0,0 +1,80 @@
+from threading import Condition
+from time import monotonic
+from typing import Optional
+
+from archie.metrics import metrics
+
+
+class ConcurrencyLimiter:
+    """Limits how many requests are in flight at once, adapting the limit over time.
+
+    The limit follows an additive increase, multiplicative decrease scheme. Each healthy
+    response raises the limit by the reciprocal of the limit, so it grows by about one
+    for every full round of requests. A response that shows the API is overloaded, by
+    being rate limited, failing with a server error or taking much longer than usual,
+    cuts the limit by ``backoff``. The limit is cut at most once per typical request
+    latency, so a single burst of errors only cuts it once.
+
+    :param maximum: The highest the limit can rise to, and where it starts.
+    :param minimum: The lowest the limit can fall to.
+    :param backoff: The factor to multiply the limit by when the API is overloaded.
+    :param latency_factor: How many times the typical latency a response must take to
+        count as a latency spike.
+    :param smoothing: The weight of each new response in the typical latency.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        *,
+        minimum: int = 1,
+        backoff: float = 0.5,
+        latency_factor: float = 3.0,
+        smoothing: float = 0.1
+    ) -> None:
+        self.maximum = maximum
+        self.minimum = minimum
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.limit = float(maximum)
+        self._in_flight = 0
+        self._latency: Optional[float] = None
+        self._decreased_at = float("-inf")
+        self._condition = Condition()
+
+    def acquire(self) -> None:
+        """Wait until a request can be made within the limit."""
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        """Record that a request has finished.
+
+        :param latency: How many seconds the request took.
+        :param overloaded: Whether the response showed that the API is overloaded.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            typical = self._latency
+            spike = typical is not None and latency > typical * self.latency_factor
+            if overloaded or spike:
+                self._decrease(typical or 0.0)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._latency = (
+                latency
+                if typical is None
+                else typical + self.smoothing * (latency - typical)
+            )
+            self._condition.notify_all()
+            metrics.set("client.concurrency_limit", int(self.limit))
+
+    def _decrease(self, typical: float) -> None:
+        now = monotonic()
+        if now - self._decreased_at < typical:
+            return
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self._decreased_at = now
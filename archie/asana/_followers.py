@@ -0,0 +1,14 @@
+from typing import List
+
+from archie._task_pass import current_pass
+from archie.asana.client import Client
+from archie.asana.models import Task, User
+
+
+def followers_by_task(task: Task, client: Client) -> List[User]:
+    current = current_pass(task)
+    if current is None:
+        return client.followers_by_task(task)
+    if current.followers is None:
+        current.followers = client.followers_by_task(task)
+    return current.followers
@@ -0,0 +1,37 @@
+from threading import Lock
+
+
+class HedgeBudget:
+    """Limits hedged requests to a fraction of all requests.
+
+    Every request earns ``ratio`` of a token, and every hedged request spends a whole
+    token, so over time hedged requests add at most ``ratio`` extra requests. Tokens
+    build up to at most ``burst``, so a quiet period doesn't allow a flood of hedged
+    requests once the API slows down.
+
+    :param ratio: The most extra requests hedging may add, as a fraction of all
+        requests.
+    :param burst: The most hedged requests that may be made in a row.
+    """
+
+    def __init__(self, ratio: float, *, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = Lock()
+
+    def record_request(self) -> None:
+        """Record that a request was made, earning part of a token."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend a token on a hedged request, if one is available.
+
+        :return: Whether the hedged request may be made.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
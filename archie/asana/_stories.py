@@ -1,5 +1,7 @@
 from typing import Callable, List
 
+from archie._task_pass import current_pass
+from archie.asana._story_index import StoryIndex
 from archie.asana.client import Client
 from archie.asana.models import Story, Task
 
@@ -11,6 +13,24 @@ def subtype_filter(resource_subtype: str) -> Callable[[Story], bool]:
     return story_filter
 
 
+def stories_by_task(task: Task, client: Client) -> List[Story]:
+    current = current_pass(task)
+    if current is None:
+        return client.stories_by_task(task)
+    if current.stories is None:
+        current.stories = client.stories_by_task(task)
+    return current.stories
+
+
+def story_index(task: Task, client: Client) -> StoryIndex:
+    current = current_pass(task)
+    if current is None:
+        return StoryIndex(client.stories_by_task(task))
+    if current.story_index is None:
+        current.story_index = StoryIndex(stories_by_task(task, client))
+    return current.story_index
+
+
 def comments_by_task(task: Task, client: Client) -> List[Story]:
     comment_filter = subtype_filter("comment_added")
-    return list(filter(comment_filter, client.stories_by_task(task)))
+    return list(filter(comment_filter, stories_by_task(task, client)))
@@ -0,0 +1,50 @@
+from typing import Dict, Iterable, Optional
+
+from archie.asana.models import Story
+
+
+class StoryIndex:
+    """The latest stories on a task, indexed for constant-time lookups.
+
+    Building the index scans the stories once, so any number of predicates can then
+    check how long a task has been in some state without each scanning the stories
+    themselves.
+
+    :param stories: The stories on a task, oldest first.
+    """
+
+    def __init__(self, stories: Iterable[Story]) -> None:
+        self._by_author: Dict[str, Story] = {}
+        self._by_custom_field: Dict[str, Story] = {}
+        self._by_project: Dict[str, Story] = {}
+        self._by_section: Dict[str, Story] = {}
+        for story in stories:
+            self._add(story)
+
+    def _add(self, story: Story) -> None:
+        # Later stories overwrite earlier ones, so only the latest of each is kept
+        if story.created_by is not None:
+            self._by_author[story.created_by.gid] = story
+        subtype = story.resource_subtype
+        if subtype == "enum_custom_field_changed" and story.custom_field is not None:
+            self._by_custom_field[story.custom_field.gid] = story
+        elif subtype == "added_to_project" and story.project is not None:
+            self._by_project[story.project.gid] = story
+        elif subtype == "section_changed" and story.new_section is not None:
+            self._by_section[story.new_section.gid] = story
+
+    def latest_by_author(self, user_gid: str) -> Optional[Story]:
+        """Return the latest story created by a user."""
+        return self._by_author.get(user_gid)
+
+    def latest_custom_field_change(self, custom_field_gid: str) -> Optional[Story]:
+        """Return the latest story changing the value of an enum custom field."""
+        return self._by_custom_field.get(custom_field_gid)
+
+    def latest_project_addition(self, project_gid: str) -> Optional[Story]:
+        """Return the latest story adding the task to a project."""
+        return self._by_project.get(project_gid)
+
+    def latest_section_change(self, section_gid: str) -> Optional[Story]:
+        """Return the latest story moving the task into a section."""
+        return self._by_section.get(section_gid)
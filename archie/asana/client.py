@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 import logging
+import random
+from concurrent import futures
 from datetime import datetime
 from multiprocessing import cpu_count
-from typing import List, Optional, Type, TypeVar
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
+import attr
 from asana import Client as AsanaClient  # type: ignore
+from asana.error import InvalidRequestError  # type: ignore
+from requests import PreparedRequest, Response
 from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
 
 from archie.__version__ import __version__
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie._task_pass import (
+    TaskBudgetExceeded,
+    current_pass,
+    defer_write,
+    remaining_budget,
+    replace_view,
+    update_view,
+)
+from archie._ttl_cache import TTLCache
+from archie.asana._concurrency import ConcurrencyLimiter
+from archie.asana._hedging import HedgeBudget
 from archie.asana.models import (
     CustomField,
     EnumOption,
@@ -17,10 +36,14 @@ from archie.asana.models import (
     Section,
     Story,
     Task,
+    TaskMembership,
     User,
     Workspace,
     _Model,
 )
+from archie.asana.story_store import StoryLog, StoryStore
+from archie.metrics import metrics
+from archie.polling import RequestBudget
 
 _T = TypeVar("_T")
 _M = TypeVar("_M", bound=_Model)
@@ -34,24 +57,264 @@ _logger = logging.getLogger(__name__)
 # The new value matches the default number of threads in a ThreadPoolExecutor.
 _CONNECTION_POOL_SIZE = (cpu_count() or 1) * 5
 
+# The largest page size the API allows, used to minimize requests when syncing stories
+_STORY_PAGE_SIZE = 100
+
+_FOLLOWER_FIELDS = [f"followers.{field}" for field in User.fields()]
+
+
+# Methods that have the same effect however many times a request is repeated
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _in_section(section: Section) -> Callable[[Task], Task]:
+    def change(task: Task) -> Task:
+        memberships = [
+            membership
+            for membership in task.memberships
+            if membership.project.gid != section.project.gid
+        ]
+        membership = TaskMembership(section.project, section)
+        return attr.evolve(task, memberships=[*memberships, membership])
+
+    return change
+
+
+def _overloaded(response: Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _retry_after(response: Response) -> float:
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except ValueError:
+        return 0.0
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class RetryPolicy:
+    """How requests that fail with a transient error are retried.
+
+    Requests are retried after rate limiting, server errors, timeouts and connection
+    errors, as long as retrying can't apply a change twice. Idempotent requests, such as
+    reads and updates, are always retried. Other requests, such as adding a comment, are
+    only retried if the API can't have processed them, because they were rate limited or
+    never connected.
+
+    Each retry waits for a random delay of up to ``base_delay`` doubled for every
+    previous retry, capped at ``max_delay``, so that clients failing at the same time
+    don't all retry at the same time. Rate limited requests always wait at least as
+    long as the API asks.
+
+    :ivar int max_retries: The most times a single request is retried.
+    :ivar float base_delay: The longest delay before the first retry, in seconds.
+    :ivar float max_delay: The longest delay before any retry, in seconds.
+    """
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, retry: int) -> float:
+        """Return how long to wait before a retry.
+
+        :param retry: How many retries have already been made.
+        :return: The delay in seconds.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class _ThrottledAdapter(HTTPAdapter):
+    """An adapter that spaces out requests to stay within a budget, limits how many
+    are in flight at once, retries them after transient errors and hedges slow reads.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[RequestBudget],
+        limiter: Optional[ConcurrencyLimiter],
+        *,
+        timeout: Tuple[float, float] = (10.0, 60.0),
+        retry_policy: RetryPolicy = RetryPolicy(),
+        hedge_budget: Optional[HedgeBudget] = None,
+        **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self.budget = budget
+        self.limiter = limiter
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.hedge_budget = hedge_budget
+        # Each hedged request needs a thread for both the original and the duplicate
+        self._hedge_pool = futures.ThreadPoolExecutor(
+            max_workers=2 * _CONNECTION_POOL_SIZE, thread_name_prefix="hedge"
+        )
+
+    def send(self, request: PreparedRequest, *args: Any, **kwargs: Any) -> Response:
+        method = str(request.method)
+        retry = 0
+        while True:
+            try:
+                response = self._send_once(request, *args, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                if isinstance(e, Timeout):
+                    metrics.increment("client.timeouts", method=method)
+                rejected = isinstance(e, ConnectTimeout)
+                if not self._should_retry(method, retry, rejected):
+                    raise
+                reason = type(e).__name__
+                delay = self.retry_policy.delay(retry)
+            else:
+                rejected = response.status_code == 429
+                if not _overloaded(response) or not self._should_retry(
+                    method, retry, rejected
+                ):
+                    return response
+                reason = str(response.status_code)
+                delay = max(self.retry_policy.delay(retry), _retry_after(response))
+            remaining = remaining_budget()
+            if remaining is not None and delay >= remaining:
+                raise TaskBudgetExceeded(
+                    f"No time left to retry {method} {request.url}"
+                )
+            _logger.debug(f"Retrying {method} {request.url} in {delay:.1f}s ({reason})")
+            metrics.increment("client.retries", method=method, reason=reason)
+            sleep(delay)
+            retry += 1
+
+    def _should_retry(self, method: str, retry: int, rejected: bool) -> bool:
+        if retry >= self.retry_policy.max_retries:
+            return False
+        return rejected or method in _IDEMPOTENT_METHODS
+
+    def _send_once(
+        self, request: PreparedRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        connect, read = self.timeout
+        remaining = remaining_budget()
+        if remaining is not None:
+            connect, read = min(connect, remaining), min(read, remaining)
+        kwargs["timeout"] = (connect, read)
+        if self.hedge_budget is None:
+            return self._send_throttled(request, *args, **kwargs)
+        self.hedge_budget.record_request()
+        if request.method != "GET":
+            return self._send_throttled(request, *args, **kwargs)
+        return self._send_hedged(self.hedge_budget, request, *args, **kwargs)
+
+    def _send_hedged(
+        self,
+        hedge_budget: HedgeBudget,
+        request: PreparedRequest,
+        *args: Any,
+        **kwargs: Any
+    ) -> Response:
+        first = self._hedge_pool.submit(self._send_throttled, request, *args, **kwargs)
+        hedge_after = metrics.percentile("client.request_seconds", 95, method="GET")
+        try:
+            return first.result(timeout=hedge_after)
+        except futures.TimeoutError:
+            pass
+        if not hedge_budget.try_spend():
+            return first.result()
+        _logger.debug(f"Hedging {request.url} after {hedge_after:.2f}s")
+        metrics.increment("client.hedged_requests")
+        second = self._hedge_pool.submit(
+            self._send_throttled, request.copy(), *args, **kwargs
+        )
+        # Whichever request succeeds first is used, and the other is left to finish
+        outcomes = futures.as_completed([first, second])
+        winner = next(outcomes)
+        if winner.exception() is not None:
+            winner = next(outcomes)
+        if winner is second:
+            metrics.increment("client.hedged_wins")
+        return winner.result()
+
+    def _send_throttled(
+        self, request: PreparedRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        if self.budget is not None:
+            sleep(self.budget.reserve(0))
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = monotonic()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except Exception:
+            self._release(monotonic() - start, overloaded=True)
+            raise
+        latency = monotonic() - start
+        self._release(latency, overloaded=_overloaded(response))
+        metrics.observe("client.request_seconds", latency, method=str(request.method))
+        return response
+
+    def _release(self, latency: float, overloaded: bool) -> None:
+        if self.limiter is not None:
+            self.limiter.release(latency, overloaded=overloaded)
+
 
 class Client:
     """A client to access the Asana API.
 
     :param access_token: Credentials for the Asana API.
+    :param story_store: If set, stories are cached in this store and only stories
+        created since the last fetch are requested from the API.
+    :param requests_per_minute: If set, requests are delayed as needed to stay within
+        this rate, which is shared by every thread using the client.
+    :param adaptive_concurrency: Whether to adapt how many requests may be in flight at
+        once, up to the size of the connection pool. The limit is cut when the API
+        responds with rate limiting, server errors or unusually slow responses, and
+        grows back while responses are healthy. Threads wait for a free slot before
+        making requests.
+    :param timeout: The connect and read timeouts for each request, in seconds. While a
+        task with a time budget is being processed, they're also cut short to fit within
+        the time it has left.
+    :param retry_policy: How requests that fail with a transient error are retried.
+    :param hedge_ratio: If set, reads that are still waiting for a response after the
+        95th percentile of recent read latencies are sent again, and whichever response
+        arrives first is used. This cuts the latency of the slowest reads, at the cost
+        of extra requests, which are limited to this fraction of all requests, such as
+        ``0.05``. Hedged requests count towards ``requests_per_minute`` and the
+        concurrency limit like any other.
+    :param user_ttl: How long users looked up by :py:meth:`user` are cached for.
     """
 
-    def __init__(self, access_token: str) -> None:
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        story_store: Optional[StoryStore] = None,
+        requests_per_minute: Optional[float] = None,
+        adaptive_concurrency: bool = True,
+        timeout: Tuple[float, float] = (10.0, 60.0),
+        retry_policy: RetryPolicy = RetryPolicy(),
+        hedge_ratio: Optional[float] = None,
+        user_ttl: EasyTimedelta = "1h"
+    ) -> None:
+        self._story_store = story_store
+        self._users: TTLCache[str, User] = TTLCache(convert_timedelta(user_ttl))
         self._client = AsanaClient.access_token(access_token)
+        # Requests are retried by the adapter instead, which knows which are safe to
+        # retry
+        self._client.options.update(max_retries=0)
         self._client.headers.update(
             {
                 "Asana-Enable": "new_sections,string_ids",
                 "User-Agent": f"asana-archie/{__version__}",
             }
         )
-        self._client.session.mount(
-            "https://", HTTPAdapter(pool_maxsize=_CONNECTION_POOL_SIZE)
+        adapter = _ThrottledAdapter(
+            RequestBudget(requests_per_minute)
+            if requests_per_minute is not None
+            else None,
+            ConcurrencyLimiter(_CONNECTION_POOL_SIZE) if adaptive_concurrency else None,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            hedge_budget=HedgeBudget(hedge_ratio) if hedge_ratio is not None else None,
+            pool_maxsize=_CONNECTION_POOL_SIZE,
         )
+        self._client.session.mount("https://", adapter)
 
     def project_by_gid(self, gid: str) -> Project:
         """Return the project for the given ID."""
@@ -71,6 +334,22 @@ class Client:
         user = self._client.users.me(fields=User.fields())
         return User.from_dict(user)
 
+    def user(self, gid_or_email: str) -> User:
+        """Return a user given their GID or email.
+
+        Users are cached, so that rules acting on the same few users many times only
+        look each of them up once in a while.
+
+        :param gid_or_email: The GID or email of the user.
+        :return: The user.
+        """
+        return self._users.get(gid_or_email, lambda: self._fetch_user(gid_or_email))
+
+    def _fetch_user(self, gid_or_email: str) -> User:
+        _logger.debug(f"Fetching User({gid_or_email})")
+        obj = self._client.users.find_by_id(gid_or_email, fields=User.fields())
+        return User.from_dict(obj)
+
     def tasks_by_project(
         self,
         project: Project,
@@ -97,6 +376,33 @@ class Client:
         )
         return [Task.from_dict(task) for task in tasks]
 
+    def task_gids_by_project(
+        self, project: Project, *, only_incomplete: bool = True
+    ) -> List[str]:
+        """Given a project, return the GIDs of all tasks in that project, in order.
+
+        This is much cheaper than fetching the tasks themselves, and is useful when
+        their data is already available elsewhere.
+
+        :param project: The project to fetch task GIDs for.
+        :param only_incomplete: Whether to return only incomplete tasks.
+        """
+        _logger.debug(f"Fetching task GIDs in {project}")
+        params = {"completed_since": "now"} if only_incomplete else {}
+        tasks = self._client.tasks.find_by_project(
+            project.gid, params=params, fields=["gid"]
+        )
+        return [task["gid"] for task in tasks]
+
+    def followers_by_task(self, task: Task) -> List[User]:
+        """Given a task, return the users following it.
+
+        :param task: The task to fetch followers for.
+        """
+        _logger.debug(f"Fetching followers of {task}")
+        obj = self._client.tasks.find_by_id(task.gid, fields=_FOLLOWER_FIELDS)
+        return [User.from_dict(user) for user in obj["followers"]]
+
     def sections_by_project(self, project: Project) -> List[Section]:
         """Given a project, return all sections in that project.
 
@@ -140,8 +446,47 @@ class Client:
         :param task: The task to fetch stories for.
         """
         _logger.debug(f"Fetching stories on {task}")
-        stories = self._client.tasks.stories(task.gid, fields=Story.fields())
-        return [Story.from_dict(story) for story in stories]
+        if self._story_store is None:
+            stories = self._client.tasks.stories(task.gid, fields=Story.fields())
+            return [Story.from_dict(story) for story in stories]
+        log = self._story_store.get(task.gid) or StoryLog()
+        try:
+            log = self._sync_stories(task, log)
+        except InvalidRequestError:
+            # Offset tokens can expire, in which case we start again from scratch
+            _logger.info(f"Unable to resume stories on {task}, fetching all stories")
+            log = self._sync_stories(task, StoryLog())
+        self._story_store.put(task.gid, log)
+        return list(log.stories)
+
+    def _sync_stories(self, task: Task, log: StoryLog) -> StoryLog:
+        """Fetch stories created since the log was last synced and append them.
+
+        The page the log last stopped on is fetched again, since it may have been
+        partially filled at the time, and then any following pages are fetched.
+
+        :param task: The task to fetch stories for.
+        :param log: The previously cached stories on the task.
+        :return: A new log including all stories on the task.
+        """
+        stories = log.stories[: log.page_start]
+        offset, page_start = log.offset, log.page_start
+        while True:
+            options = {"offset": offset} if offset is not None else {}
+            page = self._client.tasks.stories(
+                task.gid,
+                fields=Story.fields(),
+                limit=_STORY_PAGE_SIZE,
+                iterator_type=None,
+                full_payload=True,
+                **options
+            )
+            page_start = len(stories)
+            stories.extend(Story.from_dict(story) for story in page["data"])
+            next_page = page.get("next_page")
+            if not next_page:
+                return StoryLog(stories, offset, page_start)
+            offset = next_page["offset"]
 
     def typeahead(
         self, workspace: Workspace, cls: Type[_M], name: str, count: int = 100
@@ -193,6 +538,7 @@ class Client:
         _logger.debug(f"Adding {task} to {section}")
         params = {"project": section.project.gid, "section": section.gid}
         self._client.tasks.add_project(task.gid, params)
+        update_view(task, _in_section(section))
 
     def add_comment(self, task: Task, comment: str) -> None:
         """Add a comment to a task.
@@ -201,7 +547,13 @@ class Client:
         :param comment: The plain text of the comment.
         """
         _logger.debug(f"Adding comment {comment} to {task}")
-        self._client.tasks.add_comment(task.gid, {"text": comment})
+        obj = self._client.tasks.add_comment(
+            task.gid, {"text": comment}, fields=Story.fields()
+        )
+        current = current_pass(task)
+        if current is not None and current.stories is not None:
+            current.stories = [*current.stories, Story.from_dict(obj)]
+            current.story_index = None
 
     def add_follower(self, task: Task, follower: str) -> None:
         """Add a follower to a task.
@@ -211,7 +563,12 @@ class Client:
             user's GID or their email.
         """
         _logger.debug(f"Adding follower {follower} to {task}")
-        self._client.tasks.add_followers(task.gid, {"followers": [follower]})
+        obj = self._client.tasks.add_followers(
+            task.gid, {"followers": [follower]}, fields=_FOLLOWER_FIELDS
+        )
+        current = current_pass(task)
+        if current is not None:
+            current.followers = [User.from_dict(user) for user in obj["followers"]]
 
     def set_assignee(self, task: Task, assignee: Optional[str]) -> None:
         """Change the assignee of the task.
@@ -221,7 +578,7 @@ class Client:
             user's GID or their email. If ``None``, this unassigns the task.
         """
         _logger.debug(f"Setting assignee on {task} to {assignee}")
-        self._client.tasks.update(task.gid, {"assignee": assignee})
+        self._update(task, {"assignee": assignee})
 
     def set_enum_custom_field(
         self, task: Task, custom_field: CustomField, enum_value: Optional[EnumOption]
@@ -236,10 +593,31 @@ class Client:
         enum_value_gid: Optional[
             str
         ] = enum_value.gid if enum_value is not None else None
-        self._client.tasks.update(
-            task.gid, {"custom_fields": {custom_field.gid: enum_value_gid}}
-        )
+        self._update(task, {"custom_fields": {custom_field.gid: enum_value_gid}})
 
     def set_external(self, task: Task, external: External) -> None:
+        """Replace the external data on a task.
+
+        During a pass over the task, the write is deferred until the end of the pass,
+        so that every change to the external data made during it is sent in a single
+        request. The rest of the pass sees the new external data straight away.
+
+        :param task: The task to change the external data on.
+        :param external: The new external data.
+        """
         _logger.debug(f"Setting external data to {external} on {task}")
-        self._client.tasks.update(task.gid, {"external": external.to_dict()})
+        params = {"external": external.to_dict()}
+        deferred = defer_write(
+            task,
+            "external",
+            lambda: self._update(task, params),
+            lambda view: attr.evolve(view, external=external),
+        )
+        if not deferred:
+            self._update(task, params)
+
+    def _update(self, task: Task, params: Dict[str, Any]) -> None:
+        # The updated task is returned, so the rest of the pass can see the change
+        obj = self._client.tasks.update(task.gid, params, fields=Task.fields())
+        if current_pass(task) is not None:
+            replace_view(task, Task.from_dict(obj))
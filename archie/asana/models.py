@@ -276,6 +276,8 @@ class Task(_Model):
     :ivar Optional[datetime] due_at: The due datetime of the task.
     :ivar Optional[date] start_on: The start date of the task.
     :ivar Optional[External] external: The external object associated with the task.
+    :ivar Optional[datetime] modified_at: The datetime when the task was last modified,
+        in UTC.
     """
 
     name = attr.ib(type=str)
@@ -291,6 +293,7 @@ class Task(_Model):
     due_at = attr.ib(type=Optional[datetime])
     start_on = attr.ib(type=Optional[date])
     external = attr.ib(type=Optional[External], default=None)
+    modified_at = attr.ib(type=Optional[datetime], default=None)
     resource_type: ClassVar[ResourceType] = ResourceType.TASK
 
 
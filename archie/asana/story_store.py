@@ -0,0 +1,105 @@
+"""
+Stories on a task are append-only, so once they've been fetched there's no need to fetch
+them again. A story store remembers the stories already seen on each task, along with a
+watermark of where the last fetch stopped, so that later fetches only need to page
+through stories created since then.
+
+Caution: comments that are edited or deleted after being cached are not updated in the
+store. Predicates that depend on the exact text of comments that may later be edited
+should not be used with a story store.
+"""
+
+from __future__ import annotations
+
+import shelve
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional
+
+import attr
+
+from archie.asana.models import Story
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class StoryLog:
+    """The cached stories of a single task.
+
+    :ivar List[Story] stories: All stories seen on the task, oldest first.
+    :ivar Optional[str] offset: The offset token of the page containing the newest
+        stories, or ``None`` if that is the first page.
+    :ivar int page_start: The index in ``stories`` where the page fetched with
+        ``offset`` begins.
+    """
+
+    stories: List[Story] = attr.ib(factory=list)
+    offset: Optional[str] = None
+    page_start: int = 0
+
+
+class StoryStore:
+    """A cache of stories keyed by task GID.
+
+    Stories are held in memory until more than ``max_stories`` are cached, at which
+    point the least recently used tasks are evicted. If a ``path`` is given, every log
+    is also written through to a file at that path, so evicted logs can be reloaded and
+    the store survives restarts.
+
+    :param max_stories: The maximum number of stories to hold in memory.
+    :param path: An optional file path used to persist the store on disk.
+    """
+
+    def __init__(self, max_stories: int = 100_000, path: Optional[str] = None) -> None:
+        self.max_stories = max_stories
+        self._logs: OrderedDict[str, StoryLog] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self._disk: Optional[shelve.Shelf[StoryLog]] = (
+            shelve.open(path) if path is not None else None
+        )
+
+    def get(self, task_gid: str) -> Optional[StoryLog]:
+        """Return the cached log for a task, if any.
+
+        :param task_gid: The GID of the task.
+        :return: The cached log of stories, or ``None`` if nothing is cached.
+        """
+        with self._lock:
+            log = self._logs.get(task_gid)
+            if log is not None:
+                self._logs.move_to_end(task_gid)
+                return log
+            if self._disk is not None and task_gid in self._disk:
+                log = self._disk[task_gid]
+                self._remember(task_gid, log)
+                return log
+            return None
+
+    def put(self, task_gid: str, log: StoryLog) -> None:
+        """Cache the log for a task, replacing any existing log.
+
+        :param task_gid: The GID of the task.
+        :param log: The updated log of stories.
+        """
+        with self._lock:
+            if self._disk is not None:
+                self._disk[task_gid] = log
+            self._remember(task_gid, log)
+
+    def close(self) -> None:
+        """Flush and close the on-disk backing, if any."""
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def _remember(self, task_gid: str, log: StoryLog) -> None:
+        previous = self._logs.pop(task_gid, None)
+        if previous is not None:
+            self._size -= len(previous.stories)
+        self._logs[task_gid] = log
+        self._size += len(log.stories)
+        # Always keep the most recent log, even if it alone exceeds the budget
+        while self._size > self.max_stories and len(self._logs) > 1:
+            _, evicted = self._logs.popitem(last=False)
+            self._size -= len(evicted.stories)
@@ -0,0 +1,112 @@
+"""
+A checkpoint store durably records how far an infinite source has got, so that a
+restarted triager resumes where it stopped. Sources only advance their checkpoint once
+every task they provided up to that point has finished being processed, so a crash never
+loses tasks, and at most the tasks that were in flight at the time are processed again.
+"""
+
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    key TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL
+);
+"""
+
+
+class CheckpointStore(ABC):
+    """An abstract base class for durable stores of source watermarks."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[datetime]:
+        """Return the saved watermark for a source, if any.
+
+        :param key: The key identifying the source, such as a project GID.
+        :return: The saved watermark, or ``None`` if nothing has been saved.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, key: str, watermark: datetime) -> None:
+        """Durably save the watermark for a source.
+
+        :param key: The key identifying the source, such as a project GID.
+        :param watermark: The time up to which every change has been processed.
+        """
+        pass
+
+
+class FileCheckpointStore(CheckpointStore):
+    """A checkpoint store that keeps watermarks in a JSON file.
+
+    The file is rewritten atomically on every save, so it's never left half-written.
+
+    :param path: The path of the JSON file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = Lock()
+
+    def load(self, key: str) -> Optional[datetime]:
+        with self._lock:
+            watermark = self._read().get(key)
+        return datetime.fromisoformat(watermark) if watermark is not None else None
+
+    def save(self, key: str, watermark: datetime) -> None:
+        with self._lock:
+            watermarks = self._read()
+            watermarks[key] = watermark.isoformat()
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "w") as f:
+                json.dump(watermarks, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.path)
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path) as f:
+                watermarks: Dict[str, str] = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return watermarks
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """A checkpoint store that keeps watermarks in a SQLite database.
+
+    :param path: The path of the SQLite database.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def load(self, key: str) -> Optional[datetime]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark FROM checkpoints WHERE key = ?", (key,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row is not None else None
+
+    def save(self, key: str, watermark: datetime) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, watermark) VALUES (?, ?)",
+                (key, watermark.isoformat()),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
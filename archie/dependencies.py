@@ -0,0 +1,140 @@
+"""
+Dependencies describe what parts of a task something reads, such as which task fields a
+predicate looks at or which kinds of stories it inspects. When the triager knows what
+changed about a task since it was last processed, it can use these dependencies to skip
+rules and workflows whose results can't have changed.
+
+Predicates, actions, and workflow stages all declare their dependencies. Anything that
+doesn't declare dependencies is assumed to depend on everything, and so is always
+re-evaluated.
+"""
+
+from __future__ import annotations
+
+from typing import AbstractSet, FrozenSet, Iterable, Optional
+
+import attr
+
+from archie.asana.models import Task
+
+#: A story subtype that stands for every story subtype.
+ANY_STORY = "*"
+
+# The stories that the API creates when each task field changes. If one of these fields
+# changes, we know which stories may have been added; other stories, like comments,
+# can't be attributed to a change in any field.
+_FIELD_STORY_SUBTYPES = {
+    "assignee": {"assigned", "unassigned"},
+    "completed": {"marked_complete", "marked_incomplete"},
+    "custom_fields": {
+        "enum_custom_field_changed",
+        "number_custom_field_changed",
+        "text_custom_field_changed",
+    },
+    "due_at": {"due_date_changed"},
+    "due_on": {"due_date_changed"},
+    "memberships": {"added_to_project", "removed_from_project", "section_changed"},
+    "name": {"name_changed"},
+    "notes": {"notes_changed"},
+    "start_on": {"start_date_changed"},
+}
+_ATTRIBUTABLE_STORY_SUBTYPES = frozenset(
+    subtype for subtypes in _FIELD_STORY_SUBTYPES.values() for subtype in subtypes
+)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class TaskChange:
+    """What changed about a task between two snapshots of it.
+
+    :ivar FrozenSet[str] fields: The names of the task fields that changed.
+    :ivar FrozenSet[str] story_subtypes: The subtypes of stories that may have been
+        added to the task as a result of those fields changing.
+    :ivar bool unattributed_stories: Whether stories may have been added that can't be
+        attributed to a field change, such as comments.
+    """
+
+    fields: FrozenSet[str]
+    story_subtypes: FrozenSet[str]
+    unattributed_stories: bool
+
+    @classmethod
+    def between(cls, old: Task, new: Task) -> TaskChange:
+        """Work out what changed between two snapshots of the same task.
+
+        :param old: The earlier snapshot of the task.
+        :param new: The later snapshot of the task.
+        :return: The change between the snapshots.
+        """
+        fields = frozenset(
+            a.name
+            for a in attr.fields(Task)
+            if a.name != "modified_at" and getattr(old, a.name) != getattr(new, a.name)
+        )
+        story_subtypes = frozenset(
+            subtype
+            for field in fields
+            for subtype in _FIELD_STORY_SUBTYPES.get(field, set())
+        )
+        # Without modification times, we can't rule out that stories were added
+        unattributed_stories = new.modified_at is None or old.modified_at != (
+            new.modified_at
+        )
+        return cls(fields, story_subtypes, unattributed_stories)
+
+
+def _frozen(values: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(values)
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Dependencies:
+    """The parts of a task that something reads.
+
+    :ivar FrozenSet[str] fields: The names of the task fields read.
+    :ivar FrozenSet[str] story_subtypes: The subtypes of stories read. Use
+        :py:data:`ANY_STORY` to depend on every story.
+    :ivar bool temporal: Whether the result can change with the passage of time alone,
+        without the task changing at all.
+    :ivar bool everything: Whether this depends on the entire task. This is the case for
+        anything that hasn't declared its dependencies.
+    """
+
+    fields: FrozenSet[str] = attr.ib(converter=_frozen, factory=frozenset)
+    story_subtypes: FrozenSet[str] = attr.ib(converter=_frozen, factory=frozenset)
+    temporal: bool = False
+    everything: bool = False
+
+    def __or__(self, other: Dependencies) -> Dependencies:
+        """Combine two sets of dependencies, e.g. for two predicates used together."""
+        return Dependencies(
+            fields=self.fields | other.fields,
+            story_subtypes=self.story_subtypes | other.story_subtypes,
+            temporal=self.temporal or other.temporal,
+            everything=self.everything or other.everything,
+        )
+
+    def affected_by(self, change: Optional[TaskChange]) -> bool:
+        """Check if a change to a task could affect anything with these dependencies.
+
+        :param change: The change to the task, or ``None`` if it's unknown, such as the
+            first time a task is seen.
+        :return: Whether anything depending on this must be re-evaluated.
+        """
+        if change is None or self.everything or self.temporal:
+            return True
+        if self.fields & change.fields or self.story_subtypes & change.story_subtypes:
+            return True
+        if ANY_STORY in self.story_subtypes and change.story_subtypes:
+            return True
+        unattributable: AbstractSet[str] = (
+            self.story_subtypes - _ATTRIBUTABLE_STORY_SUBTYPES
+        )
+        return bool(unattributable) and change.unattributed_stories
+
+
+#: The dependencies of something that doesn't read the task at all.
+NOTHING = Dependencies()
+
+#: The dependencies of something that may read anything.
+EVERYTHING = Dependencies(everything=True)
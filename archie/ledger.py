@@ -0,0 +1,88 @@
+"""
+An action ledger records which actions the triager has applied to which tasks, so that
+rules can limit how often their actions are repeated. For example, a rule adding a
+comment to overdue tasks would otherwise add another comment every time the task is
+polled. Since the ledger is local, checking it needs no requests to the API.
+
+Entries are keyed by the GID of the task, the name of the rule, and the action itself,
+as described by its string representation. A rule that starts producing a different
+action, such as a comment with different text, is therefore free to apply it straight
+away.
+"""
+
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applied_actions (
+    task_gid TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    action TEXT NOT NULL,
+    applied_at TEXT NOT NULL,
+    PRIMARY KEY (task_gid, rule, action)
+);
+"""
+
+
+class ActionLedger(ABC):
+    """An abstract base class for durable records of applied actions."""
+
+    @abstractmethod
+    def last_applied(self, task_gid: str, rule: str, action: str) -> Optional[datetime]:
+        """Return when an action was last applied to a task by a rule, if ever.
+
+        :param task_gid: The GID of the task.
+        :param rule: The name of the rule.
+        :param action: The string representation of the action.
+        :return: When the action was last applied, or ``None`` if it never was.
+        """
+        pass
+
+    @abstractmethod
+    def record(self, task_gid: str, rule: str, action: str, at: datetime) -> None:
+        """Durably record that an action was applied to a task by a rule.
+
+        :param task_gid: The GID of the task.
+        :param rule: The name of the rule.
+        :param action: The string representation of the action.
+        :param at: When the action was applied.
+        """
+        pass
+
+
+class SQLiteActionLedger(ActionLedger):
+    """An action ledger that keeps applied actions in a SQLite database.
+
+    :param path: The path of the SQLite database.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def last_applied(self, task_gid: str, rule: str, action: str) -> Optional[datetime]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT applied_at FROM applied_actions "
+                "WHERE task_gid = ? AND rule = ? AND action = ?",
+                (task_gid, rule, action),
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row is not None else None
+
+    def record(self, task_gid: str, rule: str, action: str, at: datetime) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO applied_actions "
+                "(task_gid, rule, action, applied_at) VALUES (?, ?, ?, ?)",
+                (task_gid, rule, action, at.isoformat()),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,152 @@
+"""
+Metrics expose what the triager is doing internally, such as how many tasks a source
+skipped or how long API requests take. All components record into the shared
+:py:data:`metrics` registry, which can be read at any time, for example to export to a
+monitoring system or to log periodically.
+
+Metrics are identified by a name and optional labels, which are folded into a single
+key such as ``source.tasks{project=123}``. There are three kinds of metric:
+
+* Counters only ever increase, such as the number of tasks processed.
+* Gauges hold the latest value of something, such as the current polling interval.
+* Observations record a distribution of values, such as request latencies. The count
+  and sum of all values are kept, along with a window of recent values used to compute
+  percentiles.
+"""
+
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, Optional, Tuple
+
+import attr
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_key(key: _Key, suffix: str = "") -> str:
+    name, labels = key
+    if not labels:
+        return name + suffix
+    label_str = ",".join(f"{k}={v}" for k, v in labels)
+    return f"{name}{suffix}{{{label_str}}}"
+
+
+@attr.s(auto_attribs=True)
+class _Observations:
+    count: int = 0
+    total: float = 0.0
+    recent: Deque[float] = attr.ib(factory=deque)
+
+
+class Metrics:
+    """A thread-safe registry of counters, gauges and observations.
+
+    :param window: How many recent values to keep for each observation when computing
+        percentiles.
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        self.window = window
+        self._counters: Dict[_Key, float] = {}
+        self._gauges: Dict[_Key, float] = {}
+        self._observations: Dict[_Key, _Observations] = {}
+        self._lock = Lock()
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a counter.
+
+        :param name: The name of the counter.
+        :param amount: How much to increase the counter by.
+        :param labels: Labels distinguishing this counter from others of the same name.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set the value of a gauge.
+
+        :param name: The name of the gauge.
+        :param value: The new value of the gauge.
+        :param labels: Labels distinguishing this gauge from others of the same name.
+        """
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in a distribution.
+
+        :param name: The name of the observation.
+        :param value: The value observed.
+        :param labels: Labels distinguishing this observation from others of the same
+            name.
+        """
+        key = _key(name, labels)
+        with self._lock:
+            observations = self._observations.get(key)
+            if observations is None:
+                observations = self._observations[key] = _Observations(
+                    recent=deque(maxlen=self.window)
+                )
+            observations.count += 1
+            observations.total += value
+            observations.recent.append(value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return the value of a counter, which is zero if it was never increased."""
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def gauge(self, name: str, **labels: str) -> Optional[float]:
+        """Return the value of a gauge, or ``None`` if it was never set."""
+        with self._lock:
+            return self._gauges.get(_key(name, labels))
+
+    def percentile(self, name: str, q: float, **labels: str) -> Optional[float]:
+        """Return a percentile of the recent values of an observation.
+
+        :param name: The name of the observation.
+        :param q: The percentile to compute, between 0 and 100.
+        :param labels: Labels distinguishing the observation.
+        :return: The percentile, or ``None`` if nothing has been observed.
+        """
+        with self._lock:
+            observations = self._observations.get(_key(name, labels))
+            if observations is None:
+                return None
+            values = sorted(observations.recent)
+        index = min(len(values) - 1, int(len(values) * q / 100))
+        return values[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current value of every metric.
+
+        Observations are reported as two values, with ``_count`` and ``_sum`` appended
+        to their names.
+
+        :return: A mapping from metric key to value.
+        """
+        with self._lock:
+            snapshot = {
+                _format_key(key): value
+                for key, value in [*self._counters.items(), *self._gauges.items()]
+            }
+            for key, observations in self._observations.items():
+                snapshot[_format_key(key, "_count")] = observations.count
+                snapshot[_format_key(key, "_sum")] = observations.total
+        return snapshot
+
+    def reset(self) -> None:
+        """Forget all recorded metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+#: The registry that all components record metrics into.
+metrics = Metrics()
@@ -0,0 +1,175 @@
+"""
+A mirror is a local copy of the incomplete tasks and sections in a project, stored in
+SQLite. Once a mirror has been filled, later syncs only request tasks that have changed
+since the previous sync, which is far cheaper than downloading every task in a large
+project on each poll. Because the mirror is stored on disk, it also survives restarts,
+so a restarted triager can resume with only an incremental sync.
+
+A full sync is still performed periodically, since tasks that are removed from the
+project or deleted are never reported as modified and would otherwise linger.
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie.asana.client import Client
+from archie.asana.models import Project, Section, Task
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    project_gid TEXT NOT NULL,
+    gid TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (project_gid, gid)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    project_gid TEXT NOT NULL,
+    gid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (project_gid, gid)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    project_gid TEXT PRIMARY KEY,
+    synced_at TEXT NOT NULL,
+    full_synced_at TEXT NOT NULL
+);
+"""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TaskMirror:
+    """A local SQLite mirror of incomplete tasks and sections in projects.
+
+    :param path: The path of the SQLite database. Defaults to an in-memory database,
+        which is not kept between restarts.
+    :param full_sync_after: How long to rely on incremental syncs before fetching every
+        task in the project again.
+    """
+
+    def __init__(
+        self, path: str = ":memory:", *, full_sync_after: EasyTimedelta = "1d"
+    ) -> None:
+        self.full_sync_after = convert_timedelta(full_sync_after)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def sync(self, client: Client, project: Project) -> List[Task]:
+        """Bring the mirror of a project up to date.
+
+        :param client: A client used to access the Asana API.
+        :param project: The project to sync.
+        :return: The tasks that were fetched from the API, i.e. those that changed.
+        """
+        now = _utcnow()
+        last_sync = self._last_sync(project)
+        if last_sync is None or now - last_sync[1] > self.full_sync_after:
+            tasks = client.tasks_by_project(project)
+            self._replace_tasks(project, tasks, now)
+        else:
+            tasks = client.tasks_by_project(
+                project, only_incomplete=False, modified_since=last_sync[0]
+            )
+            self._update_tasks(project, tasks, now)
+        self._replace_sections(project, client.sections_by_project(project))
+        return tasks
+
+    def tasks(self, project: Project, order: Optional[List[str]] = None) -> List[Task]:
+        """Return the mirrored incomplete tasks in a project.
+
+        :param project: The project to return tasks from.
+        :param order: If set, only return tasks with these GIDs, in this order.
+        :return: The mirrored tasks.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT gid, data FROM tasks WHERE project_gid = ?", (project.gid,)
+            ).fetchall()
+        tasks: Dict[str, Task] = {
+            gid: Task.from_dict(json.loads(data)) for gid, data in rows
+        }
+        if order is None:
+            return list(tasks.values())
+        return [tasks[gid] for gid in order if gid in tasks]
+
+    def sections(self, project: Project) -> List[Section]:
+        """Return the mirrored sections in a project, in order.
+
+        :param project: The project to return sections from.
+        :return: The mirrored sections.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM sections WHERE project_gid = ? ORDER BY position",
+                (project.gid,),
+            ).fetchall()
+        return [Section.from_dict(json.loads(data)) for (data,) in rows]
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._connection.close()
+
+    def _last_sync(self, project: Project) -> Optional[Tuple[datetime, datetime]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT synced_at, full_synced_at FROM syncs WHERE project_gid = ?",
+                (project.gid,),
+            ).fetchone()
+        if row is None:
+            return None
+        synced_at, full_synced_at = row
+        return datetime.fromisoformat(synced_at), datetime.fromisoformat(full_synced_at)
+
+    def _replace_tasks(
+        self, project: Project, tasks: List[Task], now: datetime
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM tasks WHERE project_gid = ?", (project.gid,)
+            )
+            self._insert_tasks(project, tasks)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                (project.gid, now.isoformat(), now.isoformat()),
+            )
+
+    def _update_tasks(self, project: Project, tasks: List[Task], now: datetime) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM tasks WHERE project_gid = ? AND gid = ?",
+                [(project.gid, task.gid) for task in tasks if task.completed],
+            )
+            self._insert_tasks(project, [task for task in tasks if not task.completed])
+            self._connection.execute(
+                "UPDATE syncs SET synced_at = ? WHERE project_gid = ?",
+                (now.isoformat(), project.gid),
+            )
+
+    def _insert_tasks(self, project: Project, tasks: List[Task]) -> None:
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?)",
+            [(project.gid, task.gid, json.dumps(task.to_dict())) for task in tasks],
+        )
+
+    def _replace_sections(self, project: Project, sections: List[Section]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM sections WHERE project_gid = ?", (project.gid,)
+            )
+            self._connection.executemany(
+                "INSERT INTO sections VALUES (?, ?, ?, ?)",
+                [
+                    (project.gid, section.gid, i, json.dumps(section.to_dict()))
+                    for i, section in enumerate(sections)
+                ],
+            )
@@ -0,0 +1,98 @@
+"""
+Polling sources wait between polls for changes. A fixed wait wastes requests on quiet
+projects and reacts slowly on busy ones, so sources can instead be given an
+:py:class:`AdaptiveInterval` that polls more often while tasks are changing and backs
+off while they aren't. Sources polling many projects with the same credentials can also
+share a :py:class:`RequestBudget`, which spaces their polls out so that together they
+stay within a fixed rate.
+"""
+
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie.metrics import metrics
+
+
+class RequestBudget:
+    """A limit on how often polls may be made, shared between sources.
+
+    The same budget can also limit how often a client makes requests to the API.
+
+    :param polls_per_minute: The maximum rate of polls across all sources sharing the
+        budget.
+    """
+
+    def __init__(self, polls_per_minute: float) -> None:
+        self.polls_per_minute = polls_per_minute
+        self._next_free = monotonic()
+        self._lock = Lock()
+
+    def reserve(self, after: float) -> float:
+        """Reserve a poll, no sooner than a given number of seconds from now.
+
+        :param after: The earliest the poll would like to be made, in seconds from now.
+        :return: How many seconds from now the poll may be made, which is never less
+            than ``after``.
+        """
+        now = monotonic()
+        with self._lock:
+            at = max(now + after, self._next_free)
+            self._next_free = at + 60 / self.polls_per_minute
+        return at - now
+
+
+class AdaptiveInterval:
+    """An interval between polls that adapts to how many changes recent polls found.
+
+    After a poll that found at least ``busy_threshold`` changes, the interval shrinks by
+    ``factor``. After a poll that found no changes, it grows by ``factor``. Otherwise,
+    it stays the same. The interval always stays between ``minimum`` and ``maximum``.
+
+    :param minimum: The shortest interval between polls.
+    :param maximum: The longest interval between polls.
+    :param initial: The interval before the first poll. Defaults to ``minimum``.
+    :param busy_threshold: How many changes a poll must find to shrink the interval.
+    :param factor: How much the interval grows or shrinks after each poll.
+    :param budget: An optional budget shared with other sources, which may delay polls
+        beyond the interval.
+    """
+
+    def __init__(
+        self,
+        minimum: EasyTimedelta,
+        maximum: EasyTimedelta,
+        *,
+        initial: Optional[EasyTimedelta] = None,
+        busy_threshold: int = 10,
+        factor: float = 2.0,
+        budget: Optional[RequestBudget] = None
+    ) -> None:
+        self.minimum = convert_timedelta(minimum)
+        self.maximum = convert_timedelta(maximum)
+        self.current = (
+            convert_timedelta(initial) if initial is not None else self.minimum
+        )
+        self.busy_threshold = busy_threshold
+        self.factor = factor
+        self.budget = budget
+
+    def next_delay(self, changes: int, **labels: str) -> float:
+        """Update the interval after a poll and return how long to wait before the next.
+
+        :param changes: How many changes the poll found.
+        :param labels: Labels identifying the source in metrics.
+        :return: The number of seconds to wait before polling again.
+        """
+        if changes >= self.busy_threshold:
+            self.current = max(self.minimum, self.current / self.factor)
+        elif not changes:
+            self.current = min(self.maximum, self.current * self.factor)
+        delay = self.current.total_seconds()
+        if self.budget is not None:
+            delay = self.budget.reserve(delay)
+        metrics.observe("polling.changes", changes, **labels)
+        metrics.set("polling.interval_seconds", self.current.total_seconds(), **labels)
+        metrics.set("polling.delay_seconds", delay, **labels)
+        return delay
@@ -8,14 +8,16 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import date, datetime, timedelta, timezone, tzinfo
-from functools import partial
-from typing import Callable, List, Optional, Union
+from typing import Callable, Optional, Set, Union
 
 from archie._easy_timedelta import EasyTimedelta, convert_timedelta
-from archie._itertools import find, find_by_name
-from archie.asana._stories import comments_by_task
+from archie._itertools import find_by_name, first_or_none
+from archie._process_pool import any_in_process, call_in_process
+from archie._task_pass import current_pass
+from archie.asana._stories import comments_by_task, story_index
 from archie.asana.client import Client
-from archie.asana.models import External, Story, Task, User
+from archie.asana.models import CustomField, External, Story, Task, TaskMembership
+from archie.dependencies import ANY_STORY, EVERYTHING, NOTHING, Dependencies
 
 
 class Predicate(ABC):
@@ -31,6 +33,29 @@ class Predicate(ABC):
         """
         pass
 
+    def dependencies(self) -> Dependencies:
+        """Return the parts of a task this predicate reads.
+
+        Predicates that don't override this are assumed to read the entire task.
+
+        :return: The dependencies of this predicate.
+        """
+        return EVERYTHING
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        """Return the next time this predicate's result could change for a task.
+
+        This only considers changes caused by the passage of time, such as a task
+        becoming overdue, and not changes made to the task itself. Predicates that
+        don't override this are assumed not to depend on the current time.
+
+        :param task: The task being checked.
+        :param client: A client to access the Asana API for additional data.
+        :return: The next time the result could change, or ``None`` if it can only
+            change if the task does.
+        """
+        return None
+
     def __and__(self, other: Predicate) -> Predicate:
         """Create a new predicate from the logical "and" of two others.
 
@@ -75,6 +100,14 @@ class _And(Predicate):
     def __call__(self, task: Task, client: Client) -> bool:
         return self.first(task, client) and self.second(task, client)
 
+    def dependencies(self) -> Dependencies:
+        return self.first.dependencies() | self.second.dependencies()
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        return _earliest(
+            self.first.next_change(task, client), self.second.next_change(task, client)
+        )
+
     def __str__(self) -> str:
         return f"({self.first} and {self.second})"
 
@@ -89,6 +122,14 @@ class _Or(Predicate):
     def __call__(self, task: Task, client: Client) -> bool:
         return self.first(task, client) or self.second(task, client)
 
+    def dependencies(self) -> Dependencies:
+        return self.first.dependencies() | self.second.dependencies()
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        return _earliest(
+            self.first.next_change(task, client), self.second.next_change(task, client)
+        )
+
     def __str__(self) -> str:
         return f"({self.first} or {self.second})"
 
@@ -102,6 +143,12 @@ class _Not(Predicate):
     def __call__(self, task: Task, client: Client) -> bool:
         return not self.predicate(task, client)
 
+    def dependencies(self) -> Dependencies:
+        return self.predicate.dependencies()
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        return self.predicate.next_change(task, client)
+
     def __str__(self) -> str:
         return f"(not {self.predicate})"
 
@@ -112,6 +159,9 @@ class AlwaysTrue(Predicate):
     def __call__(self, task: Task, client: Client) -> bool:
         return True
 
+    def dependencies(self) -> Dependencies:
+        return NOTHING
+
 
 class _TimezoneAware(Predicate, ABC):
     """A predicate that requires knowledge of a timezone for accurate evaluation.
@@ -122,6 +172,9 @@ class _TimezoneAware(Predicate, ABC):
     def __init__(self, timezone: tzinfo) -> None:
         self._tz = timezone
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"due_at", "due_on"}, temporal=True)
+
 
 def _now(tz: tzinfo = timezone.utc) -> datetime:
     return datetime.now(tz)
@@ -131,6 +184,62 @@ def _today(tz: tzinfo = timezone.utc) -> date:
     return _now(tz).date()
 
 
+def _start_of_day(day: date, tz: tzinfo) -> datetime:
+    midnight = datetime(day.year, day.month, day.day)
+    # Attaching a pytz zone directly gives the first offset in the zone's history, such
+    # as its local mean time, rather than the one in effect on the day
+    localize = getattr(tz, "localize", None)
+    if localize is not None:
+        localized: datetime = localize(midnight)
+        return localized
+    return midnight.replace(tzinfo=tz)
+
+
+def _earliest(*times: Optional[datetime]) -> Optional[datetime]:
+    """Return the earliest of the given times, ignoring any that are ``None``."""
+    return min((t for t in times if t is not None), default=None)
+
+
+def _next_future(*times: datetime) -> Optional[datetime]:
+    """Return the earliest of the given times that is still in the future."""
+    now = _now()
+    return _earliest(*(t for t in times if t > now))
+
+
+def _contains(task: Task, text: str, pattern: str) -> bool:
+    """Return whether a literal pattern occurs in some text from a task.
+
+    If the current pass over the task has a text matcher that knows the pattern, the
+    text is scanned for all of the matcher's patterns at once, and the result is reused
+    for every other pattern checked against the same text during the pass.
+    """
+    current = current_pass(task)
+    if current is None or current.text_matcher is None:
+        return pattern in text
+    if pattern not in current.text_matcher.patterns:
+        return pattern in text
+    matches = current.text_matches.get(text)
+    if matches is None:
+        matches = current.text_matches[text] = current.text_matcher.matches(text)
+    return pattern in matches
+
+
+def _duration_elapses_at(
+    task: Task, story: Optional[Story], duration: timedelta
+) -> Optional[datetime]:
+    """Return when ``_for_at_least`` will next change, if it will.
+
+    :param task: The task being checked.
+    :param story: The latest story that put the task in that state, if any.
+    :param duration: The minimum time the task must have been in that state.
+    """
+    since = story.created_at if story is not None else task.created_at
+    try:
+        return _next_future(since + duration)
+    except OverflowError:
+        return None
+
+
 def _duration_suffix(duration: Optional[timedelta]) -> str:
     """Return an appropriate suffix for ``__str__`` on predicates with a duration."""
     if duration and duration != timedelta.max:
@@ -138,14 +247,13 @@ def _duration_suffix(duration: Optional[timedelta]) -> str:
     return ""
 
 
-def _for_at_least(
-    task: Task,
-    stories: List[Story],
-    story_matcher: Callable[[Story], bool],
-    duration: timedelta,
-) -> bool:
-    """Determine if a task has been in a given state for a minimum duration"""
-    story = find(reversed(stories), story_matcher)
+def _for_at_least(task: Task, story: Optional[Story], duration: timedelta) -> bool:
+    """Determine if a task has been in a given state for a minimum duration
+
+    :param task: The task being checked.
+    :param story: The latest story that put the task in that state, if any.
+    :param duration: The minimum time the task must have been in that state.
+    """
     # If there's a story reflecting the correct state, inspect time since that story
     if story is not None:
         return _now() - story.created_at > duration
@@ -153,26 +261,44 @@ def _for_at_least(
     return _now() - task.created_at > duration
 
 
+def _duration_dependencies(
+    duration: timedelta, fields: Set[str], story_subtypes: Set[str]
+) -> Dependencies:
+    """Return the dependencies of a predicate that may check a duration."""
+    if not duration:
+        return Dependencies(fields=fields)
+    return Dependencies(fields=fields, story_subtypes=story_subtypes, temporal=True)
+
+
 class Assigned(Predicate):
     """Check if a task is assigned.
 
-    If provided with a name, this will attempt to match the name of the assignee of the
-    task, if any. If not provided, this will consider a match if there is any assignee.
+    If provided with a user, this will attempt to match the assignee of the task, if
+    any. If not provided, this will consider a match if there is any assignee.
 
-    :param to: The name of the matching user.
+    A user given by email or GID is looked up through the client's cache of users and
+    compared by GID, so it matches even if the user is renamed. Anything else is
+    compared against the name of the assignee.
+
+    :param to: The email, GID, or name of the matching user.
     """
 
     def __init__(self, to: Optional[str] = None) -> None:
-        self._name = to
+        self._to = to
 
-    def __call__(self, task: Task, _: Client) -> bool:
-        return task.assignee is not None and (
-            self._name is None or task.assignee.name == self._name
-        )
+    def __call__(self, task: Task, client: Client) -> bool:
+        if task.assignee is None or self._to is None:
+            return task.assignee is not None
+        if "@" in self._to or self._to.isdigit():
+            return task.assignee.gid == client.user(self._to).gid
+        return task.assignee.name == self._to
+
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"assignee"})
 
     def __str__(self) -> str:
-        if self._name != "":
-            return f"{self.__class__.__name__} to '{self._name}'"
+        if self._to != "":
+            return f"{self.__class__.__name__} to '{self._to}'"
         else:
             return self.__class__.__name__
 
@@ -197,6 +323,18 @@ class DueToday(_TimezoneAware):
             return _today(self._tz) == task.due_on
         return False
 
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        if task.due_at is not None:
+            due = task.due_at.astimezone(self._tz).date()
+        elif task.due_on is not None:
+            due = task.due_on
+        else:
+            return None
+        return _next_future(
+            _start_of_day(due, self._tz),
+            _start_of_day(due + timedelta(days=1), self._tz),
+        )
+
 
 class DueWithin(_TimezoneAware):
     """Check if a task is due within some time window.
@@ -226,6 +364,16 @@ class DueWithin(_TimezoneAware):
             return now.date() <= task.due_on <= (now + self._window).date()
         return False
 
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        if task.due_at is not None:
+            return _next_future(task.due_at - self._window, task.due_at)
+        elif task.due_on is not None:
+            return _next_future(
+                _start_of_day(task.due_on, self._tz) - self._window,
+                _start_of_day(task.due_on + timedelta(days=1), self._tz),
+            )
+        return None
+
 
 class HasComment(Predicate):
     """Check if a task has a matching comment.
@@ -238,12 +386,22 @@ class HasComment(Predicate):
 
     :param comment_matcher: Either a predicate to check comments again, a string
         to search for literally, or `None` to match any comment.
+    :param cpu_bound: Whether a callable `comment_matcher` is slow enough that it should
+        run in a separate process, so it doesn't hold up other threads. Only the text of
+        each comment is sent to the process. The matcher and its results must be
+        picklable, such as a module-level function returning a bool. Worker processes
+        import the script's main module again, so the script must start triaging under
+        ``if __name__ == "__main__":``.
     """
 
     def __init__(
-        self, comment_matcher: Union[Callable[[str], bool], str, None] = None
+        self,
+        comment_matcher: Union[Callable[[str], bool], str, None] = None,
+        *,
+        cpu_bound: bool = False,
     ) -> None:
         self.comment_matcher = comment_matcher
+        self.cpu_bound = cpu_bound
 
     def match_comment(self, story: Story) -> bool:
         if self.comment_matcher is None:
@@ -254,7 +412,18 @@ class HasComment(Predicate):
             return self.comment_matcher(story.text)
 
     def __call__(self, task: Task, client: Client) -> bool:
-        return any(map(self.match_comment, comments_by_task(task, client)))
+        comments = comments_by_task(task, client)
+        if isinstance(self.comment_matcher, str):
+            pattern = self.comment_matcher
+            return any(_contains(task, comment.text, pattern) for comment in comments)
+        if self.cpu_bound and callable(self.comment_matcher):
+            return any_in_process(
+                self.comment_matcher, [comment.text for comment in comments]
+            )
+        return any(map(self.match_comment, comments))
+
+    def dependencies(self) -> Dependencies:
+        return Dependencies(story_subtypes={"comment_added"})
 
 
 class _EnumValuePredicate(Predicate, ABC):
@@ -262,23 +431,34 @@ class _EnumValuePredicate(Predicate, ABC):
     duration: timedelta
 
     def __call__(self, task: Task, client: Client) -> bool:
-        if not self._is_in_correct_state(task):
+        custom_field = self._matching_custom_field(task)
+        if custom_field is None:
             return False
         if not self.duration:
             return True
-        return _for_at_least(
-            task, client.stories_by_task(task), self._story_matcher, self.duration
-        )
+        story = story_index(task, client).latest_custom_field_change(custom_field.gid)
+        return _for_at_least(task, story, self.duration)
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        custom_field = self._matching_custom_field(task)
+        if custom_field is None or not self.duration:
+            return None
+        story = story_index(task, client).latest_custom_field_change(custom_field.gid)
+        return _duration_elapses_at(task, story, self.duration)
+
+    def _matching_custom_field(self, task: Task) -> Optional[CustomField]:
+        custom_field = find_by_name(task.custom_fields, self.custom_field_name)
+        if custom_field is None or not self._is_in_correct_state(custom_field):
+            return None
+        return custom_field
 
     @abstractmethod
-    def _is_in_correct_state(self, task: Task) -> bool:
+    def _is_in_correct_state(self, custom_field: CustomField) -> bool:
         pass
 
-    def _story_matcher(self, story: Story) -> bool:
-        return (
-            story.resource_subtype == "enum_custom_field_changed"
-            and story.custom_field is not None
-            and story.custom_field.name == self.custom_field_name
+    def dependencies(self) -> Dependencies:
+        return _duration_dependencies(
+            self.duration, {"custom_fields"}, {"enum_custom_field_changed"}
         )
 
 
@@ -304,15 +484,10 @@ class HasEnumValue(_EnumValuePredicate):
         self.enum_value_name = enum_option_name
         self.duration = convert_timedelta(for_at_least)
 
-    def _is_in_correct_state(self, task: Task) -> bool:
-        custom_field = find_by_name(task.custom_fields, self.custom_field_name)
-        return (
-            custom_field is not None
-            and custom_field.enum_value is not None
-            and (
-                self.enum_value_name is None
-                or custom_field.enum_value.name == self.enum_value_name
-            )
+    def _is_in_correct_state(self, custom_field: CustomField) -> bool:
+        return custom_field.enum_value is not None and (
+            self.enum_value_name is None
+            or custom_field.enum_value.name == self.enum_value_name
         )
 
     def __str__(self) -> str:
@@ -334,16 +509,32 @@ class HasExternal(Predicate):
     API docs for more details: https://developers.asana.com/docs/#custom-external-data
 
     :param predicate: An optional predicate to check the external object against.
+    :param cpu_bound: Whether ``predicate`` is slow enough that it should run in a
+        separate process, so it doesn't hold up other threads. Only the external object
+        is sent to the process. The predicate must be picklable, such as a module-level
+        function. Worker processes import the script's main module again, so the script
+        must start triaging under ``if __name__ == "__main__":``.
     """
 
-    def __init__(self, predicate: Optional[Callable[[External], bool]] = None) -> None:
+    def __init__(
+        self,
+        predicate: Optional[Callable[[External], bool]] = None,
+        *,
+        cpu_bound: bool = False,
+    ) -> None:
         self.predicate = predicate
+        self.cpu_bound = cpu_bound
 
     def __call__(self, task: Task, _: Client) -> bool:
         if self.predicate is not None and task.external is not None:
+            if self.cpu_bound:
+                return call_in_process(self.predicate, task.external)
             return self.predicate(task.external)
         return task.external is not None
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"external"})
+
 
 class HasNoDueDate(Predicate):
     """Check if a task has no due date set."""
@@ -351,23 +542,46 @@ class HasNoDueDate(Predicate):
     def __call__(self, task: Task, _: Client) -> bool:
         return task.due_at is None and task.due_on is None
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"due_at", "due_on"})
+
 
 class HasDescription(Predicate):
     """Check if a task has a matching description.
 
-    If a matcher is provided, it is used to check the description. If no matcher is
+    If a matcher is provided, it is used to check the description. If the matcher is a
+    string, it will be searched for literally within the description. If no matcher is
     provided, this returns ``True`` if the task has a non-empty description.
 
-    :param matcher: An predicate to apply to the task description. Defaults to a check
-        for a non-empty description.
+    :param matcher: An predicate to apply to the task description, or a string to search
+        for literally. Defaults to a check for a non-empty description.
+    :param cpu_bound: Whether ``matcher`` is slow enough that it should run in a
+        separate process, so it doesn't hold up other threads. Only the description is
+        sent to the process. The matcher and its results must be picklable, such as a
+        module-level function returning a bool. Worker processes import the script's
+        main module again, so the script must start triaging under
+        ``if __name__ == "__main__":``.
     """
 
-    def __init__(self, matcher: Callable[[str], bool] = bool) -> None:
+    def __init__(
+        self,
+        matcher: Union[Callable[[str], bool], str] = bool,
+        *,
+        cpu_bound: bool = False,
+    ) -> None:
         self.matcher = matcher
+        self.cpu_bound = cpu_bound
 
     def __call__(self, task: Task, _: Client) -> bool:
+        if isinstance(self.matcher, str):
+            return _contains(task, task.notes, self.matcher)
+        if self.cpu_bound:
+            return call_in_process(self.matcher, task.notes)
         return self.matcher(task.notes)
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"notes"})
+
 
 class HasUnsetEnum(_EnumValuePredicate):
     """Check if a custom field has no set value.
@@ -384,9 +598,8 @@ class HasUnsetEnum(_EnumValuePredicate):
         self.custom_field_name = custom_field_name
         self.duration = convert_timedelta(for_at_least)
 
-    def _is_in_correct_state(self, task: Task) -> bool:
-        custom_field = find_by_name(task.custom_fields, self.custom_field_name)
-        return custom_field is not None and custom_field.enum_value is None
+    def _is_in_correct_state(self, custom_field: CustomField) -> bool:
+        return custom_field.enum_value is None
 
     def __str__(self) -> str:
         return f"Has '{self.custom_field_name}' unset" + _duration_suffix(self.duration)
@@ -398,6 +611,9 @@ class IsComplete(Predicate):
     def __call__(self, task: Task, _: Client) -> bool:
         return task.completed
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"completed"})
+
 
 class IsIncomplete(Predicate):
     """Check if a task is incomplete."""
@@ -405,6 +621,9 @@ class IsIncomplete(Predicate):
     def __call__(self, task: Task, _: Client) -> bool:
         return not task.completed
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"completed"})
+
 
 class IsInProject(Predicate):
     """Check if a task is in a specified project.
@@ -421,22 +640,36 @@ class IsInProject(Predicate):
         self.duration = convert_timedelta(for_at_least)
 
     def __call__(self, task: Task, client: Client) -> bool:
-        if not self._is_in_correct_state(task):
+        membership = self._membership(task)
+        if membership is None:
             return False
         if not self.duration:
             return True
-        return _for_at_least(
-            task, client.stories_by_task(task), self._story_matcher, self.duration
+        story = self._entered_story(task, client, membership)
+        return _for_at_least(task, story, self.duration)
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        membership = self._membership(task)
+        if membership is None or not self.duration:
+            return None
+        story = self._entered_story(task, client, membership)
+        return _duration_elapses_at(task, story, self.duration)
+
+    def _membership(self, task: Task) -> Optional[TaskMembership]:
+        return first_or_none(
+            m for m in task.memberships if m.project.name == self.project_name
         )
 
-    def _is_in_correct_state(self, task: Task) -> bool:
-        return any(m.project.name == self.project_name for m in task.memberships)
-
-    def _story_matcher(self, story: Story) -> bool:
-        # Check for added_to_project story
-        if story.resource_subtype == "added_to_project" and story.project is not None:
-            return story.project.name == self.project_name
-        return False
+    @staticmethod
+    def _entered_story(
+        task: Task, client: Client, membership: TaskMembership
+    ) -> Optional[Story]:
+        return story_index(task, client).latest_project_addition(membership.project.gid)
+
+    def dependencies(self) -> Dependencies:
+        return _duration_dependencies(
+            self.duration, {"memberships"}, {"added_to_project"}
+        )
 
     def __str__(self) -> str:
         return f"In '{self.project_name}' project" + _duration_suffix(self.duration)
@@ -463,39 +696,51 @@ class IsInProjectAndSection(Predicate):
         self.duration = convert_timedelta(for_at_least)
 
     def __call__(self, task: Task, client: Client) -> bool:
-        if not self._is_in_correct_state(task):
+        membership = self._membership(task)
+        if membership is None:
             return False
         if not self.duration:
             return True
-        return _for_at_least(
-            task, client.stories_by_task(task), self._story_matcher, self.duration
-        )
-
-    def _is_in_correct_state(self, task: Task) -> bool:
-        return any(
-            m.project.name == self.project_name
+        story = self._entered_story(task, client, membership)
+        return _for_at_least(task, story, self.duration)
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        membership = self._membership(task)
+        if membership is None or not self.duration:
+            return None
+        story = self._entered_story(task, client, membership)
+        return _duration_elapses_at(task, story, self.duration)
+
+    def _membership(self, task: Task) -> Optional[TaskMembership]:
+        return first_or_none(
+            m
+            for m in task.memberships
+            if m.project.name == self.project_name
             and m.section is not None
             and m.section.name == self.section_name
-            for m in task.memberships
         )
 
-    def _story_matcher(self, story: Story) -> bool:
-        # Check for section_changed story
-        if (
-            story.resource_subtype == "section_changed"
-            and story.new_section is not None
-        ):
-            return (
-                story.new_section.name == self.section_name
-                and story.new_section.project.name == self.project_name
-            )
-        # Check for added_to_project story
-        # If we didn't see a section changed story in the above check, then the task
-        # is assumed to have been added directly to the section it's currently in, which
-        # must be the correct section because of the ``_is_in_correct_state`` check,
-        if story.resource_subtype == "added_to_project" and story.project is not None:
-            return story.project.name == self.project_name
-        return False
+    @staticmethod
+    def _entered_story(
+        task: Task, client: Client, membership: TaskMembership
+    ) -> Optional[Story]:
+        index = story_index(task, client)
+        # If the task was added to the project after last moving into the section, then
+        # it's assumed to have been added directly to the section it's currently in
+        stories = [
+            index.latest_section_change(membership.section.gid),
+            index.latest_project_addition(membership.project.gid),
+        ]
+        return max(
+            (s for s in stories if s is not None),
+            key=lambda s: s.created_at,
+            default=None,
+        )
+
+    def dependencies(self) -> Dependencies:
+        return _duration_dependencies(
+            self.duration, {"memberships"}, {"added_to_project", "section_changed"}
+        )
 
     def __str__(self) -> str:
         return (
@@ -526,6 +771,15 @@ class Overdue(_TimezoneAware):
             return task.due_on < _today(self._tz)
         return False
 
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        if task.due_at is not None:
+            return _next_future(task.due_at)
+        elif task.due_on is not None:
+            return _next_future(
+                _start_of_day(task.due_on + timedelta(days=1), self._tz)
+            )
+        return None
+
 
 class Unassigned(Predicate):
     """Check if a task has no assignee."""
@@ -533,6 +787,9 @@ class Unassigned(Predicate):
     def __call__(self, task: Task, _: Client) -> bool:
         return task.assignee is None
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"assignee"})
+
 
 class Untriaged(Predicate):
     """Check if a task has not recently been triaged.
@@ -557,17 +814,45 @@ class Untriaged(Predicate):
         self.duration = convert_timedelta(for_at_least)
 
     def __call__(self, task: Task, client: Client) -> bool:
-        story = find(
-            reversed(client.stories_by_task(task)),
-            partial(self._story_matcher, client.me()),
-        )
+        story = story_index(task, client).latest_by_author(client.me().gid)
         if story is not None:
             return _now() - story.created_at > self.duration
         return True
 
-    @staticmethod
-    def _story_matcher(me: User, story: Story) -> bool:
-        return story.created_by == me
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        if self.duration == timedelta.max:
+            return None
+        story = story_index(task, client).latest_by_author(client.me().gid)
+        if story is None:
+            return None
+        return _duration_elapses_at(task, story, self.duration)
+
+    def dependencies(self) -> Dependencies:
+        return Dependencies(
+            story_subtypes={ANY_STORY}, temporal=self.duration != timedelta.max
+        )
 
     def __str__(self) -> str:
         return self.__class__.__name__ + _duration_suffix(self.duration)
+
+
+def text_patterns(predicate: Predicate) -> Set[str]:
+    """Return the literal strings that a predicate searches task text for.
+
+    These are the strings given to :py:class:`HasComment` and
+    :py:class:`HasDescription`, including within combined predicates. When its rules
+    have enough patterns, the triager compiles them together, so that each text is
+    scanned once for all of them.
+
+    :param predicate: The predicate to inspect.
+    :return: The literal patterns the predicate searches for.
+    """
+    if isinstance(predicate, (_And, _Or)):
+        return text_patterns(predicate.first) | text_patterns(predicate.second)
+    if isinstance(predicate, _Not):
+        return text_patterns(predicate.predicate)
+    if isinstance(predicate, HasComment) and isinstance(predicate.comment_matcher, str):
+        return {predicate.comment_matcher}
+    if isinstance(predicate, HasDescription) and isinstance(predicate.matcher, str):
+        return {predicate.matcher}
+    return set()
@@ -0,0 +1,78 @@
+"""
+Priorities decide which tasks the triager processes first when many are waiting, such
+as after polling a large project. A priority is a function that places a task into a
+band, where band 0 is the most urgent. Tasks in lower bands are processed first, but
+waiting tasks age into more urgent bands over time, so that every task is eventually
+processed even while urgent tasks keep arriving.
+
+Tasks whose previous run failed are always placed in band 0, so that they're retried
+as soon as possible.
+
+The time from a task being queued to its first action being applied is recorded for
+each band in the ``triager.time_to_first_action_seconds`` metric.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Optional
+
+from archie.asana.models import Task
+
+#: A function placing a task into a priority band, where lower bands run first.
+Priority = Callable[[Task], int]
+
+
+def _due(task: Task) -> Optional[datetime]:
+    if task.due_at is not None:
+        return task.due_at
+    if task.due_on is not None:
+        return datetime.combine(task.due_on, time(), timezone.utc) + timedelta(days=1)
+    return None
+
+
+def by_due_date(task: Task) -> int:
+    """Place overdue tasks first, then tasks due within a day, then within a week.
+
+    Tasks due on a date, rather than at a time, are treated as due at the end of that
+    day in UTC.
+
+    :param task: The task to place.
+    :return: 0 if the task is overdue, 1 if it's due within a day, 2 if it's due within
+        a week, and 3 otherwise.
+    """
+    due = _due(task)
+    if due is None:
+        return 3
+    remaining = due - datetime.now(timezone.utc)
+    if remaining <= timedelta():
+        return 0
+    if remaining <= timedelta(days=1):
+        return 1
+    return 2 if remaining <= timedelta(weeks=1) else 3
+
+
+def by_recent_modification(task: Task) -> int:
+    """Place tasks modified within the last hour first, then within the last day.
+
+    :param task: The task to place.
+    :return: 0 if the task was modified within an hour, 1 if within a day, and 2
+        otherwise.
+    """
+    if task.modified_at is None:
+        return 2
+    age = datetime.now(timezone.utc) - task.modified_at
+    if age <= timedelta(hours=1):
+        return 0
+    return 1 if age <= timedelta(days=1) else 2
+
+
+def most_urgent(*priorities: Priority) -> Priority:
+    """Combine priorities, placing each task in the most urgent band any of them gives.
+
+    :param priorities: The priorities to combine.
+    :return: The combined priority.
+    """
+
+    def priority(task: Task) -> int:
+        return min(priority(task) for priority in priorities)
+
+    return priority
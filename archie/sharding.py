@@ -0,0 +1,247 @@
+"""
+Sharding splits the triage work for a project between several workers, which can run
+in separate processes or on separate hosts. Each task is assigned to a single worker by
+consistent hashing of its GID, so a task is always processed by the same worker for as
+long as the set of workers stays the same, keeping that worker's caches warm. When a
+worker joins or leaves, only the tasks it owned or takes over move.
+
+Workers find each other through a :py:class:`MembershipBackend`. Each worker wraps its
+task source in a :py:class:`ShardedSource`, which regularly announces the worker to the
+backend and only provides the tasks that the worker owns.
+
+The Asana API can't filter tasks by GID, so every worker still fetches all of the tasks
+from its source and discards those owned by other workers.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie.asana.client import Client
+from archie.asana.models import Task
+from archie.metrics import metrics
+from archie.sources import TaskSource
+
+_logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+"""
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """A consistent hash ring assigning keys to members.
+
+    Each member is placed on the ring at several points, so that keys are spread evenly
+    between members, and adding or removing a member only moves the keys it owns.
+
+    :param members: The members to assign keys to.
+    :param replicas: How many points each member is placed at on the ring.
+    """
+
+    def __init__(self, members: Iterable[str], replicas: int = 100) -> None:
+        self.members = sorted(set(members))
+        if not self.members:
+            raise ValueError("A hash ring needs at least one member")
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{member}#{replica}"), member)
+            for member in self.members
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> str:
+        """Return the member that owns a key.
+
+        :param key: The key, such as a task GID.
+        :return: The member owning the key.
+        """
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class MembershipBackend(ABC):
+    """An abstract base class for backends tracking which workers are alive."""
+
+    @abstractmethod
+    def heartbeat(self, member_id: str) -> None:
+        """Record that a worker is alive.
+
+        :param member_id: The ID of the worker.
+        """
+        pass
+
+    @abstractmethod
+    def leave(self, member_id: str) -> None:
+        """Remove a worker, so its tasks are taken over immediately.
+
+        :param member_id: The ID of the worker.
+        """
+        pass
+
+    @abstractmethod
+    def members(self) -> List[str]:
+        """Return the IDs of all live workers."""
+        pass
+
+
+class SQLiteMembership(MembershipBackend):
+    """A membership backend that keeps workers in a SQLite database.
+
+    This suits workers running on a single host, or sharing a file system that supports
+    SQLite's locking.
+
+    :param path: The path of the SQLite database.
+    :param ttl: How long a worker is considered alive after its last heartbeat.
+    """
+
+    def __init__(self, path: str, *, ttl: EasyTimedelta = "1m") -> None:
+        self.ttl = convert_timedelta(ttl)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def heartbeat(self, member_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO members (id, last_seen) VALUES (?, ?)",
+                (member_id, time.time()),
+            )
+
+    def leave(self, member_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM members WHERE id = ?", (member_id,))
+
+    def members(self) -> List[str]:
+        cutoff = time.time() - self.ttl.total_seconds()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM members WHERE last_seen >= ? ORDER BY id", (cutoff,)
+            ).fetchall()
+        return [member_id for member_id, in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+class ShardedSource(TaskSource):
+    """A task source that only provides the tasks owned by one worker.
+
+    While the source is being iterated over, a background thread sends heartbeats to
+    the membership backend. The worker leaves once iteration stops.
+
+    Tasks owned by other workers are acknowledged to the wrapped source straight away,
+    so that they don't hold back its checkpoints. This leaves a gap on failover when
+    the wrapped source checkpoints its progress, such as a
+    :py:class:`~archie.sources.ModifiedSinceSource`: if a worker dies before processing
+    its tasks, the workers that take them over have already checkpointed past them, so
+    they aren't provided again until they next change. Give each worker its own
+    checkpoint store, so that a restarted worker resumes from its own checkpoint, and
+    keep the membership backend's time to live short to narrow the window. A heartbeat
+    that fails is logged and retried after ``refresh_every``. If the set of workers
+    can't be fetched, the last known set is kept until the next refresh.
+
+    :param source: The source to draw tasks from.
+    :param member_id: The ID of this worker, which must be unique among workers.
+    :param membership: The backend used to find the other workers.
+    :param refresh_every: How often to send a heartbeat and update the set of workers.
+        This should be well within the backend's time to live.
+    """
+
+    def __init__(
+        self,
+        source: TaskSource,
+        member_id: str,
+        membership: MembershipBackend,
+        *,
+        refresh_every: EasyTimedelta = timedelta(seconds=15),
+    ) -> None:
+        self.source = source
+        self.project_gid = source.project_gid
+        self.member_id = member_id
+        self.membership = membership
+        self.refresh_every = convert_timedelta(refresh_every)
+        self._ring: Optional[HashRing] = None
+        self._refreshed_at = 0.0
+
+    def iterator(self, client: Client) -> Iterator[Task]:
+        self.membership.heartbeat(self.member_id)
+        stop = Event()
+        Thread(target=self._send_heartbeats, args=(stop,), daemon=True).start()
+        try:
+            for task in self.source.iterator(client):
+                if self.owns(task):
+                    yield task
+                else:
+                    metrics.increment(
+                        "sharding.tasks_skipped", project=self.project_gid
+                    )
+                    self.source.ack(task)
+        finally:
+            stop.set()
+            self.membership.leave(self.member_id)
+
+    def owns(self, task: Task) -> bool:
+        """Return whether this worker owns a task."""
+        return self._current_ring().owner(task.gid) == self.member_id
+
+    def schedule_wakeup(self, task: Task, at: datetime) -> None:
+        self.source.schedule_wakeup(task, at)
+
+    def ack(self, task: Task, *, failed: bool = False) -> None:
+        self.source.ack(task, failed=failed)
+
+    def _send_heartbeats(self, stop: Event) -> None:
+        while not stop.wait(self.refresh_every.total_seconds()):
+            try:
+                self.membership.heartbeat(self.member_id)
+            except Exception:
+                _logger.warning(
+                    f"Failed to send a heartbeat for {self.member_id}", exc_info=True
+                )
+                metrics.increment("sharding.heartbeat_errors", project=self.project_gid)
+
+    def _current_ring(self) -> HashRing:
+        now = time.monotonic()
+        due = now - self._refreshed_at >= self.refresh_every.total_seconds()
+        if self._ring is None or due:
+            self._refreshed_at = now
+            try:
+                members = {self.member_id, *self.membership.members()}
+            except Exception:
+                _logger.warning(
+                    f"Failed to update the workers sharing {self.project_gid}",
+                    exc_info=True,
+                )
+                metrics.increment(
+                    "sharding.membership_errors", project=self.project_gid
+                )
+                # Keep the last known workers, or work alone until others are found
+                if self._ring is None:
+                    self._ring = HashRing([self.member_id])
+                return self._ring
+            if self._ring is None or self._ring.members != sorted(members):
+                _logger.info(
+                    f"Sharding {self.project_gid} between {len(members)} workers"
+                )
+                self._ring = HashRing(members)
+            metrics.set("sharding.members", len(members), project=self.project_gid)
+        return self._ring
@@ -6,14 +6,45 @@ fixed in size (such as polling incomplete tasks in a project once) or infinite (
 repeatedly polling for tasks that have changed).
 """
 
+import hashlib
+import json
+import logging
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from time import sleep
-from typing import Iterator, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import attr
+from asana.error import AsanaError  # type: ignore
+from requests import RequestException
 
 from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie._wakeups import WakeupScheduler
 from archie.asana.client import Client
-from archie.asana.models import Task
+from archie.asana.models import Project, Task
+from archie.checkpoints import CheckpointStore
+from archie.metrics import metrics
+from archie.mirror import TaskMirror
+from archie.polling import AdaptiveInterval
+
+_logger = logging.getLogger(__name__)
+_Fingerprint = Tuple[Optional[datetime], str]
+
+
+def _fingerprint(task: Task) -> _Fingerprint:
+    """Return a value that changes whenever the task does."""
+    content = json.dumps(task.to_dict(), sort_keys=True).encode()
+    return task.modified_at, hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+@attr.s(auto_attribs=True)
+class _Batch:
+    """The tasks found by a single poll that haven't been acknowledged yet."""
+
+    watermark: datetime
+    outstanding: int
 
 
 class TaskSource(ABC):
@@ -34,8 +65,82 @@ class TaskSource(ABC):
         """
         pass
 
+    def schedule_wakeup(self, task: Task, at: datetime) -> None:
+        """Ask the source to provide a task again at a given time.
+
+        The triager calls this when a predicate's result for the task will change with
+        the passage of time alone, such as when the task becomes overdue. Sources that
+        can't revisit tasks ignore this.
+
+        :param task: The task to provide again.
+        :param at: When to provide the task again.
+        """
+        pass
+
+    def ack(self, task: Task, *, failed: bool = False) -> None:
+        """Acknowledge that a task provided by the source has finished being processed.
+
+        The triager calls this once for every task it draws from the source, whether or
+        not processing succeeded. Sources that checkpoint their progress use this to
+        know when it's safe to advance the checkpoint.
+
+        :param task: The task, exactly as it was provided by the source.
+        :param failed: Whether processing the task failed.
+        """
+        pass
+
+
+class _WakeupSource(TaskSource, ABC):
+    """A source that provides tasks again when their wakeups come due.
+
+    Wakeups are only served while the source is waiting between polls, at which point
+    the latest version of each task is fetched. Wakeups for tasks that can't be fetched
+    or no longer belong to the source are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._wakeups = WakeupScheduler()
+
+    def schedule_wakeup(self, task: Task, at: datetime) -> None:
+        self._wakeups.schedule(task.gid, at)
+
+    def _delay(self, delay: Union[timedelta, AdaptiveInterval], changes: int) -> float:
+        """Return how many seconds to wait after a poll that found some changes."""
+        if isinstance(delay, AdaptiveInterval):
+            return delay.next_delay(changes, project=self.project_gid)
+        return delay.total_seconds()
+
+    def _sleep(self, client: Client, seconds: float) -> Iterator[Task]:
+        """Wait for a given time, providing any tasks that come due in the meantime."""
+        end = monotonic() + seconds
+        while True:
+            remaining = end - monotonic()
+            if remaining <= 0:
+                return
+            for task_gid in self._wakeups.wait(remaining):
+                try:
+                    task = client.task_by_gid(task_gid)
+                except (AsanaError, RequestException):
+                    _logger.warning(
+                        f"Dropping wakeup for task {task_gid}, which couldn't be "
+                        "fetched",
+                        exc_info=True,
+                    )
+                    continue
+                if self._provides(task):
+                    yield task
+                else:
+                    _logger.info(f"Dropping wakeup for {task}, which left the source")
+
+    def _provides(self, task: Task) -> bool:
+        """Return whether a task still belongs to the source."""
+        return any(
+            membership.project.gid == self.project_gid
+            for membership in task.memberships
+        )
+
 
-class PollingSource(TaskSource):
+class PollingSource(_WakeupSource):
     """A task source that fetches all tasks in a project, optionally filtered.
 
     If ``repeat_after`` is provided, the source will fetch tasks, then delay for that
@@ -44,41 +149,125 @@ class PollingSource(TaskSource):
     Consequences of using this task source:
 
     * Extremely large projects can be slow to iterate over, especially if not filtered
-      to only incomplete tasks.
+      to only incomplete tasks. Providing a :py:class:`~archie.mirror.TaskMirror`
+      means only tasks that changed since the last poll are downloaded.
+    * When repeating, tasks that will match different predicates with the passage of
+      time alone, such as tasks becoming overdue, are provided again at that time
+      without waiting for the next poll.
+    * When repeating with ``skip_unchanged``, tasks that haven't changed since they were
+      last processed are skipped. A task that failed to be processed is provided again
+      on the next poll.
 
     :param project_gid: The project the source draws from.
-    :param repeat_after: How long the source should wait before polling again.
+    :param repeat_after: How long the source should wait before polling again. This can
+        be an :py:class:`~archie.polling.AdaptiveInterval`, in which case the number of
+        changes found by each poll is the number of tasks provided, so it should be
+        combined with ``skip_unchanged``.
     :param only_incomplete: Whether the source should pull only incomplete tasks.
+    :param mirror: An optional local mirror to read tasks from. Mirrors only hold
+        incomplete tasks, so this cannot be combined with ``only_incomplete=False``.
+    :param skip_unchanged: Whether to skip tasks that haven't changed since the previous
+        poll, as determined by their modification time and a hash of their contents.
+    :param full_pass_every: If set along with ``skip_unchanged``, provide every task,
+        changed or not, on every Nth poll.
+    :param max_fingerprints: The maximum number of tasks to remember between polls when
+        skipping unchanged tasks.
     """
 
     def __init__(
         self,
         project_gid: str,
         *,
-        repeat_after: Optional[EasyTimedelta] = None,
-        only_incomplete: bool = True
+        repeat_after: Union[EasyTimedelta, AdaptiveInterval, None] = None,
+        only_incomplete: bool = True,
+        mirror: Optional[TaskMirror] = None,
+        skip_unchanged: bool = False,
+        full_pass_every: Optional[int] = None,
+        max_fingerprints: int = 100_000
     ) -> None:
+        if mirror is not None and not only_incomplete:
+            raise ValueError("Mirrors can only be used for incomplete tasks")
+        super().__init__()
         self.project_gid = project_gid
         self.repeat_after = (
-            convert_timedelta(repeat_after) if repeat_after is not None else None
+            repeat_after
+            if repeat_after is None or isinstance(repeat_after, AdaptiveInterval)
+            else convert_timedelta(repeat_after)
         )
         self.only_incomplete = only_incomplete
+        self.mirror = mirror
+        self.skip_unchanged = skip_unchanged
+        self.full_pass_every = full_pass_every
+        self.max_fingerprints = max_fingerprints
+        self._fingerprints: "OrderedDict[str, _Fingerprint]" = OrderedDict()
+        self._fingerprints_lock = Lock()
 
     def iterator(self, client: Client) -> Iterator[Task]:
         project = client.project_by_gid(self.project_gid)
         if self.repeat_after is None:
-            yield from client.tasks_by_project(
-                project, only_incomplete=self.only_incomplete
-            )
+            yield from self._poll(client, project)
         else:
+            cycle = 0
             while True:
-                yield from client.tasks_by_project(
-                    project, only_incomplete=self.only_incomplete
-                )
-                sleep(self.repeat_after.total_seconds())
+                tasks = self._poll(client, project)
+                if self.skip_unchanged:
+                    full_pass = (
+                        self.full_pass_every is not None
+                        and cycle % self.full_pass_every == 0
+                    )
+                    tasks = self._changed(tasks, full_pass)
+                yield from tasks
+                delay = self._delay(self.repeat_after, len(tasks))
+                yield from self._sleep(client, delay)
+                cycle += 1
+
+    def _changed(self, tasks: List[Task], full_pass: bool) -> List[Task]:
+        """Filter out tasks that haven't changed since the previous poll.
+
+        Tasks with a wakeup that has already come due are never skipped.
+        """
+        changed = []
+        with self._fingerprints_lock:
+            for task in tasks:
+                fingerprint = _fingerprint(task)
+                previous = self._fingerprints.pop(task.gid, None)
+                self._fingerprints[task.gid] = fingerprint
+                due = self._wakeups.take_due(task.gid)
+                if full_pass or due or previous != fingerprint:
+                    changed.append(task)
+            while len(self._fingerprints) > self.max_fingerprints:
+                self._fingerprints.popitem(last=False)
+
+        skipped = len(tasks) - len(changed)
+        skip_ratio = skipped / len(tasks) if tasks else 0.0
+        metrics.increment("source.tasks_skipped", skipped, project=self.project_gid)
+        metrics.set("source.skip_ratio", skip_ratio, project=self.project_gid)
+        _logger.info(
+            f"Skipping {skipped} of {len(tasks)} unchanged tasks ({skip_ratio:.0%})"
+        )
+        return changed
 
+    def ack(self, task: Task, *, failed: bool = False) -> None:
+        if failed:
+            # Forget the task, so it isn't skipped as unchanged on the next poll
+            with self._fingerprints_lock:
+                self._fingerprints.pop(task.gid, None)
 
-class ModifiedSinceSource(TaskSource):
+    def _provides(self, task: Task) -> bool:
+        return super()._provides(task) and not (
+            self.only_incomplete and task.completed
+        )
+
+    def _poll(self, client: Client, project: Project) -> List[Task]:
+        if self.mirror is None:
+            return client.tasks_by_project(
+                project, only_incomplete=self.only_incomplete
+            )
+        self.mirror.sync(client, project)
+        return self.mirror.tasks(project)
+
+
+class ModifiedSinceSource(_WakeupSource):
     """A task source that fetches tasks that have changed since the last fetch.
 
     This source uses the API's ``modified_since`` query parameter to limit tasks to only
@@ -95,16 +284,58 @@ class ModifiedSinceSource(TaskSource):
     * A task constantly undergoing changes, such as where a user is typing out a
       description over the course of several minutes, will appear frequently in each
       iteration of the source.
-    * Tracking of changed tasks only starts when the source is first created.
+      Setting ``debounce`` holds each changed task back until it has stopped changing
+      for that long, so it's only provided once the edits are finished.
+    * Tracking of changed tasks only starts when the source is first created, unless
+      ``checkpoints`` is given and holds a checkpoint for the project. The checkpoint
+      only advances past a poll once every task it found has been acknowledged, so after
+      a restart, tasks that were being processed when the triager stopped are fetched
+      again rather than missed.
+    * Tasks that will match different predicates with the passage of time alone, such
+      as tasks becoming overdue, are provided again at that time even if they haven't
+      changed.
 
     :param project_gid: The project the source draws from.
+    :param debounce: If set, how long a task must go without changes before it's
+        provided. Tasks are provided on the first poll after their quiet period ends.
+    :param polling_delay: How long to wait between polls, which can be an
+        :py:class:`~archie.polling.AdaptiveInterval`. Defaults to
+        :py:attr:`POLLING_DELAY`.
+    :param checkpoints: An optional store used to durably record how far the source has
+        got, keyed by project GID.
     """
 
     POLLING_DELAY = timedelta(seconds=60)
 
-    def __init__(self, project_gid: str) -> None:
+    def __init__(
+        self,
+        project_gid: str,
+        *,
+        debounce: Optional[EasyTimedelta] = None,
+        polling_delay: Union[EasyTimedelta, AdaptiveInterval, None] = None,
+        checkpoints: Optional[CheckpointStore] = None
+    ) -> None:
+        super().__init__()
         self.project_gid = project_gid
-        self._set_last_run(datetime.utcnow())
+        self.polling_delay = (
+            polling_delay
+            if polling_delay is None or isinstance(polling_delay, AdaptiveInterval)
+            else convert_timedelta(polling_delay)
+        )
+        self.debounce = convert_timedelta(debounce) if debounce is not None else None
+        self.checkpoints = checkpoints
+        # The latest version of each task held back, when it last changed, and the
+        # batch it was first found in
+        self._pending: Dict[str, Tuple[Task, datetime, int]] = {}
+        # Batches that haven't been checkpointed yet, oldest first
+        self._batches: "OrderedDict[int, _Batch]" = OrderedDict()
+        self._next_batch = 0
+        # The batch of each provided task, keyed by identity since the triager
+        # acknowledges the exact object it was given
+        self._provided: Dict[int, Tuple[Task, int]] = {}
+        self._batch_lock = Lock()
+        checkpoint = checkpoints.load(project_gid) if checkpoints is not None else None
+        self._set_last_run(checkpoint or datetime.utcnow())
 
     def _set_last_run(self, last_run: datetime) -> None:
         """Set the time when the source last fetched tasks.
@@ -132,5 +363,80 @@ class ModifiedSinceSource(TaskSource):
                 project, only_incomplete=False, modified_since=modified_since
             )
             self._set_last_run(now)
-            yield from tasks
-            sleep(self.POLLING_DELAY.total_seconds())
+            changes = len(tasks)
+            batch_id = self._next_batch
+            self._next_batch += 1
+            if self.debounce is not None:
+                batched, found = self._debounced(tasks, self.debounce, batch_id)
+            else:
+                batched, found = [(task, batch_id) for task in tasks], len(tasks)
+            self._open_batch(batch_id, now, found)
+            for task, task_batch_id in batched:
+                self._track(task, task_batch_id)
+                yield task
+            delay = self._delay(self.polling_delay or self.POLLING_DELAY, changes)
+            yield from self._sleep(client, delay)
+
+    def _debounced(
+        self, tasks: List[Task], debounce: timedelta, batch_id: int
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """Hold back tasks until they've gone without changes for the debounce time.
+
+        :return: The quiet tasks along with the batch each was first found in, and how
+            many tasks weren't already being held back.
+        """
+        now = datetime.now(timezone.utc)
+        found = 0
+        for task in tasks:
+            pending = self._pending.get(task.gid)
+            if pending is None:
+                found += 1
+            task_batch_id = pending[2] if pending is not None else batch_id
+            self._pending[task.gid] = task, task.modified_at or now, task_batch_id
+        quiet = [
+            (task, task_batch_id)
+            for task, changed_at, task_batch_id in self._pending.values()
+            if now - changed_at >= debounce
+        ]
+        for task, _ in quiet:
+            del self._pending[task.gid]
+        metrics.set(
+            "source.debounced_tasks", len(self._pending), project=self.project_gid
+        )
+        return quiet, found
+
+    def ack(self, task: Task, *, failed: bool = False) -> None:
+        if self.checkpoints is None:
+            return
+        with self._batch_lock:
+            provided = self._provided.pop(id(task), None)
+            if provided is None:
+                # Tasks provided by wakeups aren't part of any batch
+                return
+            self._batches[provided[1]].outstanding -= 1
+            self._commit(self.checkpoints)
+
+    def _open_batch(self, batch_id: int, watermark: datetime, found: int) -> None:
+        if self.checkpoints is None:
+            return
+        with self._batch_lock:
+            self._batches[batch_id] = _Batch(watermark, found)
+            self._commit(self.checkpoints)
+
+    def _track(self, task: Task, batch_id: int) -> None:
+        if self.checkpoints is None:
+            return
+        with self._batch_lock:
+            self._provided[id(task)] = task, batch_id
+
+    def _commit(self, checkpoints: CheckpointStore) -> None:
+        """Save the watermark of the latest batch whose predecessors are all done."""
+        watermark = None
+        while self._batches:
+            batch_id, batch = next(iter(self._batches.items()))
+            if batch.outstanding:
+                break
+            watermark = batch.watermark
+            del self._batches[batch_id]
+        if watermark is not None:
+            checkpoints.save(self.project_gid, watermark)
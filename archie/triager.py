@@ -12,22 +12,82 @@ used to perform the mutation.
 """
 
 import logging
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from concurrent.futures import Executor
-from typing import Callable, List, MutableMapping, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Set, Tuple
 
-from archie._executor import LoggingThreadPoolExecutor
+import attr
+
+from archie._change_tracker import ChangeTracker
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie._executor import FairExecutor, FairQueue, LoggingThreadPoolExecutor
 from archie._itertools import find, find_by_name
+from archie._task_pass import TaskBudgetExceeded, current_view, flush_writes, task_pass
+from archie._text_matcher import MIN_PATTERNS, TextMatcher
 from archie.actions import Action
-from archie.asana.client import Client
+from archie.asana.client import _CONNECTION_POOL_SIZE, Client
 from archie.asana.models import Section, Task
-from archie.predicates import Predicate
+from archie.asana.story_store import StoryStore
+from archie.dependencies import NOTHING, Dependencies, TaskChange
+from archie.ledger import ActionLedger
+from archie.metrics import metrics
+from archie.mirror import TaskMirror
+from archie.predicates import Predicate, text_patterns
+from archie.priorities import Priority
 from archie.sorters import Sorter
 from archie.sources import TaskSource
 from archie.workflows.workflow import Workflow
 
 _logger = logging.getLogger(__name__)
 _TaskToActions = Callable[[Task], List[Action]]
+_Job = Tuple[Callable[..., None], Tuple[Any, ...]]
+_Workflows = Tuple[Tuple[Workflow, Optional[ChangeTracker]], ...]
+_Move = Tuple[Task, str, Task]
+# The snapshots to record once a task's deferred writes have been made
+_Records = List[Tuple[ChangeTracker, Task]]
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class _Repeat:
+    """How often a rule may repeat an action on the same task.
+
+    :ivar ActionLedger ledger: The ledger recording when actions were applied.
+    :ivar str rule: The name of the rule in the ledger.
+    :ivar Optional[timedelta] every: The shortest time between repeats, or ``None`` if
+        the action is never repeated.
+    """
+
+    ledger: ActionLedger
+    rule: str
+    every: Optional[timedelta]
+
+
+@attr.s(auto_attribs=True)
+class _SortState:
+    """The order of an incrementally sorted section, as it was last left.
+
+    :ivar timedelta full_sort_every: How often the whole section is sorted again.
+    :ivar List[str] order: The GIDs of the tasks in the section, in sorted order.
+    :ivar Dict[str, Tuple[Any, ...]] keys: The sort key of each of those tasks.
+    :ivar Optional[float] full_sorted_at: The :py:func:`time.monotonic` time of the
+        last full sort, or ``None`` if the next sort must be a full sort.
+    """
+
+    full_sort_every: timedelta
+    order: List[str] = attr.ib(factory=list)
+    keys: Dict[str, Tuple[Any, ...]] = attr.ib(factory=dict)
+    full_sorted_at: Optional[float] = None
+
+    def full_sort_due(self) -> bool:
+        """Return whether the next sort must be a full sort."""
+        if self.full_sorted_at is None:
+            return True
+        elapsed = monotonic() - self.full_sorted_at
+        return elapsed >= self.full_sort_every.total_seconds()
 
 
 class Triager:
@@ -35,30 +95,114 @@ class Triager:
 
     :param access_token: Credentials to access the Asana API.
     :param task_source: A source to provide tasks to triage.
+    :param story_store: An optional store used to cache stories between fetches.
+    :param mirror: An optional local mirror of the project's tasks. If set, sorting
+        reads tasks from the mirror and only fetches tasks that have changed.
+    :param track_changes: Whether to remember each processed task, so that rules and
+        workflows are only re-evaluated when something they depend on has changed.
+    :param client: An existing client to use instead of creating one from
+        ``access_token``, so that several triagers can share its connection pool and
+        story store. See :py:class:`TriagerGroup`.
+    :param priority: An optional :py:data:`~archie.priorities.Priority` deciding which
+        waiting tasks are processed first. By default, tasks are processed in the order
+        the source provides them.
+    :param aging: How long a waiting task takes to age into the next most urgent
+        priority band.
+    :param task_budget: If set, how long processing a single task may take. Once the
+        budget runs out, the remaining work for the task is cancelled, as if processing
+        it had failed.
+    :param ledger: An optional ledger recording the actions applied to each task, which
+        rules can use to avoid repeating their actions. See :py:meth:`when`.
+    :param executor: An existing pool of workers to process tasks with, so that several
+        triagers can take turns on the same workers. See :py:class:`TriagerGroup`.
     """
 
-    def __init__(self, access_token: str, task_source: TaskSource) -> None:
-        self._client = Client(access_token)
+    def __init__(
+        self,
+        access_token: str,
+        task_source: TaskSource,
+        *,
+        story_store: Optional[StoryStore] = None,
+        mirror: Optional[TaskMirror] = None,
+        track_changes: bool = False,
+        client: Optional[Client] = None,
+        priority: Optional[Priority] = None,
+        aging: EasyTimedelta = "1m",
+        task_budget: Optional[EasyTimedelta] = None,
+        ledger: Optional[ActionLedger] = None,
+        executor: Optional[FairExecutor] = None
+    ) -> None:
+        self._client = client or Client(access_token, story_store=story_store)
+        self._mirror = mirror
         self.task_source = task_source
         self.project = self._client.project_by_gid(task_source.project_gid)
         self._section_to_sorter: MutableMapping[Section, Sorter] = {}
+        # The last known order of each section that's sorted incrementally
+        self._sort_states: Dict[Section, _SortState] = {}
         self._predicate_action_pairs: List[Tuple[Predicate, _TaskToActions]] = []
         self._ignored_predicates: Set[Predicate] = set()
         self._workflows: List[Workflow] = []
+        self._track_changes = track_changes
+        self._triage_changes = ChangeTracker() if track_changes else None
+        self._workflow_changes: Dict[Workflow, ChangeTracker] = {}
+        # The dependencies of every action each rule has produced so far
+        self._action_dependencies: List[Dependencies] = []
+        self._action_dependencies_lock = Lock()
+        # How often each rule may repeat its actions, if it's limited
+        self._repeats: List[Optional[_Repeat]] = []
+        self._ledger = ledger
+        # The follow-up runs queued for each task currently being processed
+        self._in_flight: Dict[str, "OrderedDict[_Job, Task]"] = {}
+        self._in_flight_lock = Lock()
+        # The literal patterns searched for by all rules, compiled when triage starts
+        self._text_matcher: Optional[TextMatcher] = None
+        self._priority = priority
+        self._task_budget = (
+            convert_timedelta(task_budget).total_seconds()
+            if task_budget is not None
+            else None
+        )
+        # The GIDs of tasks whose last run failed, which are retried first
+        self._failed: Set[str] = set()
+        # The priority band of each queued task and when it was queued, by identity
+        self._queued: Dict[int, Tuple[int, float]] = {}
+        self._fair_executor = executor
+        if executor is None and priority is not None:
+            self._fair_executor = FairExecutor(
+                _CONNECTION_POOL_SIZE,
+                _logger,
+                aging=convert_timedelta(aging).total_seconds(),
+            )
 
-    @staticmethod
-    def _executor() -> Executor:
-        return LoggingThreadPoolExecutor()
+    def _executor(self) -> Executor:
+        if self._fair_executor is not None:
+            return self._fair_executor.queue()
+        return LoggingThreadPoolExecutor(max_workers=_CONNECTION_POOL_SIZE)
 
-    def order(self, section_name: str, by: Sorter) -> None:
+    def order(
+        self,
+        section_name: str,
+        by: Sorter,
+        *,
+        full_sort_every: Optional[EasyTimedelta] = None
+    ) -> None:
         """Register that a given section should be sorted with a given sorter.
 
+        By default, every task in the section is fetched and sorted each time the
+        project is sorted. With ``full_sort_every``, the section is instead sorted
+        incrementally in between full sorts: the triager remembers the order it left the
+        section in and the sort key of each task, and only moves the tasks whose key
+        changed, placing each by binary search among the tasks that didn't. Tasks
+        reordered by hand in the meantime aren't put back until the next full sort.
+
         :param section_name: The name of the section to sort.
         :param by: The sorter defining a sort order.
+        :param full_sort_every: If set, how often to sort the whole section, sorting it
+            incrementally in between. Requires a mirror.
         """
-        section = find_by_name(
-            self._client.sections_by_project(self.project), section_name
-        )
+        if full_sort_every is not None and self._mirror is None:
+            raise ValueError("Sorting a section incrementally requires a mirror")
+        section = find_by_name(self._sections(), section_name)
         if section is None:
             _logger.warning(f"{self.project} has no section '{section_name}'")
             return
@@ -66,26 +210,111 @@ class Triager:
             _logger.warning(f"Sorter already defined for {section}")
             return
         self._section_to_sorter[section] = by
+        if full_sort_every is not None:
+            self._sort_states[section] = _SortState(convert_timedelta(full_sort_every))
+
+    def _sections(self) -> List[Section]:
+        if self._mirror is not None:
+            sections = self._mirror.sections(self.project)
+            if sections:
+                return sections
+        return self._client.sections_by_project(self.project)
 
     def sort(self) -> None:
         """Sort the sections in the project with the registered sorters."""
         _logger.info(f"Sorting {self.project.name}")
+        if self._mirror is not None:
+            self._mirror.sync(self._client, self.project)
         with self._executor() as executor:
             for section, sorter in self._section_to_sorter.items():
                 executor.submit(self._sort_section, section, sorter)
 
+    def _tasks_by_section(self, section: Section) -> List[Task]:
+        if self._mirror is None:
+            return self._client.tasks_by_section(section)
+        # The mirror can't tell when tasks are reordered, so the order is fetched fresh
+        order = self._client.task_gids_by_project(self.project)
+        return [
+            task
+            for task in self._mirror.tasks(self.project, order)
+            if any(m.section == section for m in task.memberships)
+        ]
+
     def _sort_section(self, section: Section, sorter: Sorter) -> None:
         _logger.info(f"Sorting {section.name}")
-        tasks = self._client.tasks_by_section(section)
-        sorted_tasks = sorter.sort(tasks)
-        correct_index_for_tasks = [(sorted_tasks.index(task), task) for task in tasks]
-        moves = self._generate_moves(correct_index_for_tasks)
+        state = self._sort_states.get(section)
+        mirror = self._mirror
+        if state is not None and mirror is not None and not state.full_sort_due():
+            moves, order, keys = self._incremental_moves(mirror, section, sorter, state)
+            mode = "incremental"
+        else:
+            tasks = self._tasks_by_section(section)
+            sorted_tasks = sorter.sort(tasks)
+            correct_index = [(sorted_tasks.index(task), task) for task in tasks]
+            moves = self._generate_moves(correct_index)
+            order = [task.gid for task in sorted_tasks]
+            keys = (
+                {task.gid: sorter.key(task) for task in sorted_tasks}
+                if state is not None
+                else {}
+            )
+            mode = "full"
+        metrics.increment("triager.sorts", project=self.project.gid, mode=mode)
+        if state is None:
+            self._reorder(moves)
+        else:
+            full_sorted_at = monotonic() if mode == "full" else state.full_sorted_at
+            # If a move fails, the order of the section is unknown until a full sort
+            state.full_sorted_at = None
+            self._reorder(moves)
+            state.order, state.keys, state.full_sorted_at = order, keys, full_sorted_at
+        _logger.info(f"Finished sorting {section.name}")
+
+    def _reorder(self, moves: List[_Move]) -> None:
         for task, direction, reference in moves:
             self._client.reorder_in_project(task, self.project, reference, direction)
-        _logger.info(f"Finished sorting {section.name}")
+
+    def _incremental_moves(
+        self,
+        mirror: TaskMirror,
+        section: Section,
+        sorter: Sorter,
+        state: _SortState,
+    ) -> Tuple[List[_Move], List[str], Dict[str, Tuple[Any, ...]]]:
+        """Work out the moves to sort a section, given the order it was last left in.
+
+        Every task's key is recomputed from the mirror and compared against the key it
+        was last sorted by, rather than trusting the changes reported by a sync, since
+        something else sharing the mirror may have synced it in the meantime.
+
+        :return: The moves, and the new order and sort keys of the tasks.
+        """
+        tasks = {
+            task.gid: task
+            for task in mirror.tasks(self.project)
+            if any(m.section == section for m in task.memberships)
+        }
+        keys = {gid: sorter.key(task) for gid, task in tasks.items()}
+        # Tasks still in the section whose keys haven't changed stay where they are
+        order = [
+            gid for gid in state.order if gid in tasks and keys[gid] == state.keys[gid]
+        ]
+        in_place = set(order)
+        order_keys = [keys[gid] for gid in order]
+        moves: List[_Move] = []
+        moved = [gid for gid in tasks if gid not in in_place]
+        for gid in sorted(moved, key=keys.__getitem__):
+            index = bisect_right(order_keys, keys[gid])
+            if index > 0:
+                moves.append((tasks[gid], "after", tasks[order[index - 1]]))
+            elif order:
+                moves.append((tasks[gid], "before", tasks[order[0]]))
+            order.insert(index, gid)
+            order_keys.insert(index, keys[gid])
+        return moves, order, keys
 
     @staticmethod
-    def _generate_moves(seq: List[Tuple[int, Task]]) -> List[Tuple[Task, str, Task]]:
+    def _generate_moves(seq: List[Tuple[int, Task]]) -> List[_Move]:
         """Given a list of tasks and their rank, return moves to sort the items.
 
         The generated moves are of the form "move (task) to be (before/after)
@@ -96,7 +325,7 @@ class Triager:
         :param seq: A list of (rank, task) tuples.
         :return: A list of moves that transform the input into the desired order.
         """
-        moves: List[Tuple[Task, str, Task]] = []
+        moves: List[_Move] = []
         output = seq[:1]
         for elem in seq[1:]:
             index = bisect_left(output, elem)
@@ -115,54 +344,452 @@ class Triager:
         """
         self._ignored_predicates.add(predicate)
 
-    def when(self, predicate: Predicate) -> Callable[[_TaskToActions], _TaskToActions]:
+    def when(
+        self,
+        predicate: Predicate,
+        *,
+        once: bool = False,
+        every: Optional[EasyTimedelta] = None,
+        name: Optional[str] = None
+    ) -> Callable[[_TaskToActions], _TaskToActions]:
         """Map a predicate to a function that will return actions to apply to a task.
 
+        By default, the actions are applied every time a task matches the predicate.
+        With a ledger, a rule can instead apply each action to a task only ``once``, or
+        at most ``every`` so often. The ledger is checked before applying each action,
+        without any requests to the API.
+
         :param predicate: The predicate to match tasks against.
+        :param once: Whether to apply each action to a task only once. Requires a
+            ledger.
+        :param every: If set, the shortest time between applying the same action to the
+            same task. Requires a ledger.
+        :param name: The name of the rule in the ledger. Defaults to the qualified name
+            of the decorated function, so it must be given for lambdas, and should stay
+            the same between runs.
         :return: decorator to apply to a function that will return actions for tasks
             matching the predicate.
         """
+        if once and every is not None:
+            raise ValueError("A rule can't be limited to both once and every")
+        ledger = self._ledger
+        limited = once or every is not None
+        if limited and ledger is None:
+            raise ValueError("Limiting how often a rule applies requires a ledger")
 
         def register(action: _TaskToActions) -> _TaskToActions:
             self._predicate_action_pairs.append((predicate, action))
+            self._action_dependencies.append(NOTHING)
+            repeat = None
+            if ledger is not None and limited:
+                rule = name or f"{action.__module__}.{action.__qualname__}"
+                interval = convert_timedelta(every) if every is not None else None
+                repeat = _Repeat(ledger, rule, interval)
+            self._repeats.append(repeat)
             return action
 
         return register
 
-    def apply(self, workflow: Workflow) -> None:
-        """Apply a multi-stage workflow to tasks in the project.
+    def apply(self, *workflows: Workflow) -> None:
+        """Apply multi-stage workflows to tasks in the project.
+
+        The tasks are fetched once for all of the workflows, and the workflows are
+        applied to each task one after another in the same worker, so that they share
+        the task's stories and see each other's writes.
 
-        :param workflow: The workflow to apply to the tasks.
+        :param workflows: The workflows to apply to the tasks.
         """
-        iterator = self.task_source.iterator(self._client)
-        with self._executor() as executor:
-            for task in iterator:
-                executor.submit(workflow, task, self._client)
+        self._process(self._apply_workflows, self._with_trackers(workflows))
 
     def triage(self) -> None:
         """Triage tasks in the project according to the registered predicates/actions.
         """
         _logger.info(f"Triaging {self.project.name}")
+        self._text_matcher = self._compile_text_patterns()
+        self._process(self._triage_task)
+
+    def run(self, *workflows: Workflow) -> None:
+        """Triage tasks, apply workflows to them, then sort the project.
+
+        This is equivalent to calling :py:meth:`triage`, :py:meth:`apply` and
+        :py:meth:`sort` in turn, except that the tasks are only fetched once. The
+        registered rules and the workflows are checked against each task in the same
+        worker, so they share the task's stories, and workflows see the writes made by
+        the rules.
+
+        :param workflows: The workflows to apply to the tasks.
+        """
+        _logger.info(f"Triaging {self.project.name}")
+        self._text_matcher = self._compile_text_patterns()
+        self._process(self._run_task, self._with_trackers(workflows))
+        self.sort()
+
+    def _with_trackers(self, workflows: Tuple[Workflow, ...]) -> _Workflows:
+        if not self._track_changes:
+            return tuple((workflow, None) for workflow in workflows)
+        return tuple(
+            (workflow, self._workflow_changes.setdefault(workflow, ChangeTracker()))
+            for workflow in workflows
+        )
+
+    def _process(self, fn: Callable[..., None], *args: Any) -> None:
         iterator = self.task_source.iterator(self._client)
         with self._executor() as executor:
             for task in iterator:
-                executor.submit(self._triage_task, task)
+                self._submit(executor, task, fn, *args)
+
+    def _apply_workflows(self, workflows: _Workflows, task: Task) -> None:
+        with task_pass(task, budget=self._task_budget):
+            records: _Records = []
+            at = self._apply_workflows_in_pass(workflows, task, records)
+            self._finish_pass(task, records, at)
+
+    def _run_task(self, workflows: _Workflows, task: Task) -> None:
+        with task_pass(task, self._text_matcher, self._task_budget):
+            records: _Records = []
+            changes = [
+                self._triage_task_in_pass(task, records),
+                self._apply_workflows_in_pass(workflows, task, records),
+            ]
+            self._finish_pass(task, records, min(filter(None, changes), default=None))
+
+    def _finish_pass(
+        self, task: Task, records: _Records, at: Optional[datetime]
+    ) -> None:
+        # Snapshots are only recorded once the writes they include have been made
+        flush_writes(task)
+        for tracker, view in records:
+            tracker.record(view)
+        self._schedule_wakeup(task, at)
+
+    def _apply_workflows_in_pass(
+        self, workflows: _Workflows, task: Task, records: _Records
+    ) -> Optional[datetime]:
+        """Apply workflows to a task within its pass.
+
+        :return: When the task may next change for any of the workflows applied.
+        """
+        applied: List[Workflow] = []
+        for workflow, tracker in workflows:
+            # Writes by the rules or earlier workflows count as changes too
+            view = current_view(task)
+            change = tracker.change(view) if tracker is not None else None
+            if not workflow.dependencies().affected_by(change):
+                _logger.debug(f"{task} hasn't changed for {workflow}, skipping")
+                continue
+            workflow(task, self._client)
+            applied.append(workflow)
+            if tracker is not None:
+                # Writes by later workflows are changes this one hasn't seen yet
+                records.append((tracker, current_view(task)))
+        view = current_view(task)
+        changes = [workflow.next_change(view, self._client) for workflow in applied]
+        return min(filter(None, changes), default=None)
+
+    def _submit(
+        self, executor: Executor, task: Task, fn: Callable[..., None], *args: Any
+    ) -> None:
+        """Submit a task to be processed, unless it's already being processed.
+
+        If the task is already being processed, a single follow-up run is queued
+        instead, using the latest version of the task. The follow-up runs in the same
+        worker as soon as the current run finishes, so a task is never processed by two
+        workers at once. Each task is acknowledged to the task source once it has been
+        processed, or once a newer version has replaced it as the follow-up.
+
+        If the executor supports priorities, the task is submitted in its priority
+        band, or the most urgent band if its previous run failed.
+
+        :param executor: The executor to submit the task to.
+        :param task: The task to process.
+        :param fn: The function to process the task with, which is given ``args``
+            followed by the task.
+        :param args: Arguments to pass to ``fn`` before the task.
+        """
+        job: _Job = (fn, args)
+        band = self._band(task)
+        with self._in_flight_lock:
+            self._queued[id(task)] = band, monotonic()
+            follow_ups = self._in_flight.get(task.gid)
+            replaced = None
+            if follow_ups is not None:
+                _logger.debug(f"{task} is already being processed, queueing follow-up")
+                replaced = follow_ups.get(job)
+                if replaced is not None:
+                    del self._queued[id(replaced)]
+                follow_ups[job] = task
+                metrics.increment("triager.coalesced", project=self.project.gid)
+            else:
+                self._in_flight[task.gid] = OrderedDict()
+        if follow_ups is None and isinstance(executor, FairQueue):
+            executor.submit_with_priority(band, self._run_coalesced, job, task)
+        elif follow_ups is None:
+            executor.submit(self._run_coalesced, job, task)
+        elif replaced is not None:
+            # The older version will never be processed, since the newer one supersedes
+            self.task_source.ack(replaced)
+
+    def _band(self, task: Task) -> int:
+        if task.gid in self._failed or self._priority is None:
+            return 0
+        return self._priority(task)
+
+    def _run_coalesced(self, job: _Job, task: Task) -> None:
+        while True:
+            fn, args = job
+            failed = False
+            try:
+                fn(*args, task)
+            except TaskBudgetExceeded:
+                _logger.warning(f"Ran out of time processing {task}, cancelling")
+                metrics.increment("triager.budget_exceeded", project=self.project.gid)
+                failed = True
+            except Exception:
+                # Errors are logged here rather than by the executor so that follow-ups
+                # still run
+                _logger.error(f"Exception encountered processing {task}", exc_info=True)
+                failed = True
+            self.task_source.ack(task, failed=failed)
+            with self._in_flight_lock:
+                self._queued.pop(id(task), None)
+                if failed:
+                    self._failed.add(task.gid)
+                else:
+                    self._failed.discard(task.gid)
+                follow_ups = self._in_flight[task.gid]
+                if not follow_ups:
+                    del self._in_flight[task.gid]
+                    return
+                job, task = follow_ups.popitem(last=False)
+
+    def _compile_text_patterns(self) -> Optional[TextMatcher]:
+        predicates = [
+            *self._ignored_predicates,
+            *(pred for pred, _ in self._predicate_action_pairs),
+        ]
+        patterns = set().union(*map(text_patterns, predicates))
+        # Fewer patterns are quicker to search for one at a time
+        return TextMatcher(patterns) if len(patterns) >= MIN_PATTERNS else None
 
     def _triage_task(self, task: Task) -> None:
+        with task_pass(task, self._text_matcher, self._task_budget):
+            records: _Records = []
+            at = self._triage_task_in_pass(task, records)
+            self._finish_pass(task, records, at)
+
+    def _triage_task_in_pass(self, task: Task, records: _Records) -> Optional[datetime]:
+        """Triage a task within its pass.
+
+        :return: When the task may next change for any of the rules checked.
+        """
+        tracker = self._triage_changes
+        change = tracker.change(task) if tracker is not None else None
+        rules = self._affected_rules(change)
+        self._triage_rules(task, rules)
+        # Later checks see the writes made by the rules, without fetching the task
+        view = current_view(task)
+        predicates = [*self._ignored_predicates]
+        predicates.extend(self._predicate_action_pairs[index][0] for index in rules)
+        changes = [pred.next_change(view, self._client) for pred in predicates]
+        if tracker is not None:
+            records.append((tracker, view))
+        return min(filter(None, changes), default=None)
+
+    def _triage_rules(self, task: Task, rules: List[int]) -> None:
+        if not rules:
+            _logger.debug(f"{task} hasn't changed for any rule, skipping")
+            return
+
         ignored = find(self._ignored_predicates, lambda pred: pred(task, self._client))
         if ignored is not None:
             _logger.debug(f"{task} passed ignored predicate {ignored}, skipping")
             return
 
-        actions = [
-            action
-            for predicate, create_action in self._predicate_action_pairs
-            if predicate(task, self._client)
-            for action in create_action(task)
-        ]
+        actions: List[Tuple[Action, Optional[_Repeat]]] = []
+        for index in rules:
+            predicate, create_action = self._predicate_action_pairs[index]
+            if predicate(task, self._client):
+                rule_actions = create_action(task)
+                self._add_action_dependencies(index, rule_actions)
+                repeat = self._repeats[index]
+                actions.extend((action, repeat) for action in rule_actions)
 
         self._apply_actions(task, actions)
 
-    def _apply_actions(self, task: Task, actions: List[Action]) -> None:
-        for action in actions:
-            action(task, self._client)
+    def _schedule_wakeup(self, task: Task, at: Optional[datetime]) -> None:
+        if at is not None:
+            _logger.debug(f"{task} may change at {at}, scheduling a wakeup")
+            self.task_source.schedule_wakeup(task, at)
+
+    def _affected_rules(self, change: Optional[TaskChange]) -> List[int]:
+        indices = range(len(self._predicate_action_pairs))
+        if change is None:
+            return list(indices)
+        # If a task stops being ignored, every rule must be checked, not just changed
+        # ones
+        if any(
+            pred.dependencies().affected_by(change) for pred in self._ignored_predicates
+        ):
+            return list(indices)
+        return [
+            index
+            for index in indices
+            if (
+                self._predicate_action_pairs[index][0].dependencies()
+                | self._action_dependencies[index]
+            ).affected_by(change)
+        ]
+
+    def _add_action_dependencies(self, index: int, actions: List[Action]) -> None:
+        with self._action_dependencies_lock:
+            for action in actions:
+                self._action_dependencies[index] |= action.dependencies()
+
+    def _apply_actions(
+        self, task: Task, actions: List[Tuple[Action, Optional[_Repeat]]]
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        for action, repeat in actions:
+            if repeat is not None and self._too_soon(task, action, repeat, now):
+                _logger.debug(f"{action} was already applied to {task}, skipping")
+                metrics.increment(
+                    "triager.actions_suppressed", project=self.project.gid
+                )
+                continue
+            action(current_view(task), self._client)
+            if repeat is not None:
+                repeat.ledger.record(task.gid, repeat.rule, str(action), now)
+            self._record_first_action(task)
+
+    @staticmethod
+    def _too_soon(task: Task, action: Action, repeat: _Repeat, now: datetime) -> bool:
+        last = repeat.ledger.last_applied(task.gid, repeat.rule, str(action))
+        if last is None:
+            return False
+        return repeat.every is None or now - last < repeat.every
+
+    def _record_first_action(self, task: Task) -> None:
+        with self._in_flight_lock:
+            queued = self._queued.pop(id(task), None)
+        if queued is not None:
+            band, queued_at = queued
+            metrics.observe(
+                "triager.time_to_first_action_seconds",
+                monotonic() - queued_at,
+                project=self.project.gid,
+                band=str(band),
+            )
+
+
+class TriagerGroup:
+    """A group of triagers for many projects that share their resources.
+
+    Running a separate :py:class:`Triager` for each project gives each its own client,
+    connection pool and worker threads. Triagers added to a group instead share a
+    single client, and with it a connection pool, rate limit and story store, along with
+    a single pool of workers. Workers take tasks from each project in turn, so a project
+    with many tasks to process doesn't hold up the others.
+
+    :param access_token: Credentials to access the Asana API.
+    :param story_store: An optional store used to cache stories between fetches.
+    :param mirror: An optional local mirror of the projects' tasks.
+    :param requests_per_minute: If set, the maximum rate of requests across all
+        projects.
+    :param max_workers: The number of tasks that may be processed at once across all
+        projects. Defaults to the size of the client's connection pool.
+    :param aging: How long a waiting task takes to age into the next most urgent
+        priority band, for projects with a priority.
+    :param ledger: An optional ledger recording the actions applied to tasks in every
+        project.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        story_store: Optional[StoryStore] = None,
+        mirror: Optional[TaskMirror] = None,
+        requests_per_minute: Optional[float] = None,
+        max_workers: int = _CONNECTION_POOL_SIZE,
+        aging: EasyTimedelta = "1m",
+        ledger: Optional[ActionLedger] = None
+    ) -> None:
+        self._access_token = access_token
+        self._client = Client(
+            access_token,
+            story_store=story_store,
+            requests_per_minute=requests_per_minute,
+        )
+        self._mirror = mirror
+        self._ledger = ledger
+        self._executor = FairExecutor(
+            max_workers, _logger, aging=convert_timedelta(aging).total_seconds()
+        )
+        self.triagers: List[Triager] = []
+
+    def add(
+        self,
+        task_source: TaskSource,
+        *,
+        track_changes: bool = False,
+        priority: Optional[Priority] = None,
+        task_budget: Optional[EasyTimedelta] = None
+    ) -> Triager:
+        """Add a project to the group.
+
+        Rules, workflows and sorters are registered on the returned triager as usual.
+
+        :param task_source: A source to provide tasks from the project.
+        :param track_changes: Whether the triager should track changes to tasks.
+        :param priority: An optional priority deciding which of the project's waiting
+            tasks are processed first.
+        :param task_budget: If set, how long processing a single task may take.
+        :return: The triager for the project.
+        """
+        triager = Triager(
+            self._access_token,
+            task_source,
+            mirror=self._mirror,
+            track_changes=track_changes,
+            client=self._client,
+            priority=priority,
+            task_budget=task_budget,
+            ledger=self._ledger,
+            executor=self._executor,
+        )
+        self.triagers.append(triager)
+        return triager
+
+    def triage(self) -> None:
+        """Triage every project at once, returning once all have finished."""
+        self._run(Triager.triage)
+
+    def apply(self, *workflows: Workflow) -> None:
+        """Apply workflows to every project at once, returning once all have finished.
+
+        :param workflows: The workflows to apply to the tasks of every project.
+        """
+        self._run(lambda triager: triager.apply(*workflows))
+
+    def sort(self) -> None:
+        """Sort every project at once, returning once all have finished."""
+        self._run(Triager.sort)
+
+    def run(self, *workflows: Workflow) -> None:
+        """Triage, apply workflows to and sort every project at once.
+
+        Each project is run as with :py:meth:`Triager.run`, returning once all have
+        finished.
+
+        :param workflows: The workflows to apply to the tasks of every project.
+        """
+        self._run(lambda triager: triager.run(*workflows))
+
+    def _run(self, method: Callable[[Triager], None]) -> None:
+        # Each triager draws from its source in its own thread, which spends most of its
+        # time waiting, while the shared workers do the actual processing
+        with LoggingThreadPoolExecutor(
+            _logger, max_workers=len(self.triagers) or 1
+        ) as feeders:
+            for triager in self.triagers:
+                feeders.submit(method, triager)
@@ -1,10 +1,12 @@
-from typing import List, Optional, Tuple, Union
+from typing import List, Mapping, Optional, Tuple, Union
 
 import attr
 
-from archie._itertools import find_by_name
+from archie._itertools import find_by_name, index_by_name
+from archie._writes import skip_write
 from archie.asana.client import Client
 from archie.asana.models import CustomField, EnumOption, Task
+from archie.dependencies import Dependencies
 from archie.workflows.workflow import (
     Workflow,
     WorkflowGetStageContext,
@@ -19,11 +21,12 @@ class _EnumCustomFieldWorkflowGetStageContext(WorkflowGetStageContext):
     """Get context for a custom field-powered workflow.
 
     :ivar CustomField custom_field: The relevant custom field from the task.
-    :ivar List[EnumOption] enum_options: The enum options from that custom field.
+    :ivar Mapping[str,EnumOption] enum_options: The enum options from that custom
+        field, by name.
     """
 
     custom_field: CustomField
-    enum_options: List[EnumOption]
+    enum_options: Mapping[str, EnumOption]
 
 
 @attr.s(auto_attribs=True, frozen=True)
@@ -48,13 +51,16 @@ class _EnumCustomFieldWorkflowStageManager(
     This stage manager reads/writes the state of the workflow to a particular enum
     custom field on the task.
 
+    Enum options are resolved by name from the task's own copy of the custom field, so
+    they're always as fresh as the task.
+
     :param name: The name of the custom field to read/write.
     :param stages: The list of stages for the workflow.
     """
 
     def __init__(self, name: str, stages: List[WorkflowStage]):
         self._name = name
-        self._stages = stages
+        self._stages = index_by_name(stages)
 
     def get_current_stage(
         self, task: Task
@@ -65,13 +71,14 @@ class _EnumCustomFieldWorkflowStageManager(
         if custom_field is None or custom_field.enum_options is None:
             return f"Unable to find enum custom field '{self._name}'"
         context = _EnumCustomFieldWorkflowGetStageContext(
-            custom_field=custom_field, enum_options=custom_field.enum_options
+            custom_field=custom_field,
+            enum_options=index_by_name(custom_field.enum_options),
         )
         if custom_field.enum_value is None:
             stage = None
         else:
             stage_name = custom_field.enum_value.name
-            stage = find_by_name(self._stages, stage_name)
+            stage = self._stages.get(stage_name)
             if stage is None:
                 return f"Unable to find stage '{stage_name}'"
         return stage, context
@@ -82,7 +89,7 @@ class _EnumCustomFieldWorkflowStageManager(
         client: Client,
         context: _EnumCustomFieldWorkflowGetStageContext,
     ) -> Union[_EnumCustomFieldWorkflowSetStageContext, str]:
-        enum_option = find_by_name(context.enum_options, stage.name)
+        enum_option = context.enum_options.get(stage.name)
         if enum_option is None:
             return f"Unable to find enum option '{stage.name}'"
         return _EnumCustomFieldWorkflowSetStageContext(
@@ -95,8 +102,14 @@ class _EnumCustomFieldWorkflowStageManager(
         client: Client,
         context: _EnumCustomFieldWorkflowSetStageContext,
     ) -> None:
+        if context.custom_field.enum_value == context.enum_option:
+            skip_write(task, "EnumCustomFieldWorkflow")
+            return
         client.set_enum_custom_field(task, context.custom_field, context.enum_option)
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"custom_fields"})
+
 
 class EnumCustomFieldWorkflow(
     Workflow[
@@ -2,9 +2,11 @@ from typing import List, Mapping, Optional, Tuple, Union
 
 import attr
 
-from archie._itertools import find_by_name
+from archie._itertools import index_by_name
+from archie._writes import skip_write
 from archie.asana.client import Client
 from archie.asana.models import External, Task
+from archie.dependencies import Dependencies
 from archie.workflows.workflow import (
     Workflow,
     WorkflowGetStageContext,
@@ -29,11 +31,9 @@ class _ExternalDataWorkflowGetStageContext(WorkflowGetStageContext):
 class _ExternalDataWorkflowSetStageContext(WorkflowSetStageContext):
     """Set context for an external data-powered workflow.
 
-    :ivar Mapping[str,str] workflows: The map of workflow names to stage names.
+    :ivar str stage_name: The name of the stage to record on the task.
     """
 
-    external: External
-    workflows: Mapping[str, str]
     stage_name: str
 
 
@@ -54,7 +54,7 @@ class _ExternalDataWorkflowStageManager(
 
     def __init__(self, name: str, stages: List[WorkflowStage]) -> None:
         self._name = name
-        self._stages = stages
+        self._stages = index_by_name(stages)
 
     def get_current_stage(
         self, task: Task
@@ -63,7 +63,7 @@ class _ExternalDataWorkflowStageManager(
         workflows = (external.data or {}).get("workflows", {})
         stage_name = workflows.get(self._name)
         return (
-            find_by_name(self._stages, stage_name),
+            self._stages.get(stage_name),
             _ExternalDataWorkflowGetStageContext(external, workflows),
         )
 
@@ -73,20 +73,28 @@ class _ExternalDataWorkflowStageManager(
         client: Client,
         context: _ExternalDataWorkflowGetStageContext,
     ) -> Union[_ExternalDataWorkflowSetStageContext, str]:
-        return _ExternalDataWorkflowSetStageContext(
-            context.external, context.workflows, stage.name
-        )
+        return _ExternalDataWorkflowSetStageContext(stage.name)
 
     def set_stage(
         self, task: Task, client: Client, context: _ExternalDataWorkflowSetStageContext
     ) -> None:
+        # The stage is merged into the external data as it is now, rather than as it was
+        # when the stage was read, so that it keeps any writes made since
+        external = task.external or External(None, {})
+        data = external.data or {}
         new_external_data = {
-            **(context.external.data or {}),
-            "workflows": {**context.workflows, self._name: context.stage_name},
+            **data,
+            "workflows": {**data.get("workflows", {}), self._name: context.stage_name},
         }
-        new_external = External(context.external.gid, new_external_data)
+        new_external = External(external.gid, new_external_data)
+        if new_external == task.external:
+            skip_write(task, "ExternalDataWorkflow")
+            return
         client.set_external(task, new_external)
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"external"})
+
 
 class ExternalDataWorkflow(
     Workflow[_ExternalDataWorkflowGetStageContext, _ExternalDataWorkflowSetStageContext]
@@ -1,10 +1,15 @@
-from typing import List, Optional, Tuple, Union
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple, Union
 
 import attr
 
-from archie._itertools import find_by_name, first_or_none
+from archie._easy_timedelta import EasyTimedelta, convert_timedelta
+from archie._itertools import first_or_none, index_by_name
+from archie._ttl_cache import TTLCache
+from archie._writes import skip_write
 from archie.asana.client import Client
 from archie.asana.models import Project, Section, Task
+from archie.dependencies import Dependencies
 from archie.workflows.workflow import (
     Workflow,
     WorkflowGetStageContext,
@@ -44,13 +49,26 @@ class _SectionWorkflowStageManager(
     This stage manager reads the state of the workflow from the name of the section the
     task is in, and writes is by moving the task to the section with the matching name.
 
+    Stage names are resolved to sections once per project, and resolved again once
+    ``refresh_every`` has passed, so that advancing a task doesn't need to fetch the
+    project's sections. A stage with no matching section fetches the sections again
+    straight away, in case the section was added or renamed in the meantime.
+
     :param project_name: The name of the project whose sections should be used.
     :param stages: The list of stages for the workflow.
+    :param refresh_every: How long resolved sections are used before fetching them
+        again.
     """
 
-    def __init__(self, project_name: str, stages: List[WorkflowStage]):
+    def __init__(
+        self,
+        project_name: str,
+        stages: List[WorkflowStage],
+        refresh_every: timedelta = timedelta(minutes=10),
+    ):
         self._project_name = project_name
-        self._stages = stages
+        self._stages = index_by_name(stages)
+        self._sections: TTLCache[str, Dict[str, Section]] = TTLCache(refresh_every)
 
     def get_current_stage(
         self, task: Task
@@ -61,7 +79,7 @@ class _SectionWorkflowStageManager(
         if membership is None:
             return f"Unable to find membership in '{self._project_name}'"
         context = _SectionWorkflowGetStageContext(membership.project)
-        return find_by_name(self._stages, membership.section.name), context
+        return self._stages.get(membership.section.name), context
 
     def can_set_stage(
         self,
@@ -69,17 +87,34 @@ class _SectionWorkflowStageManager(
         client: Client,
         context: _SectionWorkflowGetStageContext,
     ) -> Union[_SectionWorkflowSetStageContext, str]:
-        sections = client.sections_by_project(context.project)
-        new_section = find_by_name(sections, stage.name)
+        new_section = self._section(client, context.project, stage.name)
+        if new_section is None:
+            # The section may have been added or renamed since the sections were cached
+            self._sections.invalidate(context.project.gid)
+            new_section = self._section(client, context.project, stage.name)
         if new_section is None:
             return f"Unable to find section '{stage.name}' in '{self._project_name}'"
         return _SectionWorkflowSetStageContext(new_section)
 
+    def _section(
+        self, client: Client, project: Project, name: str
+    ) -> Optional[Section]:
+        sections = self._sections.get(
+            project.gid, lambda: index_by_name(client.sections_by_project(project))
+        )
+        return sections.get(name)
+
     def set_stage(
         self, task: Task, client: Client, context: _SectionWorkflowSetStageContext
     ) -> None:
+        if any(m.section == context.section for m in task.memberships):
+            skip_write(task, "SectionWorkflow")
+            return
         client.add_to_section(task, context.section)
 
+    def dependencies(self) -> Dependencies:
+        return Dependencies(fields={"memberships"})
+
 
 class SectionWorkflow(
     Workflow[_SectionWorkflowGetStageContext, _SectionWorkflowSetStageContext]
@@ -91,8 +126,18 @@ class SectionWorkflow(
 
     :param project_name: The name of the project the task is moving through.
     :param stages: The list of stages for the workflow.
+    :param refresh_every: How long the project's sections are cached for. The sections
+        are fetched again sooner if a stage has no matching section.
     """
 
-    def __init__(self, project_name: str, stages: List[WorkflowStage]) -> None:
-        manager = _SectionWorkflowStageManager(project_name, stages)
+    def __init__(
+        self,
+        project_name: str,
+        stages: List[WorkflowStage],
+        *,
+        refresh_every: EasyTimedelta = "10m",
+    ) -> None:
+        manager = _SectionWorkflowStageManager(
+            project_name, stages, convert_timedelta(refresh_every)
+        )
         super().__init__(project_name, stages, manager)
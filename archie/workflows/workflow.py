@@ -1,12 +1,16 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, Tuple, TypeVar, Union
+from datetime import datetime
+from functools import reduce
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar, Union
 
 import attr
 
+from archie._task_pass import current_view
 from archie.actions import Action
 from archie.asana.client import Client
 from archie.asana.models import Task
+from archie.dependencies import EVERYTHING, Dependencies
 from archie.predicates import Predicate
 
 _logger = logging.getLogger(__name__)
@@ -26,6 +30,14 @@ class WorkflowStage:
     to_enter: Predicate
     on_enter: List[Action] = attr.ib(factory=list)
 
+    def dependencies(self) -> Dependencies:
+        """Return the parts of a task read to enter this stage."""
+        return reduce(
+            Dependencies.__or__,
+            (action.dependencies() for action in self.on_enter),
+            self.to_enter.dependencies(),
+        )
+
 
 class WorkflowGetStageContext(ABC):
     """Context that should be carried into the ``_WorkflowStageManager.can_set_stage``
@@ -109,6 +121,15 @@ class WorkflowStageManager(ABC, Generic[_GSC, _SSC]):
         """
         pass
 
+    def dependencies(self) -> Dependencies:
+        """Return the parts of a task read to get the current stage.
+
+        Stage managers that don't override this are assumed to read the entire task.
+
+        :return: The dependencies of this stage manager.
+        """
+        return EVERYTHING
+
 
 class Workflow(Generic[_GSC, _SSC]):
     """A multi-stage sequential workflow.
@@ -132,6 +153,11 @@ class Workflow(Generic[_GSC, _SSC]):
     ) -> None:
         self._name = name
         self._stages = stages
+        # The index of each stage, by identity, so that finding the next stage doesn't
+        # compare stages in full
+        self._indices: Dict[int, int] = {}
+        for index, stage in enumerate(stages):
+            self._indices.setdefault(id(stage), index)
         self._stage_manager = stage_manager
         self._logger = logging.getLogger(f"{self.__module__}.{self}")
 
@@ -147,7 +173,9 @@ class Workflow(Generic[_GSC, _SSC]):
         :param task: The task moving through this workflow.
         :param client: A client to use to apply this workflow.
         """
-        result_or_warning = self._stage_manager.get_current_stage(task)
+        # Earlier rules and workflows may have written to the task, if it's in a pass
+        view = current_view(task)
+        result_or_warning = self._stage_manager.get_current_stage(view)
         # If we can't map the task to stages, return
         if isinstance(result_or_warning, str):
             self._logger.warning(result_or_warning)
@@ -159,7 +187,7 @@ class Workflow(Generic[_GSC, _SSC]):
         else:
             next_stage = self._stages[0]
         actions = []
-        while next_stage is not None and next_stage.to_enter(task, client):
+        while next_stage is not None and next_stage.to_enter(view, client):
             actions.extend(next_stage.on_enter)
             current_stage, next_stage = next_stage, self._next_stage(next_stage)
         # If we aren't advancing the stage, return
@@ -172,9 +200,31 @@ class Workflow(Generic[_GSC, _SSC]):
         if isinstance(set_stage_context_or_warning, str):
             self._logger.warning(set_stage_context_or_warning)
             return
+        # Each write sees the writes before it, if the task is being processed in a pass
         for action in actions:
-            action(task, client)
-        self._stage_manager.set_stage(task, client, set_stage_context_or_warning)
+            action(current_view(task), client)
+        self._stage_manager.set_stage(
+            current_view(task), client, set_stage_context_or_warning
+        )
+
+    def dependencies(self) -> Dependencies:
+        """Return the parts of a task read to advance it through this workflow."""
+        return reduce(
+            Dependencies.__or__,
+            (stage.dependencies() for stage in self._stages),
+            self._stage_manager.dependencies(),
+        )
+
+    def next_change(self, task: Task, client: Client) -> Optional[datetime]:
+        """Return the next time a task could enter a different stage without changing.
+
+        :param task: The task being advanced through the workflow.
+        :param client: A client to access the Asana API for additional data.
+        :return: The earliest time any stage's predicate could change, if any.
+        """
+        view = current_view(task)
+        changes = [stage.to_enter.next_change(view, client) for stage in self._stages]
+        return min(filter(None, changes), default=None)
 
     def _next_stage(self, stage: WorkflowStage) -> Optional[WorkflowStage]:
         """Given the current stage, determine the next stage in the sequence.
@@ -187,7 +237,11 @@ class Workflow(Generic[_GSC, _SSC]):
         :return: The next stage the task should move into, or ``None`` if it cannot
             advance any farther.
         """
-        next_index = self._stages.index(stage) + 1
+        index = self._indices.get(id(stage))
+        if index is None:
+            # Stage managers may return an equal copy of one of the stages
+            index = self._stages.index(stage)
+        next_index = index + 1
         if not next_index < len(self._stages):
             return None
         return self._stages[next_index]
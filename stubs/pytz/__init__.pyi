@@ -0,0 +1,10 @@
+from datetime import datetime, timedelta, tzinfo
+from typing import Optional
+
+class BaseTzInfo(tzinfo):
+    def localize(self, dt: datetime, is_dst: bool = False) -> datetime: ...
+    def utcoffset(self, dt: Optional[datetime]) -> Optional[timedelta]: ...
+    def dst(self, dt: Optional[datetime]) -> Optional[timedelta]: ...
+    def tzname(self, dt: Optional[datetime]) -> Optional[str]: ...
+
+def timezone(zone: str) -> BaseTzInfo: ...
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime
 from test import fixtures as f
-from typing import Any
+from threading import Event
+from typing import Any, Callable, List, Optional
 from unittest import TestCase
-from unittest.mock import Mock, create_autospec, patch
+from unittest.mock import Mock, call, create_autospec, patch
 
+import attr
 from asana import resources  # type: ignore
-
-from archie.asana.client import Client
-from archie.asana.models import Task
+from asana.error import InvalidRequestError  # type: ignore
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+
+from archie._task_pass import TaskBudgetExceeded, current_view, task_pass
+from archie.asana._concurrency import ConcurrencyLimiter
+from archie.asana._hedging import HedgeBudget
+from archie.asana._story_index import StoryIndex
+from archie.asana.client import (
+    _CONNECTION_POOL_SIZE,
+    Client,
+    RetryPolicy,
+    _ThrottledAdapter,
+)
+from archie.asana.models import Story, Task
+from archie.asana.story_store import StoryLog, StoryStore
+from archie.metrics import metrics
+from archie.polling import RequestBudget
 
 
 class ListMatcher:
@@ -32,6 +49,221 @@ class TestCaseWithClient(TestCase):
         self.client = Client(access_token="token")
 
 
+class TestThrottling(TestCase):
+    @patch("archie.asana.client.AsanaClient")
+    def test_mount(self, asana_client_mock: Mock) -> None:
+        session = asana_client_mock.access_token.return_value.session
+        Client(access_token="token", requests_per_minute=60)
+        adapter = session.mount.call_args[0][1]
+        self.assertIsInstance(adapter, _ThrottledAdapter)
+        self.assertEqual(adapter.budget.polls_per_minute, 60)
+        self.assertEqual(adapter.limiter.maximum, _CONNECTION_POOL_SIZE)
+        self.assertEqual(adapter.timeout, (10, 60))
+        self.assertEqual(adapter.retry_policy, RetryPolicy())
+
+        policy = RetryPolicy(max_retries=1)
+        Client(
+            access_token="token",
+            adaptive_concurrency=False,
+            timeout=(1, 2),
+            retry_policy=policy,
+        )
+        adapter = session.mount.call_args[0][1]
+        self.assertIsNone(adapter.budget)
+        self.assertIsNone(adapter.limiter)
+        self.assertEqual(adapter.timeout, (1, 2))
+        self.assertIs(adapter.retry_policy, policy)
+        # The adapter retries requests instead of the Asana client
+        options = asana_client_mock.access_token.return_value.options
+        options.update.assert_called_with(max_retries=0)
+
+    @patch("archie.asana.client.sleep")
+    @patch("archie.asana.client.HTTPAdapter.send")
+    def test_budget(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        adapter = _ThrottledAdapter(RequestBudget(60), None)
+        request = Mock()
+        send_mock.return_value = Mock(status_code=200)
+        adapter.send(request, timeout=None)
+        adapter.send(request, timeout=None)
+        send_mock.assert_called_with(request, timeout=(10, 60))
+        self.assertEqual(send_mock.call_count, 2)
+        # The second request waits for the first's share of the budget to pass
+        self.assertAlmostEqual(sleep_mock.call_args_list[1][0][0], 1, places=1)
+
+    @patch("archie.asana.client.HTTPAdapter.send")
+    def test_limiter(self, send_mock: Mock) -> None:
+        limiter = create_autospec(ConcurrencyLimiter, instance=True)
+        adapter = _ThrottledAdapter(None, limiter, retry_policy=RetryPolicy(0))
+        request = Mock()
+        for status_code, overloaded in [(200, False), (429, True), (503, True)]:
+            with self.subTest(status_code=status_code):
+                send_mock.return_value = Mock(status_code=status_code)
+                self.assertIs(adapter.send(request), send_mock.return_value)
+                self.assertIs(limiter.release.call_args[1]["overloaded"], overloaded)
+        send_mock.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            adapter.send(request)
+        self.assertIs(limiter.release.call_args[1]["overloaded"], True)
+        self.assertEqual(limiter.acquire.call_count, 4)
+
+
+@patch("archie.asana.client.sleep")
+@patch("archie.asana.client.HTTPAdapter.send")
+class TestRetries(TestCase):
+    def setUp(self) -> None:
+        self.adapter = _ThrottledAdapter(
+            None, None, retry_policy=RetryPolicy(max_retries=2, base_delay=1)
+        )
+        self.get = Mock(method="GET", url="https://app.asana.com/api/1.0/tasks/1")
+        self.post = Mock(method="POST", url="https://app.asana.com/api/1.0/tasks")
+
+    def test_policy(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        policy = RetryPolicy(base_delay=1, max_delay=3)
+        for retry, longest in [(0, 1), (1, 2), (2, 3), (10, 3)]:
+            with self.subTest(retry=retry):
+                delays = [policy.delay(retry) for _ in range(100)]
+                self.assertTrue(all(0 <= delay <= longest for delay in delays))
+                # Delays are jittered
+                self.assertGreater(len(set(delays)), 1)
+
+    def test_timeout(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        send_mock.return_value = Mock(status_code=200)
+        self.adapter.send(self.get, timeout=None)
+        send_mock.assert_called_once_with(self.get, timeout=(10, 60))
+        with task_pass(f.task(), budget=30):
+            self.adapter.send(self.get, timeout=None)
+        connect, read = send_mock.call_args[1]["timeout"]
+        self.assertEqual(connect, 10)
+        self.assertTrue(29 < read <= 30)
+
+    def test_retry_server_error(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        before = metrics.counter("client.retries", method="GET", reason="503")
+        ok = Mock(status_code=200)
+        send_mock.side_effect = [Mock(status_code=503, headers={}), ok]
+        with self.assertLogs("archie.asana.client", logging.DEBUG):
+            self.assertIs(self.adapter.send(self.get), ok)
+        self.assertEqual(send_mock.call_count, 2)
+        self.assertTrue(0 <= sleep_mock.call_args[0][0] <= 1)
+        after = metrics.counter("client.retries", method="GET", reason="503")
+        self.assertEqual(after, before + 1)
+
+    def test_retries_exhausted(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        send_mock.return_value = error = Mock(status_code=500, headers={})
+        self.assertIs(self.adapter.send(self.get), error)
+        self.assertEqual(send_mock.call_count, 3)
+
+    def test_no_retry_for_writes(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        send_mock.return_value = error = Mock(status_code=503, headers={})
+        self.assertIs(self.adapter.send(self.post), error)
+        send_mock.side_effect = ReadTimeout()
+        with self.assertRaises(ReadTimeout):
+            self.adapter.send(self.post)
+        self.assertEqual(send_mock.call_count, 2)
+        sleep_mock.assert_not_called()
+
+    def test_rate_limited(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        ok = Mock(status_code=200)
+        rate_limited = Mock(status_code=429, headers={"Retry-After": "20"})
+        invalid = Mock(status_code=429, headers={"Retry-After": "soon"})
+        send_mock.side_effect = [rate_limited, invalid, ok]
+        # Rate limited requests were never processed, so even writes are retried
+        self.assertIs(self.adapter.send(self.post), ok)
+        self.assertEqual(sleep_mock.call_args_list[0][0][0], 20)
+        self.assertLessEqual(sleep_mock.call_args_list[1][0][0], 2)
+
+    def test_timeouts(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        before = metrics.counter("client.timeouts", method="GET")
+        ok = Mock(status_code=200)
+        send_mock.side_effect = [ReadTimeout(), ok]
+        self.assertIs(self.adapter.send(self.get), ok)
+        self.assertEqual(metrics.counter("client.timeouts", method="GET"), before + 1)
+        # Requests that never connected are safe to retry
+        send_mock.side_effect = [ConnectTimeout(), ok]
+        self.assertIs(self.adapter.send(self.post), ok)
+        send_mock.side_effect = [ConnectionError(), ok]
+        self.assertIs(self.adapter.send(self.get), ok)
+        send_mock.side_effect = ReadTimeout()
+        with self.assertRaises(ReadTimeout):
+            self.adapter.send(self.get)
+        self.assertEqual(send_mock.call_count, 9)
+
+    def test_budget(self, send_mock: Mock, sleep_mock: Mock) -> None:
+        send_mock.return_value = Mock(status_code=429, headers={"Retry-After": "60"})
+        with task_pass(f.task(), budget=30):
+            with self.assertRaises(TaskBudgetExceeded):
+                self.adapter.send(self.get)
+        sleep_mock.assert_not_called()
+
+
+@patch.object(metrics, "percentile", return_value=0.01)
+@patch("archie.asana.client.HTTPAdapter.send")
+class TestHedging(TestCase):
+    def setUp(self) -> None:
+        self.hedge_budget = HedgeBudget(1)
+        self.adapter = _ThrottledAdapter(None, None, hedge_budget=self.hedge_budget)
+        self.get = Mock(method="GET", url="https://app.asana.com/api/1.0/tasks/1")
+        self.get.copy.return_value = self.hedged = Mock(method="GET")
+        self.release = Event()
+        self.slow = Mock(status_code=200)
+        self.fast = Mock(status_code=200)
+
+    def tearDown(self) -> None:
+        self.release.set()
+
+    def send_slowly_once(self, fast: Callable[[], Mock]) -> Callable[..., Mock]:
+        def send(request: Mock, **kwargs: Any) -> Mock:
+            if request is self.get:
+                self.release.wait(0.5)
+                return self.slow
+            return fast()
+
+        return send
+
+    def test_mount(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        with patch("archie.asana.client.AsanaClient") as asana_client_mock:
+            session = asana_client_mock.access_token.return_value.session
+            Client(access_token="token", hedge_ratio=0.05)
+        adapter = session.mount.call_args[0][1]
+        self.assertEqual(adapter.hedge_budget.ratio, 0.05)
+
+    def test_fast_response(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        send_mock.return_value = self.fast
+        self.assertIs(self.adapter.send(self.get), self.fast)
+        self.assertEqual(send_mock.call_count, 1)
+
+    def test_hedge(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        before = metrics.counter("client.hedged_wins")
+        send_mock.side_effect = self.send_slowly_once(lambda: self.fast)
+        with self.assertLogs("archie.asana.client", logging.DEBUG):
+            self.assertIs(self.adapter.send(self.get), self.fast)
+        send_mock.assert_called_with(self.hedged, timeout=(10, 60))
+        self.assertEqual(metrics.counter("client.hedged_wins"), before + 1)
+        self.assertFalse(self.hedge_budget.try_spend())
+
+    def test_failed_hedge(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        def fail() -> Mock:
+            self.release.set()
+            raise ConnectionError()
+
+        send_mock.side_effect = self.send_slowly_once(fail)
+        with patch.object(self.hedge_budget, "try_spend", return_value=True):
+            # The original request is still used if the hedged one fails
+            result = self.adapter._send_hedged(self.hedge_budget, self.get)
+        self.assertIs(result, self.slow)
+
+    def test_out_of_budget(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        self.adapter.hedge_budget = HedgeBudget(0.01)
+        send_mock.side_effect = self.send_slowly_once(lambda: self.fast)
+        self.assertIs(self.adapter.send(self.get), self.slow)
+        self.assertEqual(send_mock.call_count, 1)
+
+    def test_no_hedged_writes(self, send_mock: Mock, percentile_mock: Mock) -> None:
+        send_mock.return_value = self.fast
+        post = Mock(method="POST")
+        self.assertIs(self.adapter.send(post), self.fast)
+        percentile_mock.assert_not_called()
+
+
 class TestClient(TestCaseWithClient):
     def test_project_by_gid(self) -> None:
         project = f.project()
@@ -58,6 +290,16 @@ class TestClient(TestCaseWithClient):
         self.assertEqual(user, returned_user)
         self.inner_mock.users.me.assert_called_once_with(fields=list_matcher)
 
+    def test_user(self) -> None:
+        user = f.user()
+        self.inner_mock.users.find_by_id.return_value = user.to_dict()
+        self.assertEqual(self.client.user("user@domain.com"), user)
+        # Users are cached, so looking them up again doesn't make another request
+        self.assertEqual(self.client.user("user@domain.com"), user)
+        self.inner_mock.users.find_by_id.assert_called_once_with(
+            "user@domain.com", fields=list_matcher
+        )
+
     def test_stories_by_task(self) -> None:
         task = f.task(gid="1")
         stories = [f.story(gid="2"), f.story(gid="3")]
@@ -68,6 +310,18 @@ class TestClient(TestCaseWithClient):
             task.gid, fields=list_matcher
         )
 
+    def test_followers_by_task(self) -> None:
+        task = f.task(gid="1")
+        followers = [f.user(gid="2"), f.user(gid="3")]
+        self.inner_mock.tasks.find_by_id.return_value = {
+            "gid": task.gid,
+            "followers": [user.to_dict() for user in followers],
+        }
+        self.assertListEqual(self.client.followers_by_task(task), followers)
+        self.inner_mock.tasks.find_by_id.assert_called_once_with(
+            task.gid, fields=["followers.name", "followers.email"]
+        )
+
     def test_sections_by_project(self) -> None:
         project = f.project(gid="1")
         sections = [f.section(gid="2"), f.section(gid="3")]
@@ -94,6 +348,74 @@ class TestClient(TestCaseWithClient):
         self.assertListEqual(result, tasks)
 
 
+class TestStoriesWithStore(TestCaseWithClient):
+    task = f.task(gid="1")
+    stories = [f.story(gid=str(i)) for i in range(5)]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.store = StoryStore()
+        self.client._story_store = self.store
+
+    @staticmethod
+    def page(stories: List[Story], offset: Optional[str] = None) -> dict:
+        next_page = {"offset": offset} if offset is not None else None
+        return {"data": [s.to_dict() for s in stories], "next_page": next_page}
+
+    def test_first_fetch(self) -> None:
+        self.inner_mock.tasks.stories.side_effect = [
+            self.page(self.stories[:2], "a"),
+            self.page(self.stories[2:3]),
+        ]
+        self.assertListEqual(self.client.stories_by_task(self.task), self.stories[:3])
+        self.assertListEqual(
+            self.inner_mock.tasks.stories.call_args_list,
+            [
+                call(
+                    self.task.gid,
+                    fields=list_matcher,
+                    limit=100,
+                    iterator_type=None,
+                    full_payload=True,
+                ),
+                call(
+                    self.task.gid,
+                    fields=list_matcher,
+                    limit=100,
+                    iterator_type=None,
+                    full_payload=True,
+                    offset="a",
+                ),
+            ],
+        )
+        self.assertEqual(
+            self.store.get(self.task.gid), StoryLog(self.stories[:3], "a", 2)
+        )
+
+    def test_resume_from_watermark(self) -> None:
+        self.store.put(self.task.gid, StoryLog(self.stories[:3], "a", 2))
+        self.inner_mock.tasks.stories.return_value = self.page(self.stories[2:])
+        self.assertListEqual(self.client.stories_by_task(self.task), self.stories)
+        self.inner_mock.tasks.stories.assert_called_once_with(
+            self.task.gid,
+            fields=list_matcher,
+            limit=100,
+            iterator_type=None,
+            full_payload=True,
+            offset="a",
+        )
+        self.assertEqual(self.store.get(self.task.gid), StoryLog(self.stories, "a", 2))
+
+    def test_expired_offset(self) -> None:
+        self.store.put(self.task.gid, StoryLog(self.stories[:3], "a", 2))
+        self.inner_mock.tasks.stories.side_effect = [
+            InvalidRequestError(),
+            self.page(self.stories),
+        ]
+        self.assertListEqual(self.client.stories_by_task(self.task), self.stories)
+        self.assertEqual(self.store.get(self.task.gid), StoryLog(self.stories, None, 0))
+
+
 # The following tests share the same data and so are grouped into separate classes
 
 
@@ -107,6 +429,20 @@ class TestTasksByProject(TestCaseWithClient):
             t.to_dict() for t in self.tasks
         ]
 
+    def test_task_gids_by_project(self) -> None:
+        self.inner_mock.tasks.find_by_project.return_value = [{"gid": "1"}]
+        self.assertListEqual(self.client.task_gids_by_project(self.project), ["1"])
+        self.inner_mock.tasks.find_by_project.assert_called_once_with(
+            self.project.gid, params={"completed_since": "now"}, fields=["gid"]
+        )
+
+    def test_all_task_gids_by_project(self) -> None:
+        self.inner_mock.tasks.find_by_project.return_value = [{"gid": "1"}]
+        self.client.task_gids_by_project(self.project, only_incomplete=False)
+        self.inner_mock.tasks.find_by_project.assert_called_once_with(
+            self.project.gid, params={}, fields=["gid"]
+        )
+
     def test_tasks_by_project(self) -> None:
         returned_tasks = self.client.tasks_by_project(self.project)
         self.assertListEqual(returned_tasks, self.tasks)
@@ -213,21 +549,21 @@ class TestMutations(TestCaseWithClient):
         self.inner_mock.tasks.add_comment.return_value = None
         self.client.add_comment(self.task, "Comment text")
         self.inner_mock.tasks.add_comment.assert_called_once_with(
-            self.task.gid, {"text": "Comment text"}
+            self.task.gid, {"text": "Comment text"}, fields=list_matcher
         )
 
     def test_add_follower(self) -> None:
         self.inner_mock.tasks.add_followers.return_value = None
         self.client.add_follower(self.task, "user@domain.com")
         self.inner_mock.tasks.add_followers.assert_called_once_with(
-            self.task.gid, {"followers": ["user@domain.com"]}
+            self.task.gid, {"followers": ["user@domain.com"]}, fields=list_matcher
         )
 
     def test_set_assignee(self) -> None:
         self.inner_mock.update.return_value = None
         self.client.set_assignee(self.task, "user@domain.com")
         self.inner_mock.tasks.update.assert_called_once_with(
-            self.task.gid, {"assignee": "user@domain.com"}
+            self.task.gid, {"assignee": "user@domain.com"}, fields=list_matcher
         )
 
     def test_set_enum_custom_field(self) -> None:
@@ -236,7 +572,9 @@ class TestMutations(TestCaseWithClient):
         self.inner_mock.tasks.update.return_value = None
         self.client.set_enum_custom_field(self.task, custom_field, enum_option)
         self.inner_mock.tasks.update.assert_called_once_with(
-            self.task.gid, {"custom_fields": {custom_field.gid: enum_option.gid}}
+            self.task.gid,
+            {"custom_fields": {custom_field.gid: enum_option.gid}},
+            fields=list_matcher,
         )
 
     def test_set_external(self) -> None:
@@ -244,5 +582,105 @@ class TestMutations(TestCaseWithClient):
         self.inner_mock.tasks.update.return_value = None
         self.client.set_external(self.task, external)
         self.inner_mock.tasks.update.assert_called_once_with(
-            self.task.gid, {"external": {"gid": "1", "data": '{"a": "b"}'}}
+            self.task.gid,
+            {"external": {"gid": "1", "data": '{"a": "b"}'}},
+            fields=list_matcher,
+        )
+
+
+class TestReadYourWrites(TestCaseWithClient):
+    def setUp(self) -> None:
+        super().setUp()
+        self.project = f.project(gid="1")
+        self.other_project = f.project(gid="2")
+        self.task = f.task(
+            memberships=[
+                f.task_membership(self.other_project, f.section(gid="3")),
+                f.task_membership(self.project, f.section(gid="4")),
+            ]
+        )
+
+    def test_update(self) -> None:
+        updated = attr.evolve(self.task, assignee=f.user())
+        self.inner_mock.tasks.update.return_value = updated.to_dict()
+        with task_pass(self.task):
+            self.client.set_assignee(self.task, "user@domain.com")
+            self.assertEqual(current_view(self.task), updated)
+        self.assertIs(current_view(self.task), self.task)
+
+    def test_add_to_section(self) -> None:
+        section = f.section(gid="5", project=self.project)
+        with task_pass(self.task):
+            self.client.add_to_section(self.task, section)
+            memberships = current_view(self.task).memberships
+        self.assertListEqual(
+            memberships,
+            [self.task.memberships[0], f.task_membership(self.project, section)],
+        )
+
+    def test_add_comment(self) -> None:
+        comment = f.story(gid="2")
+        self.inner_mock.tasks.add_comment.return_value = comment.to_dict()
+        with task_pass(self.task) as current:
+            # Stories that haven't been fetched yet will include the comment anyway
+            self.client.add_comment(self.task, "Comment")
+            self.assertIsNone(current.stories)
+            current.stories = [f.story(gid="1")]
+            current.story_index = StoryIndex(current.stories)
+            self.client.add_comment(self.task, "Comment")
+            self.assertListEqual(current.stories, [f.story(gid="1"), comment])
+            self.assertIsNone(current.story_index)
+
+    def test_set_external(self) -> None:
+        first, second = f.external("1", {"a": "b"}), f.external("1", {"c": "d"})
+        self.inner_mock.tasks.update.return_value = attr.evolve(
+            self.task, external=second
+        ).to_dict()
+        with task_pass(self.task):
+            self.client.set_external(self.task, first)
+            self.client.set_external(self.task, second)
+            self.assertEqual(current_view(self.task).external, second)
+            self.inner_mock.tasks.update.assert_not_called()
+        # Both writes are merged into one, made at the end of the pass
+        self.inner_mock.tasks.update.assert_called_once_with(
+            self.task.gid,
+            {"external": {"gid": "1", "data": '{"c": "d"}'}},
+            fields=list_matcher,
         )
+
+    def test_set_external_around_update(self) -> None:
+        first, second = f.external("1", {"a": "b"}), f.external("1", {"c": "d"})
+        assigned = attr.evolve(self.task, assignee=f.user())
+        self.inner_mock.tasks.update.return_value = assigned.to_dict()
+        with task_pass(self.task):
+            self.client.set_external(self.task, first)
+            self.client.set_assignee(self.task, "user@domain.com")
+            # The response doesn't include the deferred write, which is kept anyway
+            self.assertEqual(
+                current_view(self.task), attr.evolve(assigned, external=first)
+            )
+            self.client.set_external(self.task, second)
+            self.assertEqual(current_view(self.task).external, second)
+        self.assertListEqual(
+            self.inner_mock.tasks.update.call_args_list,
+            [
+                call(
+                    self.task.gid, {"assignee": "user@domain.com"}, fields=list_matcher
+                ),
+                call(
+                    self.task.gid,
+                    {"external": {"gid": "1", "data": '{"c": "d"}'}},
+                    fields=list_matcher,
+                ),
+            ],
+        )
+
+    def test_add_follower(self) -> None:
+        follower = f.user()
+        self.inner_mock.tasks.add_followers.return_value = {
+            "gid": self.task.gid,
+            "followers": [follower.to_dict()],
+        }
+        with task_pass(self.task) as current:
+            self.client.add_follower(self.task, follower.email)
+            self.assertListEqual(current.followers or [], [follower])
@@ -0,0 +1,65 @@
+from threading import Thread
+from unittest import TestCase
+
+from freezegun import freeze_time
+
+from archie.asana._concurrency import ConcurrencyLimiter
+from archie.metrics import metrics
+
+
+class TestConcurrencyLimiter(TestCase):
+    def setUp(self) -> None:
+        self.limiter = ConcurrencyLimiter(8, minimum=2)
+
+    def request(self, latency: float = 1.0, overloaded: bool = False) -> None:
+        self.limiter.acquire()
+        self.limiter.release(latency, overloaded)
+
+    def test_capped_at_maximum(self) -> None:
+        self.request()
+        self.assertEqual(self.limiter.limit, 8)
+        self.assertEqual(metrics.gauge("client.concurrency_limit"), 8)
+
+    @freeze_time("2019-01-01", auto_tick_seconds=10)
+    def test_multiplicative_decrease(self) -> None:
+        self.request(overloaded=True)
+        self.assertEqual(self.limiter.limit, 4)
+        self.request(overloaded=True)
+        self.request(overloaded=True)
+        self.assertEqual(self.limiter.limit, 2)
+        self.assertEqual(metrics.gauge("client.concurrency_limit"), 2)
+
+    @freeze_time("2019-01-01")
+    def test_decrease_once_per_latency(self) -> None:
+        self.request()
+        self.request(overloaded=True)
+        # The clock hasn't moved, so this is part of the same burst of errors
+        self.request(overloaded=True)
+        self.assertEqual(self.limiter.limit, 4)
+
+    @freeze_time("2019-01-01", auto_tick_seconds=10)
+    def test_latency_spike(self) -> None:
+        self.request(latency=1.0)
+        self.request(latency=5.0)
+        self.assertEqual(self.limiter.limit, 4)
+
+    @freeze_time("2019-01-01", auto_tick_seconds=10)
+    def test_additive_increase(self) -> None:
+        self.request(overloaded=True)
+        for _ in range(4):
+            self.request()
+        self.assertEqual(int(self.limiter.limit), 4)
+        for _ in range(5):
+            self.request()
+        self.assertEqual(int(self.limiter.limit), 5)
+
+    def test_wait_for_slot(self) -> None:
+        limiter = ConcurrencyLimiter(1)
+        limiter.acquire()
+        waiter = Thread(target=limiter.acquire)
+        waiter.start()
+        waiter.join(0.1)
+        self.assertTrue(waiter.is_alive())
+        limiter.release(1.0, overloaded=False)
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
@@ -0,0 +1,25 @@
+from test import fixtures as f
+from unittest import TestCase
+from unittest.mock import create_autospec
+
+from archie._task_pass import task_pass
+from archie.asana._followers import followers_by_task
+from archie.asana.client import Client
+
+
+class TestFollowersByTask(TestCase):
+    def setUp(self) -> None:
+        self.task = f.task()
+        self.client = create_autospec(Client)
+        self.client.followers_by_task.return_value = self.followers = [f.user()]
+
+    def test_no_pass(self) -> None:
+        self.assertIs(followers_by_task(self.task, self.client), self.followers)
+        self.assertIs(followers_by_task(self.task, self.client), self.followers)
+        self.assertEqual(self.client.followers_by_task.call_count, 2)
+
+    def test_pass(self) -> None:
+        with task_pass(self.task):
+            self.assertIs(followers_by_task(self.task, self.client), self.followers)
+            self.assertIs(followers_by_task(self.task, self.client), self.followers)
+        self.client.followers_by_task.assert_called_once_with(self.task)
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from archie.asana._hedging import HedgeBudget
+
+
+class TestHedgeBudget(TestCase):
+    def test_ratio(self) -> None:
+        budget = HedgeBudget(0.25)
+        self.assertFalse(budget.try_spend())
+        for _ in range(4):
+            budget.record_request()
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+    def test_burst(self) -> None:
+        budget = HedgeBudget(0.5, burst=2)
+        for _ in range(100):
+            budget.record_request()
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
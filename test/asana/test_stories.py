@@ -2,7 +2,14 @@ from test import fixtures as f
 from unittest import TestCase
 from unittest.mock import create_autospec
 
-from archie.asana._stories import comments_by_task, subtype_filter
+from archie._task_pass import task_pass
+from archie.asana._stories import (
+    comments_by_task,
+    stories_by_task,
+    story_index,
+    subtype_filter,
+)
+from archie.asana._story_index import StoryIndex
 from archie.asana.client import Client
 
 
@@ -34,3 +41,40 @@ class TestCommentsByTask(TestCase):
         comments = comments_by_task(task, client)
         self.assertListEqual(comments, [stories[0]])
         client.stories_by_task.assert_called_once_with(task)
+
+
+class TestStoriesByTask(TestCase):
+    def setUp(self) -> None:
+        self.task = f.task()
+        self.client = create_autospec(Client)
+        self.client.stories_by_task.return_value = self.stories = [f.story()]
+
+    def test_no_pass(self) -> None:
+        self.assertIs(stories_by_task(self.task, self.client), self.stories)
+        self.assertIs(stories_by_task(self.task, self.client), self.stories)
+        self.assertEqual(self.client.stories_by_task.call_count, 2)
+
+    def test_pass(self) -> None:
+        with task_pass(self.task):
+            self.assertIs(stories_by_task(self.task, self.client), self.stories)
+            self.assertIs(stories_by_task(self.task, self.client), self.stories)
+        self.client.stories_by_task.assert_called_once_with(self.task)
+
+
+class TestStoryIndex(TestCase):
+    def setUp(self) -> None:
+        self.task = f.task()
+        self.client = create_autospec(Client)
+        self.client.stories_by_task.return_value = [f.story(created_by=f.user())]
+
+    def test_no_pass(self) -> None:
+        index = story_index(self.task, self.client)
+        self.assertIsInstance(index, StoryIndex)
+        self.assertIsNot(story_index(self.task, self.client), index)
+
+    def test_pass(self) -> None:
+        with task_pass(self.task):
+            index = story_index(self.task, self.client)
+            self.assertIs(story_index(self.task, self.client), index)
+            comments_by_task(self.task, self.client)
+        self.client.stories_by_task.assert_called_once_with(self.task)
@@ -0,0 +1,73 @@
+from test import fixtures as f
+from unittest import TestCase
+
+from archie.asana._story_index import StoryIndex
+
+
+class TestStoryIndex(TestCase):
+    user = f.user(gid="user-gid")
+    custom_field = f.custom_field(gid="custom-field-gid")
+    enum_option = f.enum_option(gid="enum-option-gid")
+    project = f.project(gid="project-gid")
+    section = f.section(gid="section-gid")
+
+    def test_empty(self) -> None:
+        index = StoryIndex([])
+        self.assertIsNone(index.latest_by_author(self.user.gid))
+        self.assertIsNone(index.latest_custom_field_change(self.custom_field.gid))
+        self.assertIsNone(index.latest_project_addition(self.project.gid))
+        self.assertIsNone(index.latest_section_change(self.section.gid))
+
+    def test_latest_by_author(self) -> None:
+        stories = [
+            f.story(gid="1", created_by=self.user),
+            f.story(gid="2", created_by=self.user),
+            f.story(gid="3", created_by=f.user(gid="other-user-gid")),
+            f.story(gid="4", created_by=None),
+        ]
+        index = StoryIndex(stories)
+        self.assertIs(index.latest_by_author(self.user.gid), stories[1])
+
+    def test_latest_enum_changes(self) -> None:
+        stories = [
+            f.story(
+                gid="1",
+                resource_subtype="enum_custom_field_changed",
+                custom_field=self.custom_field,
+                new_enum_value=self.enum_option,
+            ),
+            f.story(
+                gid="2",
+                resource_subtype="enum_custom_field_changed",
+                custom_field=self.custom_field,
+                new_enum_value=None,
+            ),
+            f.story(
+                gid="3",
+                resource_subtype="enum_custom_field_changed",
+                custom_field=None,
+            ),
+        ]
+        index = StoryIndex(stories)
+        self.assertIs(
+            index.latest_custom_field_change(self.custom_field.gid), stories[1]
+        )
+
+    def test_latest_project_addition(self) -> None:
+        stories = [
+            f.story(gid="1", resource_subtype="added_to_project", project=self.project),
+            f.story(gid="2", resource_subtype="added_to_project", project=None),
+        ]
+        index = StoryIndex(stories)
+        self.assertIs(index.latest_project_addition(self.project.gid), stories[0])
+
+    def test_latest_section_change(self) -> None:
+        stories = [
+            f.story(gid="1", resource_subtype="section_changed", new_section=None),
+            f.story(
+                gid="2", resource_subtype="section_changed", new_section=self.section
+            ),
+            f.story(gid="3", resource_subtype="comment_added"),
+        ]
+        index = StoryIndex(stories)
+        self.assertIs(index.latest_section_change(self.section.gid), stories[1])
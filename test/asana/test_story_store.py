@@ -0,0 +1,63 @@
+import os
+from tempfile import TemporaryDirectory
+from test import fixtures as f
+from unittest import TestCase
+
+from archie.asana.story_store import StoryLog, StoryStore
+
+
+class TestStoryStore(TestCase):
+    def test_get_and_put(self) -> None:
+        store = StoryStore()
+        self.assertIsNone(store.get("1"))
+        log = StoryLog([f.story()], "offset", 0)
+        store.put("1", log)
+        self.assertIs(store.get("1"), log)
+
+    def test_eviction(self) -> None:
+        store = StoryStore(max_stories=3)
+        first, second = StoryLog([f.story()] * 2), StoryLog([f.story()] * 2)
+        store.put("1", first)
+        store.put("2", second)
+        self.assertIsNone(store.get("1"))
+        self.assertIs(store.get("2"), second)
+
+    def test_eviction_least_recently_used(self) -> None:
+        store = StoryStore(max_stories=2)
+        first, second, third = [StoryLog([f.story()]) for _ in range(3)]
+        store.put("1", first)
+        store.put("2", second)
+        store.get("1")
+        store.put("3", third)
+        self.assertIs(store.get("1"), first)
+        self.assertIsNone(store.get("2"))
+
+    def test_replace(self) -> None:
+        store = StoryStore(max_stories=2)
+        store.put("1", StoryLog([f.story()] * 2))
+        log = StoryLog([f.story()] * 2)
+        store.put("1", log)
+        self.assertIs(store.get("1"), log)
+
+    def test_oversized_log_kept(self) -> None:
+        store = StoryStore(max_stories=1)
+        log = StoryLog([f.story()] * 2)
+        store.put("1", log)
+        self.assertIs(store.get("1"), log)
+
+    def test_disk(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stories")
+            log = StoryLog([f.story(gid="1"), f.story(gid="2")], "offset", 1)
+            store = StoryStore(max_stories=2, path=path)
+            store.put("1", log)
+            store.put("2", StoryLog([f.story()] * 2))
+            # Evicted from memory, but reloaded from disk
+            self.assertEqual(store.get("1"), log)
+            store.close()
+            store.close()
+
+            reopened = StoryStore(path=path)
+            self.assertEqual(reopened.get("1"), log)
+            self.assertIsNone(reopened.get("3"))
+            reopened.close()
@@ -40,6 +40,7 @@ def task(
     due_at: Optional[datetime] = None,
     start_on: Optional[date] = None,
     external: Optional[External] = None,
+    modified_at: Optional[datetime] = None,
 ) -> Task:
     return Task(
         gid=gid,
@@ -56,6 +57,7 @@ def task(
         due_at=due_at,
         start_on=start_on,
         external=external,
+        modified_at=modified_at,
     )
 
 
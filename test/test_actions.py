@@ -1,9 +1,12 @@
 import logging
 from test import fixtures as f
+from typing import List
 from unittest import TestCase
-from unittest.mock import create_autospec
+from unittest.mock import call, create_autospec
 
+from archie._task_pass import task_pass
 from archie.actions import (
+    Action,
     AddComment,
     AddFollower,
     AssignTo,
@@ -12,6 +15,9 @@ from archie.actions import (
     _logger,
 )
 from archie.asana.client import Client
+from archie.asana.models import Task
+from archie.dependencies import EVERYTHING, NOTHING, Dependencies
+from archie.metrics import metrics
 
 task = f.task()
 
@@ -25,35 +31,88 @@ class TestAddComment(TestCase):
 
 
 class TestAddFollower(TestCase):
+    def setUp(self) -> None:
+        self.client = create_autospec(Client)
+        self.client.followers_by_task.return_value = [f.user(gid="1", email="a@b.com")]
+
     def test(self) -> None:
-        client = create_autospec(Client)
+        self.client.user.return_value = f.user(gid="2")
         action = AddFollower("user@domain.com")
-        action(task, client)
-        client.add_follower.assert_called_once_with(task, "user@domain.com")
+        action(task, self.client)
+        self.client.user.assert_called_once_with("user@domain.com")
+        self.client.followers_by_task.assert_called_once_with(task)
+        self.client.add_follower.assert_called_once_with(task, "2")
+
+    def test_caches_new_follower(self) -> None:
+        follower = f.user(gid="2")
+        self.client.user.return_value = follower
+        with task_pass(task) as current:
+            AddFollower("2")(task, self.client)
+            self.assertListEqual(
+                current.followers or [], [f.user(gid="1", email="a@b.com"), follower]
+            )
+            # Later actions in the pass see the new follower without another request
+            AddFollower("2")(task, self.client)
+        self.client.add_follower.assert_called_once_with(task, "2")
+
+    def test_already_following(self) -> None:
+        before = metrics.counter("actions.writes_skipped", write="AddFollower")
+        self.client.user.return_value = f.user(gid="1", email="a@b.com")
+        with task_pass(task):
+            AddFollower("A@b.com")(task, self.client)
+            AddFollower("1")(task, self.client)
+        # Followers are only fetched once per pass
+        self.client.followers_by_task.assert_called_once_with(task)
+        self.client.add_follower.assert_not_called()
+        self.assertEqual(
+            metrics.counter("actions.writes_skipped", write="AddFollower"), before + 2
+        )
 
 
 class TestSetExternal(TestCase):
+    def setUp(self) -> None:
+        self.client = create_autospec(Client)
+
     def test(self) -> None:
         external = f.external()
-        client = create_autospec(Client)
         action = SetExternal(external)
-        action(task, client)
-        client.set_external.assert_called_once_with(task, external)
+        action(task, self.client)
+        self.client.set_external.assert_called_once_with(task, external)
+
+    def test_unchanged(self) -> None:
+        external = f.external(data={"key": "value"})
+        action = SetExternal(f.external(data={"key": "value"}))
+        action(f.task(external=external), self.client)
+        self.client.set_external.assert_not_called()
 
 
 class TestAssignTo(TestCase):
     def setUp(self) -> None:
         self.client = create_autospec(Client)
+        self.assigned_task = f.task(assignee=f.user(gid="1", email="a@b.com"))
 
     def test_set_assignee(self) -> None:
+        self.client.user.return_value = f.user(gid="2")
         action = AssignTo("user@domain.com")
         action(task, self.client)
-        self.client.set_assignee.assert_called_once_with(task, "user@domain.com")
+        action(self.assigned_task, self.client)
+        self.client.user.assert_called_with("user@domain.com")
+        self.client.set_assignee.assert_has_calls(
+            [call(task, "2"), call(self.assigned_task, "2")]
+        )
 
     def test_clear_assignee(self) -> None:
         action = AssignTo(None)
-        action(task, self.client)
-        self.client.set_assignee.assert_called_once_with(task, None)
+        action(self.assigned_task, self.client)
+        self.client.set_assignee.assert_called_once_with(self.assigned_task, None)
+
+    def test_unchanged(self) -> None:
+        self.client.user.return_value = f.user(gid="1", email="a@b.com")
+        # Users are compared by GID, whatever they're given as
+        AssignTo("A@b.com")(self.assigned_task, self.client)
+        AssignTo("1")(self.assigned_task, self.client)
+        AssignTo(None)(task, self.client)
+        self.client.set_assignee.assert_not_called()
 
 
 class TestSetEnumCustomField(TestCase):
@@ -111,3 +170,38 @@ class TestSetEnumCustomField(TestCase):
             ],
         )
         self.client.set_enum_custom_field.assert_not_called()
+
+
+class NoOpAction(Action):
+    def __call__(self, task: Task, client: Client) -> None:
+        pass
+
+
+class TestDependencies(TestCase):
+    def test_undeclared(self) -> None:
+        self.assertEqual(NoOpAction().dependencies(), EVERYTHING)
+
+    def test_write_only(self) -> None:
+        actions: List[Action] = [
+            AddComment("Some comment"),
+            AddFollower("user@domain.com"),
+        ]
+        for action in actions:
+            with self.subTest(action=action):
+                self.assertEqual(action.dependencies(), NOTHING)
+
+    def test_assign_to(self) -> None:
+        self.assertEqual(
+            AssignTo(None).dependencies(), Dependencies(fields={"assignee"})
+        )
+
+    def test_set_external(self) -> None:
+        self.assertEqual(
+            SetExternal(f.external()).dependencies(), Dependencies(fields={"external"})
+        )
+
+    def test_set_enum_custom_field(self) -> None:
+        self.assertEqual(
+            SetEnumCustomField("Field", "Option").dependencies(),
+            Dependencies(fields={"custom_fields"}),
+        )
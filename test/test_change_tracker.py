@@ -0,0 +1,24 @@
+from test import fixtures as f
+from unittest import TestCase
+
+from archie._change_tracker import ChangeTracker
+
+
+class TestChangeTracker(TestCase):
+    def test_unseen(self) -> None:
+        self.assertIsNone(ChangeTracker().change(f.task()))
+
+    def test_recorded(self) -> None:
+        tracker = ChangeTracker()
+        tracker.record(f.task(gid="1", completed=False))
+        change = tracker.change(f.task(gid="1", completed=True))
+        assert change is not None
+        self.assertEqual(change.fields, {"completed"})
+
+    def test_evicts_least_recent(self) -> None:
+        tracker = ChangeTracker(max_tasks=2)
+        for gid in ["1", "2", "1", "3"]:
+            tracker.record(f.task(gid=gid))
+        self.assertIsNotNone(tracker.change(f.task(gid="1")))
+        self.assertIsNone(tracker.change(f.task(gid="2")))
+        self.assertIsNotNone(tracker.change(f.task(gid="3")))
@@ -0,0 +1,41 @@
+import os
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from archie.checkpoints import FileCheckpointStore, SQLiteCheckpointStore
+
+
+class TestFileCheckpointStore(TestCase):
+    def test_save_and_load(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoints.json")
+            store = FileCheckpointStore(path)
+            self.assertIsNone(store.load("1"))
+            store.save("1", datetime(2019, 1, 1, 12, 0, 0))
+            store.save("2", datetime(2019, 1, 2, 12, 0, 0))
+            store.save("1", datetime(2019, 1, 1, 13, 0, 0))
+            self.assertEqual(store.load("1"), datetime(2019, 1, 1, 13, 0, 0))
+            self.assertListEqual(os.listdir(directory), ["checkpoints.json"])
+
+            reopened = FileCheckpointStore(path)
+            self.assertEqual(reopened.load("2"), datetime(2019, 1, 2, 12, 0, 0))
+            self.assertIsNone(reopened.load("3"))
+
+
+class TestSQLiteCheckpointStore(TestCase):
+    def test_save_and_load(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoints.db")
+            store = SQLiteCheckpointStore(path)
+            self.assertIsNone(store.load("1"))
+            store.save("1", datetime(2019, 1, 1, 12, 0, 0))
+            store.save("2", datetime(2019, 1, 2, 12, 0, 0))
+            store.save("1", datetime(2019, 1, 1, 13, 0, 0))
+            self.assertEqual(store.load("1"), datetime(2019, 1, 1, 13, 0, 0))
+            store.close()
+
+            reopened = SQLiteCheckpointStore(path)
+            self.assertEqual(reopened.load("2"), datetime(2019, 1, 2, 12, 0, 0))
+            self.assertIsNone(reopened.load("3"))
+            reopened.close()
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from test import fixtures as f
+from unittest import TestCase
+
+from archie.dependencies import ANY_STORY, EVERYTHING, NOTHING, Dependencies, TaskChange
+
+modified = datetime(2020, 1, 1, tzinfo=timezone.utc)
+later = datetime(2020, 1, 2, tzinfo=timezone.utc)
+
+
+class TestTaskChange(TestCase):
+    def test_no_change(self) -> None:
+        task = f.task(modified_at=modified)
+        self.assertEqual(
+            TaskChange.between(task, task), TaskChange(frozenset(), frozenset(), False)
+        )
+
+    def test_field_change(self) -> None:
+        old = f.task(modified_at=modified)
+        new = f.task(completed=True, modified_at=later)
+        self.assertEqual(
+            TaskChange.between(old, new),
+            TaskChange(
+                frozenset({"completed"}),
+                frozenset({"marked_complete", "marked_incomplete"}),
+                True,
+            ),
+        )
+
+    def test_no_modified_at(self) -> None:
+        task = f.task()
+        self.assertTrue(TaskChange.between(task, task).unattributed_stories)
+
+
+class TestDependencies(TestCase):
+    no_change = TaskChange(frozenset(), frozenset(), False)
+    comment_change = TaskChange(frozenset(), frozenset(), True)
+    assignee_change = TaskChange(
+        frozenset({"assignee"}), frozenset({"assigned", "unassigned"}), True
+    )
+
+    def test_union(self) -> None:
+        self.assertEqual(
+            Dependencies(fields={"notes"}, temporal=True)
+            | Dependencies(fields={"name"}, story_subtypes={"comment_added"}),
+            Dependencies(
+                fields={"name", "notes"},
+                story_subtypes={"comment_added"},
+                temporal=True,
+            ),
+        )
+        self.assertEqual(NOTHING | EVERYTHING, EVERYTHING)
+
+    def test_unknown_change(self) -> None:
+        self.assertTrue(NOTHING.affected_by(None))
+
+    def test_everything(self) -> None:
+        self.assertTrue(EVERYTHING.affected_by(self.no_change))
+
+    def test_temporal(self) -> None:
+        self.assertTrue(Dependencies(temporal=True).affected_by(self.no_change))
+
+    def test_fields(self) -> None:
+        dependencies = Dependencies(fields={"assignee"})
+        self.assertTrue(dependencies.affected_by(self.assignee_change))
+        self.assertFalse(dependencies.affected_by(self.comment_change))
+
+    def test_attributable_stories(self) -> None:
+        dependencies = Dependencies(story_subtypes={"assigned"})
+        self.assertTrue(dependencies.affected_by(self.assignee_change))
+        self.assertFalse(dependencies.affected_by(self.comment_change))
+
+    def test_unattributable_stories(self) -> None:
+        dependencies = Dependencies(story_subtypes={"comment_added"})
+        self.assertTrue(dependencies.affected_by(self.comment_change))
+        self.assertFalse(dependencies.affected_by(self.no_change))
+
+    def test_any_story(self) -> None:
+        dependencies = Dependencies(story_subtypes={ANY_STORY})
+        self.assertTrue(dependencies.affected_by(self.assignee_change))
+        self.assertTrue(dependencies.affected_by(self.comment_change))
+        self.assertFalse(dependencies.affected_by(self.no_change))
@@ -1,8 +1,11 @@
 from logging import Logger
+from threading import Barrier, Event
+from time import sleep
+from typing import List
 from unittest import TestCase
 from unittest.mock import Mock, create_autospec
 
-from archie._executor import LoggingThreadPoolExecutor
+from archie._executor import FairExecutor, LoggingThreadPoolExecutor
 
 
 class TestLoggingThreadPoolExecutor(TestCase):
@@ -31,3 +34,100 @@ class TestLoggingThreadPoolExecutor(TestCase):
             "Exception encountered in thread", exc_info=True
         )
         self.assertIs(future.exception(), sentinel)
+
+
+class TestFairExecutor(TestCase):
+    def setUp(self) -> None:
+        self.logger = create_autospec(Logger)
+        self.executor = FairExecutor(1, self.logger)
+
+    def test_round_robin(self) -> None:
+        busy, release = self.executor.queue(), Event()
+        busy.submit(release.wait, 5)
+        first, second = self.executor.queue(), self.executor.queue()
+        order: List[str] = []
+        for i in range(3):
+            first.submit(order.append, f"first {i}")
+        for i in range(2):
+            second.submit(order.append, f"second {i}")
+        release.set()
+        with first, second:
+            pass
+        self.assertListEqual(
+            order, ["first 0", "second 0", "first 1", "second 1", "first 2"]
+        )
+
+    def test_priority(self) -> None:
+        busy, release = self.executor.queue(), Event()
+        busy.submit(release.wait, 5)
+        queue = self.executor.queue()
+        order: List[str] = []
+        queue.submit_with_priority(2, order.append, "low")
+        queue.submit_with_priority(0, order.append, "high")
+        queue.submit_with_priority(1, order.append, "medium")
+        release.set()
+        with queue:
+            pass
+        self.assertListEqual(order, ["high", "medium", "low"])
+
+    def test_aging(self) -> None:
+        executor = FairExecutor(1, self.logger, aging=0)
+        busy, release = executor.queue(), Event()
+        busy.submit(release.wait, 5)
+        queue = executor.queue()
+        order: List[str] = []
+        queue.submit_with_priority(2, order.append, "waited")
+        queue.submit_with_priority(0, order.append, "new")
+        release.set()
+        with queue:
+            pass
+        self.assertListEqual(order, ["waited", "new"])
+
+    def test_result(self) -> None:
+        sentinel = object()
+        callable = Mock(return_value=sentinel)
+        with self.executor.queue() as queue:
+            future = queue.submit(callable, 1, key="value")
+        callable.assert_called_once_with(1, key="value")
+        self.assertIs(future.result(), sentinel)
+        self.logger.error.assert_not_called()
+
+    def test_failure(self) -> None:
+        with self.executor.queue() as queue:
+            future = queue.submit(Mock(side_effect=RuntimeError()))
+        self.assertIsInstance(future.exception(), RuntimeError)
+        self.logger.error.assert_called_once_with(
+            "Exception encountered in thread", exc_info=True
+        )
+
+    def test_burst_with_idle_worker(self) -> None:
+        executor = FairExecutor(3, self.logger)
+        with executor.queue() as queue:
+            queue.submit(Mock())
+        # Wait for the only worker to go idle
+        while not executor._idle:
+            sleep(0.001)
+        barrier = Barrier(3, timeout=5)
+        with executor.queue() as queue:
+            futures = [queue.submit(barrier.wait) for _ in range(3)]
+        # Each item only finishes once all three are running at once
+        for future in futures:
+            self.assertIsNone(future.exception())
+        self.assertEqual(len(executor._workers), 3)
+
+    def test_shutdown_without_waiting(self) -> None:
+        release = Event()
+        queue = self.executor.queue()
+        future = queue.submit(release.wait, 5)
+        queue.shutdown(wait=False)
+        release.set()
+        self.assertTrue(future.result())
+
+    def test_cancel(self) -> None:
+        release, callable = Event(), Mock()
+        with self.executor.queue() as queue:
+            queue.submit(release.wait, 5)
+            future = queue.submit(callable)
+            self.assertTrue(future.cancel())
+            release.set()
+        callable.assert_not_called()
@@ -3,7 +3,7 @@ from collections import namedtuple
 from unittest import TestCase, TestLoader, TestSuite
 
 import archie._itertools
-from archie._itertools import find, find_by_name, first_or_none
+from archie._itertools import find, find_by_name, first_or_none, index_by_name
 
 
 def load_tests(loader: TestLoader, tests: TestSuite, pattern: str) -> TestSuite:
@@ -42,3 +42,11 @@ class TestFindByName(TestCase):
     def test_find_none(self) -> None:
         found = find_by_name(self.items, "Third")
         self.assertIsNone(found)
+
+
+class TestIndexByName(TestCase):
+    Named = namedtuple("Named", ["name", "value"])
+
+    def test_first_wins(self) -> None:
+        first, second = self.Named("First", 1), self.Named("First", 2)
+        self.assertDictEqual(index_by_name([first, second]), {"First": first})
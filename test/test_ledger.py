@@ -0,0 +1,31 @@
+import os
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from archie.ledger import SQLiteActionLedger
+
+
+class TestSQLiteActionLedger(TestCase):
+    def test_record(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.db")
+            ledger = SQLiteActionLedger(path)
+            self.assertIsNone(ledger.last_applied("1", "rule", "AddComment(Hi)"))
+            ledger.record("1", "rule", "AddComment(Hi)", datetime(2019, 1, 1, 12))
+            ledger.record("1", "rule", "AddComment(Bye)", datetime(2019, 1, 1, 13))
+            ledger.record("1", "rule", "AddComment(Hi)", datetime(2019, 1, 1, 14))
+            self.assertEqual(
+                ledger.last_applied("1", "rule", "AddComment(Hi)"),
+                datetime(2019, 1, 1, 14),
+            )
+            self.assertIsNone(ledger.last_applied("2", "rule", "AddComment(Hi)"))
+            self.assertIsNone(ledger.last_applied("1", "other", "AddComment(Hi)"))
+            ledger.close()
+
+            reopened = SQLiteActionLedger(path)
+            self.assertEqual(
+                reopened.last_applied("1", "rule", "AddComment(Bye)"),
+                datetime(2019, 1, 1, 13),
+            )
+            reopened.close()
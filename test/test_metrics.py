@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from archie.metrics import Metrics
+
+
+class TestMetrics(TestCase):
+    def setUp(self) -> None:
+        self.metrics = Metrics(window=3)
+
+    def test_counter(self) -> None:
+        self.assertEqual(self.metrics.counter("requests"), 0)
+        self.metrics.increment("requests")
+        self.metrics.increment("requests", 2)
+        self.metrics.increment("requests", project="1")
+        self.assertEqual(self.metrics.counter("requests"), 3)
+        self.assertEqual(self.metrics.counter("requests", project="1"), 1)
+
+    def test_gauge(self) -> None:
+        self.assertIsNone(self.metrics.gauge("interval"))
+        self.metrics.set("interval", 60)
+        self.metrics.set("interval", 30)
+        self.assertEqual(self.metrics.gauge("interval"), 30)
+
+    def test_percentile(self) -> None:
+        self.assertIsNone(self.metrics.percentile("latency", 50))
+        for value in [100, 1, 2, 3]:
+            self.metrics.observe("latency", value)
+        # Only the most recent values are kept
+        self.assertEqual(self.metrics.percentile("latency", 0), 1)
+        self.assertEqual(self.metrics.percentile("latency", 50), 2)
+        self.assertEqual(self.metrics.percentile("latency", 100), 3)
+
+    def test_snapshot(self) -> None:
+        self.metrics.increment("requests", status="200")
+        self.metrics.set("interval", 60)
+        self.metrics.observe("latency", 1.5, method="GET")
+        self.metrics.observe("latency", 2.5, method="GET")
+        self.assertDictEqual(
+            self.metrics.snapshot(),
+            {
+                "requests{status=200}": 1,
+                "interval": 60,
+                "latency_count{method=GET}": 2,
+                "latency_sum{method=GET}": 4.0,
+            },
+        )
+
+    def test_reset(self) -> None:
+        self.metrics.increment("requests")
+        self.metrics.set("interval", 60)
+        self.metrics.observe("latency", 1)
+        self.metrics.reset()
+        self.assertDictEqual(self.metrics.snapshot(), {})
@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+from test import fixtures as f
+from unittest import TestCase
+from unittest.mock import create_autospec
+
+from freezegun import freeze_time
+
+from archie.asana.client import Client
+from archie.mirror import TaskMirror
+
+
+@freeze_time(datetime(2019, 1, 1, 12, 0, 0, tzinfo=timezone.utc))
+class TestTaskMirror(TestCase):
+    def setUp(self) -> None:
+        self.client = create_autospec(Client)
+        self.project = f.project()
+        self.sections = [f.section(gid="1"), f.section(gid="2")]
+        self.client.sections_by_project.return_value = self.sections
+        self.mirror = TaskMirror()
+
+    def tearDown(self) -> None:
+        self.mirror.close()
+
+    def test_empty(self) -> None:
+        self.assertListEqual(self.mirror.tasks(self.project), [])
+        self.assertListEqual(self.mirror.sections(self.project), [])
+
+    def test_first_sync(self) -> None:
+        self.client.tasks_by_project.return_value = tasks = [
+            f.task(gid="1"),
+            f.task(gid="2", external=f.external("1", {"a": "b"})),
+        ]
+        self.assertListEqual(self.mirror.sync(self.client, self.project), tasks)
+        self.client.tasks_by_project.assert_called_once_with(self.project)
+        self.assertListEqual(self.mirror.tasks(self.project), tasks)
+        self.assertListEqual(self.mirror.sections(self.project), self.sections)
+
+    def test_incremental_sync(self) -> None:
+        self.client.tasks_by_project.return_value = [f.task(gid="1"), f.task(gid="2")]
+        self.mirror.sync(self.client, self.project)
+
+        self.client.tasks_by_project.reset_mock()
+        self.client.tasks_by_project.return_value = changed = [
+            f.task(gid="1", name="New name"),
+            f.task(gid="2", completed=True),
+            f.task(gid="3"),
+        ]
+        with freeze_time(datetime(2019, 1, 1, 13, 0, 0, tzinfo=timezone.utc)):
+            self.assertListEqual(self.mirror.sync(self.client, self.project), changed)
+        self.client.tasks_by_project.assert_called_once_with(
+            self.project,
+            only_incomplete=False,
+            modified_since=datetime(2019, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+        )
+        self.assertListEqual(
+            self.mirror.tasks(self.project, ["3", "1", "2"]), [changed[2], changed[0]]
+        )
+
+    def test_periodic_full_sync(self) -> None:
+        self.client.tasks_by_project.return_value = [f.task(gid="1"), f.task(gid="2")]
+        self.mirror.sync(self.client, self.project)
+
+        self.client.tasks_by_project.reset_mock()
+        self.client.tasks_by_project.return_value = tasks = [f.task(gid="2")]
+        with freeze_time(datetime(2019, 1, 2, 13, 0, 0, tzinfo=timezone.utc)):
+            self.mirror.sync(self.client, self.project)
+        self.client.tasks_by_project.assert_called_once_with(self.project)
+        self.assertListEqual(self.mirror.tasks(self.project), tasks)
+
+    def test_warm_start(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.db")
+            mirror = TaskMirror(path)
+            self.client.tasks_by_project.return_value = tasks = [f.task(gid="1")]
+            mirror.sync(self.client, self.project)
+            mirror.close()
+
+            restarted = TaskMirror(path)
+            self.assertListEqual(restarted.tasks(self.project), tasks)
+            self.client.tasks_by_project.reset_mock()
+            restarted.sync(self.client, self.project)
+            restarted.close()
+        self.client.tasks_by_project.assert_called_once_with(
+            self.project,
+            only_incomplete=False,
+            modified_since=datetime(2019, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+        )
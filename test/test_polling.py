@@ -0,0 +1,47 @@
+from datetime import timedelta
+from unittest import TestCase
+
+from freezegun import freeze_time
+
+from archie.metrics import metrics
+from archie.polling import AdaptiveInterval, RequestBudget
+
+
+class TestRequestBudget(TestCase):
+    @freeze_time("2020-01-01")
+    def test_reserve(self) -> None:
+        budget = RequestBudget(polls_per_minute=2)
+        self.assertEqual(budget.reserve(0), 0)
+        self.assertEqual(budget.reserve(0), 30)
+        self.assertEqual(budget.reserve(10), 60)
+        self.assertEqual(budget.reserve(120), 120)
+
+
+class TestAdaptiveInterval(TestCase):
+    def setUp(self) -> None:
+        self.interval = AdaptiveInterval("1m", "8m", initial="2m", busy_threshold=5)
+
+    def test_back_off(self) -> None:
+        delays = [self.interval.next_delay(0) for _ in range(4)]
+        self.assertListEqual(delays, [240, 480, 480, 480])
+
+    def test_busy(self) -> None:
+        delays = [self.interval.next_delay(5, project="1") for _ in range(2)]
+        self.assertListEqual(delays, [60, 60])
+        self.assertEqual(metrics.gauge("polling.interval_seconds", project="1"), 60)
+
+    def test_some_changes(self) -> None:
+        self.assertEqual(self.interval.next_delay(4), 120)
+        self.assertEqual(self.interval.current, timedelta(minutes=2))
+
+    def test_default_initial(self) -> None:
+        self.assertEqual(AdaptiveInterval("1m", "8m").current, timedelta(minutes=1))
+
+    @freeze_time("2020-01-01")
+    def test_budget(self) -> None:
+        budget = RequestBudget(polls_per_minute=1)
+        other_source = AdaptiveInterval("1m", "8m", budget=budget)
+        self.interval.budget = budget
+        self.assertEqual(other_source.next_delay(1), 60)
+        self.assertEqual(self.interval.next_delay(1), 120)
+        self.assertEqual(metrics.gauge("polling.delay_seconds"), 120)
@@ -1,15 +1,18 @@
 from datetime import date, datetime, timedelta, timezone
-from functools import partial
 from itertools import product
 from test import fixtures as f
 from typing import Callable, List, Tuple, TypeVar
 from unittest import TestCase
-from unittest.mock import Mock, create_autospec, patch
+from unittest.mock import Mock, call, create_autospec, patch
 
+import pytz
 from freezegun import freeze_time
 
+from archie._task_pass import task_pass
+from archie._text_matcher import TextMatcher
 from archie.asana.client import Client
-from archie.asana.models import Story, Task
+from archie.asana.models import Task
+from archie.dependencies import ANY_STORY, EVERYTHING, NOTHING, Dependencies
 from archie.predicates import (
     AlwaysTrue,
     Assigned,
@@ -34,6 +37,7 @@ from archie.predicates import (
     _for_at_least,
     _Not,
     _Or,
+    text_patterns,
 )
 
 PST = timezone(timedelta(hours=-8))
@@ -72,23 +76,19 @@ class TestDurationSuffix(TestCase):
 class TestForAtLeast(TestCase):
     task = f.task(created_at=datetime(2019, 1, 1, 12, 0, 0, tzinfo=timezone.utc))
 
-    @staticmethod
-    def matcher(story: Story) -> bool:
-        return True
-
     def test_story(self) -> None:
         matching_story = f.story(
             text="a", created_at=datetime(2019, 1, 2, 12, 0, 0, tzinfo=timezone.utc)
         )
         for td, expected in [(timedelta(hours=24), False), (timedelta(hours=23), True)]:
             with self.subTest(timedelta=td, expected=expected):
-                result = _for_at_least(self.task, [matching_story], self.matcher, td)
+                result = _for_at_least(self.task, matching_story, td)
                 self.assertEqual(expected, result)
 
     def test_no_story(self) -> None:
         for td, expected in [(timedelta(hours=48), False), (timedelta(hours=47), True)]:
             with self.subTest(timedelta=td, expected=expected):
-                result = _for_at_least(self.task, [], self.matcher, td)
+                result = _for_at_least(self.task, None, td)
                 self.assertEqual(expected, result)
 
 
@@ -206,6 +206,22 @@ class TestAssigned(TestCase):
         assigned = Assigned()
         self.assertFalse(assigned(task, self.client))
 
+    def test_assigned_to_user(self) -> None:
+        client = create_autospec(Client)
+        client.user.return_value = f.user(gid="1")
+        task = f.task(assignee=f.user(gid="1", name="Renamed"))
+        self.assertTrue(Assigned(to="a@b.com")(task, client))
+        self.assertTrue(Assigned(to="1")(task, client))
+        self.assertFalse(Assigned(to="a@b.com")(f.task(assignee=f.user()), client))
+        self.assertListEqual(
+            client.user.call_args_list, [call("a@b.com"), call("1"), call("a@b.com")]
+        )
+
+    def test_assigned_to_user_unassigned(self) -> None:
+        client = create_autospec(Client)
+        self.assertFalse(Assigned(to="a@b.com")(f.task(assignee=None), client))
+        client.user.assert_not_called()
+
 
 @freeze_time(datetime(2019, 1, 3, 6, 0, 0, tzinfo=timezone.utc))
 class TestOverdue(DateBasedTestCase):
@@ -311,6 +327,16 @@ class TestHasShortDescription(TestCase):
         self.assertTrue(has_short_description(task, self.client))
         matcher.assert_called_once_with("abc")
 
+    def test_literal(self) -> None:
+        predicate = HasDescription("bc")
+        self.assertTrue(predicate(f.task(notes="abc"), self.client))
+        self.assertFalse(predicate(f.task(notes="cba"), self.client))
+
+    def test_cpu_bound(self) -> None:
+        predicate = HasDescription(str.isupper, cpu_bound=True)
+        self.assertTrue(predicate(f.task(notes="ABC"), self.client))
+        self.assertFalse(predicate(f.task(notes="abc"), self.client))
+
 
 @freeze_time(datetime(2019, 1, 3, 6, 0, 0, tzinfo=timezone.utc))
 class TestDueWithin(DateBasedTestCase):
@@ -475,34 +501,20 @@ class TestIsInProject(TestCase):
     def test_call(self, for_at_least_mock: Mock) -> None:
         predicate = IsInProject("My project", for_at_least="2d")
         for_at_least_mock.return_value = return_sentinel = object()
-        self.client.stories_by_task.return_value = story_sentinel = object()
+        story = f.story(resource_subtype="added_to_project", project=self.project)
+        self.client.stories_by_task.return_value = [
+            story,
+            f.story(
+                resource_subtype="added_to_project",
+                project=f.project(gid="other-project-gid", name="Other project"),
+            ),
+            f.story(resource_subtype="comment_added"),
+        ]
 
         result = predicate(self.task, self.client)
 
         self.assertIs(result, return_sentinel)
-        for_at_least_mock.assert_called_once_with(
-            self.task, story_sentinel, predicate._story_matcher, timedelta(days=2)
-        )
-
-    def test_story_matcher(self) -> None:
-        matcher = IsInProject("My project")._story_matcher
-        self.assertTrue(
-            matcher(
-                f.story(
-                    resource_subtype="added_to_project",
-                    project=f.project(name="My project"),
-                )
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="added_to_project",
-                    project=f.project(name="Other project"),
-                )
-            )
-        )
-        self.assertFalse(matcher(f.story(resource_subtype="comment_added")))
+        for_at_least_mock.assert_called_once_with(self.task, story, timedelta(days=2))
 
 
 class TestIsInProjectAndSection(TestCase):
@@ -510,6 +522,36 @@ class TestIsInProjectAndSection(TestCase):
     project = f.project(name="My project")
     section = f.section(name="My section", project=project)
     task = f.task(memberships=[f.task_membership(project=project, section=section)])
+    added = f.story(
+        gid="1",
+        resource_subtype="added_to_project",
+        project=project,
+        created_at=datetime(2019, 1, 1, tzinfo=timezone.utc),
+    )
+    other_added = f.story(
+        gid="2",
+        resource_subtype="added_to_project",
+        project=f.project(gid="other-project-gid", name="Other project"),
+        created_at=datetime(2019, 1, 2, tzinfo=timezone.utc),
+    )
+    moved = f.story(
+        gid="3",
+        resource_subtype="section_changed",
+        new_section=section,
+        created_at=datetime(2019, 1, 3, tzinfo=timezone.utc),
+    )
+    moved_elsewhere = f.story(
+        gid="4",
+        resource_subtype="section_changed",
+        new_section=f.section(gid="other-section-gid", project=project),
+        created_at=datetime(2019, 1, 4, tzinfo=timezone.utc),
+    )
+    readded = f.story(
+        gid="5",
+        resource_subtype="added_to_project",
+        project=project,
+        created_at=datetime(2019, 1, 5, tzinfo=timezone.utc),
+    )
 
     def test_in_project_and_section_no_duration(self) -> None:
         predicate = IsInProjectAndSection("My project", "My section")
@@ -527,53 +569,31 @@ class TestIsInProjectAndSection(TestCase):
     def test_call(self, for_at_least_mock: Mock) -> None:
         predicate = IsInProjectAndSection("My project", "My section", for_at_least="2d")
         for_at_least_mock.return_value = return_sentinel = object()
-        self.client.stories_by_task.return_value = story_sentinel = object()
-
-        result = predicate(self.task, self.client)
-
-        self.assertIs(result, return_sentinel)
-        for_at_least_mock.assert_called_once_with(
-            self.task, story_sentinel, predicate._story_matcher, timedelta(days=2)
-        )
+        other_project = f.project(gid="other-project-gid", name="Other project")
+        cases = [
+            ([], None),
+            ([self.added, self.other_added], self.added),
+            ([self.added, self.moved, self.moved_elsewhere], self.moved),
+            ([self.added, self.moved, self.readded], self.readded),
+            (
+                [
+                    f.story(resource_subtype="added_to_project", project=other_project),
+                    f.story(resource_subtype="unknown"),
+                ],
+                None,
+            ),
+        ]
+        for stories, expected in cases:
+            with self.subTest(stories=stories):
+                for_at_least_mock.reset_mock()
+                self.client.stories_by_task.return_value = stories
 
-    def test_story_matcher(self) -> None:
-        matcher = IsInProjectAndSection("My project", "My section")._story_matcher
+                result = predicate(self.task, self.client)
 
-        self.assertTrue(
-            matcher(f.story(resource_subtype="added_to_project", project=self.project))
-        )
-        self.assertTrue(
-            matcher(
-                f.story(resource_subtype="section_changed", new_section=self.section)
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="added_to_project",
-                    project=f.project(name="Other project"),
-                )
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="section_changed",
-                    new_section=f.section(name="Other section", project=self.project),
-                )
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="section_changed",
-                    new_section=f.section(
-                        name="My section", project=f.project(name="Other project")
-                    ),
+                self.assertIs(result, return_sentinel)
+                for_at_least_mock.assert_called_once_with(
+                    self.task, expected, timedelta(days=2)
                 )
-            )
-        )
-        self.assertFalse(matcher(f.story(resource_subtype="unknown")))
 
 
 class TestHasEnumValue(TestCase):
@@ -620,36 +640,26 @@ class TestHasEnumValue(TestCase):
     def test_call(self, for_at_least_mock: Mock) -> None:
         predicate = HasEnumValue("My custom field", for_at_least="2d")
         for_at_least_mock.return_value = return_sentinel = object()
-        self.client.stories_by_task.return_value = story_sentinel = object()
+        changed = f.story(
+            gid="1",
+            resource_subtype="enum_custom_field_changed",
+            custom_field=self.custom_field,
+        )
+        self.client.stories_by_task.return_value = [
+            changed,
+            f.story(
+                gid="2",
+                resource_subtype="enum_custom_field_changed",
+                custom_field=f.custom_field(gid="other-gid", name="Other field"),
+            ),
+            f.story(gid="3", resource_subtype="unknown"),
+        ]
 
         result = predicate(self.task, self.client)
 
         self.assertIs(result, return_sentinel)
         self.client.stories_by_task.assert_called_once_with(self.task)
-        for_at_least_mock.assert_called_once_with(
-            self.task, story_sentinel, predicate._story_matcher, timedelta(days=2)
-        )
-
-    def test_story_matcher(self) -> None:
-        matcher = HasEnumValue("My custom field")._story_matcher
-
-        self.assertTrue(
-            matcher(
-                f.story(
-                    resource_subtype="enum_custom_field_changed",
-                    custom_field=self.custom_field,
-                )
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="enum_custom_field_changed",
-                    custom_field=f.custom_field(name="Other custom field"),
-                )
-            )
-        )
-        self.assertFalse(matcher(f.story(resource_subtype="unknown")))
+        for_at_least_mock.assert_called_once_with(self.task, changed, timedelta(days=2))
 
 
 class TestHasUnsetEnum(TestCase):
@@ -687,36 +697,26 @@ class TestHasUnsetEnum(TestCase):
     def test_call(self, for_at_least_mock: Mock) -> None:
         predicate = HasUnsetEnum("My custom field", for_at_least="2d")
         for_at_least_mock.return_value = return_sentinel = object()
-        self.client.stories_by_task.return_value = story_sentinel = object()
+        changed = f.story(
+            gid="1",
+            resource_subtype="enum_custom_field_changed",
+            custom_field=self.custom_field,
+        )
+        self.client.stories_by_task.return_value = [
+            changed,
+            f.story(
+                gid="2",
+                resource_subtype="enum_custom_field_changed",
+                custom_field=f.custom_field(gid="other-gid", name="Other field"),
+            ),
+            f.story(gid="3", resource_subtype="unknown"),
+        ]
 
         result = predicate(self.task, self.client)
 
         self.assertIs(result, return_sentinel)
         self.client.stories_by_task.assert_called_once_with(self.task)
-        for_at_least_mock.assert_called_once_with(
-            self.task, story_sentinel, predicate._story_matcher, timedelta(days=2)
-        )
-
-    def test_story_matcher(self) -> None:
-        matcher = HasUnsetEnum("My custom field")._story_matcher
-
-        self.assertTrue(
-            matcher(
-                f.story(
-                    resource_subtype="enum_custom_field_changed",
-                    custom_field=self.custom_field,
-                )
-            )
-        )
-        self.assertFalse(
-            matcher(
-                f.story(
-                    resource_subtype="enum_custom_field_changed",
-                    custom_field=f.custom_field(name="Other custom field"),
-                )
-            )
-        )
-        self.assertFalse(matcher(f.story(resource_subtype="unknown")))
+        for_at_least_mock.assert_called_once_with(self.task, changed, timedelta(days=2))
 
 
 @freeze_time(datetime(2019, 1, 3, 12, 0, 0, tzinfo=timezone.utc))
@@ -776,12 +776,14 @@ class TestUntriaged(TestCase):
         self.client.me.assert_called_once_with()
         self.client.stories_by_task.assert_called_once_with(self.task)
 
-    def test_story_matcher(self) -> None:
-        user = f.user(gid="1")
-        matcher = partial(self.predicate._story_matcher, user)
-        self.assertTrue(matcher(f.story(created_by=user)))
-        self.assertFalse(matcher(f.story(created_by=f.user(gid="2"))))
-        self.assertFalse(matcher(f.story(created_by=None)))
+    def test_story_by_other_user(self) -> None:
+        self.client.me.return_value = self.user
+        self.client.stories_by_task.return_value = [
+            f.story(created_by=f.user(gid="other-user-gid")),
+            f.story(created_by=None),
+        ]
+
+        self.assertTrue(self.predicate(self.task, self.client))
 
 
 class TestHasComment(TestCase):
@@ -805,6 +807,28 @@ class TestHasComment(TestCase):
         matcher.assert_called_once_with(self.story.text)
         self.client.stories_by_task.assert_called_once_with(self.task)
 
+    def test_match_comment_literal(self) -> None:
+        self.assertTrue(HasComment("text").match_comment(self.story))
+        self.assertFalse(HasComment("other").match_comment(self.story))
+
+    def test_literal_with_text_matcher(self) -> None:
+        self.client.stories_by_task.return_value = [self.story]
+        matcher = TextMatcher(["Comment", "other"])
+        with task_pass(self.task, matcher) as current:
+            self.assertTrue(HasComment("Comment")(self.task, self.client))
+            self.assertFalse(HasComment("other")(self.task, self.client))
+            # Patterns the matcher doesn't know are searched for directly
+            self.assertTrue(HasComment("text")(self.task, self.client))
+        self.assertDictEqual(current.text_matches, {"Comment text": {"Comment"}})
+
+    def test_cpu_bound(self) -> None:
+        loud = f.story(resource_subtype="comment_added", text="LOUD")
+        self.client.stories_by_task.return_value = [self.story]
+        predicate = HasComment(str.isupper, cpu_bound=True)
+        self.assertFalse(predicate(self.task, self.client))
+        self.client.stories_by_task.return_value = [self.story, loud]
+        self.assertTrue(predicate(f.task(gid="2"), self.client))
+
     def test_has_no_matching_comment(self) -> None:
         self.client.stories_by_task.return_value = [self.story]
         matcher = Mock(return_value=False)
@@ -845,6 +869,10 @@ class TestHasExternal(TestCase):
         task = f.task(external=None)
         self.assertFalse(predicate(task, self.client))
 
+    def test_cpu_bound(self) -> None:
+        predicate = HasExternal(bool, cpu_bound=True)
+        self.assertTrue(predicate(f.task(external=f.external()), self.client))
+
     def test_matching_external(self) -> None:
         matcher = Mock(return_value=True)
         external = f.external()
@@ -860,3 +888,228 @@ class TestHasExternal(TestCase):
         task = f.task(external=external)
         self.assertFalse(predicate(task, self.client))
         matcher.assert_called_once_with(external)
+
+
+class TestTextPatterns(TestCase):
+    def test_text_patterns(self) -> None:
+        predicate = (HasComment("a") & ~HasDescription("b")) | HasComment("c")
+        self.assertSetEqual(text_patterns(predicate), {"a", "b", "c"})
+
+    def test_no_literal_patterns(self) -> None:
+        for predicate in [HasComment(), HasDescription(), IsComplete()]:
+            with self.subTest(predicate=predicate):
+                self.assertSetEqual(text_patterns(predicate), set())
+
+
+class TestDependencies(TestCase):
+    def test_undeclared(self) -> None:
+        self.assertEqual(TestPredicate().dependencies(), EVERYTHING)
+
+    def test_combinators(self) -> None:
+        assigned, complete = Assigned(), IsComplete()
+        both = Dependencies(fields={"assignee", "completed"})
+        self.assertEqual((assigned & complete).dependencies(), both)
+        self.assertEqual((assigned | complete).dependencies(), both)
+        self.assertEqual((~assigned).dependencies(), assigned.dependencies())
+
+    def test_predicates(self) -> None:
+        due_date = {"due_at", "due_on"}
+        cases: List[Tuple[Predicate, Dependencies]] = [
+            (AlwaysTrue(), NOTHING),
+            (Assigned(), Dependencies(fields={"assignee"})),
+            (Unassigned(), Dependencies(fields={"assignee"})),
+            (DueToday(timezone.utc), Dependencies(fields=due_date, temporal=True)),
+            (Overdue(timezone.utc), Dependencies(fields=due_date, temporal=True)),
+            (
+                DueWithin("1d", timezone.utc),
+                Dependencies(fields=due_date, temporal=True),
+            ),
+            (HasComment(), Dependencies(story_subtypes={"comment_added"})),
+            (HasEnumValue("Field"), Dependencies(fields={"custom_fields"})),
+            (
+                HasUnsetEnum("Field", for_at_least="1d"),
+                Dependencies(
+                    fields={"custom_fields"},
+                    story_subtypes={"enum_custom_field_changed"},
+                    temporal=True,
+                ),
+            ),
+            (HasExternal(), Dependencies(fields={"external"})),
+            (HasNoDueDate(), Dependencies(fields=due_date)),
+            (HasDescription(), Dependencies(fields={"notes"})),
+            (IsComplete(), Dependencies(fields={"completed"})),
+            (IsIncomplete(), Dependencies(fields={"completed"})),
+            (IsInProject("Project"), Dependencies(fields={"memberships"})),
+            (
+                IsInProject("Project", for_at_least="1d"),
+                Dependencies(
+                    fields={"memberships"},
+                    story_subtypes={"added_to_project"},
+                    temporal=True,
+                ),
+            ),
+            (
+                IsInProjectAndSection("Project", "Section", for_at_least="1d"),
+                Dependencies(
+                    fields={"memberships"},
+                    story_subtypes={"added_to_project", "section_changed"},
+                    temporal=True,
+                ),
+            ),
+            (Untriaged(), Dependencies(story_subtypes={ANY_STORY})),
+            (
+                Untriaged(for_at_least="1d"),
+                Dependencies(story_subtypes={ANY_STORY}, temporal=True),
+            ),
+        ]
+        for predicate, expected in cases:
+            with self.subTest(predicate=predicate):
+                self.assertEqual(predicate.dependencies(), expected)
+
+
+@freeze_time(datetime(2019, 1, 2, 12, 0, 0, tzinfo=timezone.utc))
+class TestNextChange(TestCase):
+    def setUp(self) -> None:
+        self.client = create_autospec(Client)
+        self.client.stories_by_task.return_value = []
+        self.tomorrow = datetime(2019, 1, 3, tzinfo=timezone.utc)
+
+    def at(self, day: int, hour: int = 0, tz: timezone = timezone.utc) -> datetime:
+        return datetime(2019, 1, day, hour, tzinfo=tz)
+
+    def test_undeclared(self) -> None:
+        self.assertIsNone(TestPredicate().next_change(f.task(), self.client))
+
+    def test_combinators(self) -> None:
+        task = f.task(due_on=date(2019, 1, 3))
+        overdue, due_today, complete = (
+            Overdue(timezone.utc),
+            DueToday(PST),
+            IsComplete(),
+        )
+        self.assertEqual(
+            (overdue & due_today).next_change(task, self.client), self.at(3, 8)
+        )
+        self.assertEqual(
+            (overdue | complete).next_change(task, self.client), self.at(4)
+        )
+        self.assertEqual((~overdue).next_change(task, self.client), self.at(4))
+        self.assertIsNone((~complete).next_change(task, self.client))
+
+    def test_overdue(self) -> None:
+        predicate = Overdue(PST)
+        cases = [
+            (f.task(due_at=self.at(2, 18)), self.at(2, 18)),
+            (f.task(due_at=self.at(2, 6)), None),
+            (f.task(due_on=date(2019, 1, 2)), self.at(3, tz=PST)),
+            (f.task(due_on=date(2018, 12, 31)), None),
+            (f.task(), None),
+        ]
+        for task, expected in cases:
+            with self.subTest(task=task):
+                self.assertEqual(predicate.next_change(task, self.client), expected)
+
+    def test_due_today(self) -> None:
+        predicate = DueToday(PST)
+        cases = [
+            (f.task(due_on=date(2019, 1, 3)), self.at(3, tz=PST)),
+            (f.task(due_on=date(2019, 1, 2)), self.at(3, tz=PST)),
+            (f.task(due_on=date(2019, 1, 1)), None),
+            (f.task(due_at=self.at(4, 12)), self.at(4, tz=PST)),
+            (f.task(), None),
+        ]
+        for task, expected in cases:
+            with self.subTest(task=task):
+                self.assertEqual(predicate.next_change(task, self.client), expected)
+
+    def test_pytz_timezone(self) -> None:
+        pacific = pytz.timezone("America/Los_Angeles")
+        task = f.task(due_on=date(2019, 1, 2))
+        cases = [
+            (DueToday(pacific), self.at(3, 8)),
+            (Overdue(pacific), self.at(3, 8)),
+            (DueWithin("1h", pacific), self.at(3, 8)),
+        ]
+        for predicate, expected in cases:
+            with self.subTest(predicate=predicate):
+                self.assertEqual(predicate.next_change(task, self.client), expected)
+
+    def test_due_within(self) -> None:
+        predicate = DueWithin("1d", timezone.utc)
+        cases = [
+            (f.task(due_at=self.at(4, 12)), self.at(3, 12)),
+            (f.task(due_at=self.at(3, 6)), self.at(3, 6)),
+            (f.task(due_at=self.at(1)), None),
+            (f.task(due_on=date(2019, 1, 5)), self.at(4)),
+            (f.task(due_on=date(2019, 1, 3)), self.at(4)),
+            (f.task(), None),
+        ]
+        for task, expected in cases:
+            with self.subTest(task=task):
+                self.assertEqual(predicate.next_change(task, self.client), expected)
+
+    def test_enum_value(self) -> None:
+        task = f.task(custom_fields=[f.custom_field(name="Field")])
+        self.assertEqual(
+            HasUnsetEnum("Field", for_at_least="2d").next_change(task, self.client),
+            self.at(3),
+        )
+        self.assertIsNone(HasUnsetEnum("Field").next_change(task, self.client))
+        self.assertIsNone(
+            HasEnumValue("Field", for_at_least="2d").next_change(task, self.client)
+        )
+
+    def test_in_project(self) -> None:
+        project = f.project(name="Project")
+        task = f.task(memberships=[f.task_membership(project=project)])
+        self.client.stories_by_task.return_value = [
+            f.story(
+                resource_subtype="added_to_project",
+                project=project,
+                created_at=self.at(2),
+            )
+        ]
+        self.assertEqual(
+            IsInProject("Project", for_at_least="1d").next_change(task, self.client),
+            self.at(3),
+        )
+        self.assertIsNone(IsInProject("Project").next_change(task, self.client))
+        self.assertIsNone(
+            IsInProject("Other", for_at_least="1d").next_change(task, self.client)
+        )
+        self.assertIsNone(
+            IsInProject("Project", for_at_least=timedelta.max).next_change(
+                task, self.client
+            )
+        )
+
+    def test_in_project_and_section(self) -> None:
+        project = f.project(name="Project")
+        section = f.section(name="Section", project=project)
+        task = f.task(memberships=[f.task_membership(project, section)])
+        self.client.stories_by_task.return_value = [
+            f.story(
+                resource_subtype="section_changed",
+                new_section=section,
+                created_at=self.at(2, 6),
+            )
+        ]
+        predicate = IsInProjectAndSection("Project", "Section", for_at_least="1d")
+        self.assertEqual(predicate.next_change(task, self.client), self.at(3, 6))
+        self.assertIsNone(
+            IsInProjectAndSection("Project", "Other", for_at_least="1d").next_change(
+                task, self.client
+            )
+        )
+
+    def test_untriaged(self) -> None:
+        task = f.task()
+        self.client.me.return_value = me = f.user(gid="me")
+        self.assertIsNone(Untriaged(for_at_least="1d").next_change(task, self.client))
+        self.client.stories_by_task.return_value = [
+            f.story(created_by=me, created_at=self.at(2, 6))
+        ]
+        self.assertEqual(
+            Untriaged(for_at_least="1d").next_change(task, self.client), self.at(3, 6)
+        )
+        self.assertIsNone(Untriaged().next_change(task, self.client))
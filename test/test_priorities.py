@@ -0,0 +1,43 @@
+from datetime import date, datetime, timedelta, timezone
+from test import fixtures as f
+from unittest import TestCase
+
+from freezegun import freeze_time
+
+from archie.priorities import by_due_date, by_recent_modification, most_urgent
+
+NOW = datetime(2019, 1, 2, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@freeze_time(NOW)
+class TestPriorities(TestCase):
+    def test_by_due_date(self) -> None:
+        cases = [
+            (f.task(due_at=NOW - timedelta(minutes=1)), 0),
+            (f.task(due_on=date(2019, 1, 1)), 0),
+            (f.task(due_on=date(2019, 1, 2)), 1),
+            (f.task(due_at=NOW + timedelta(days=3)), 2),
+            (f.task(due_on=date(2019, 2, 1)), 3),
+            (f.task(), 3),
+        ]
+        for task, band in cases:
+            with self.subTest(due_on=task.due_on, due_at=task.due_at):
+                self.assertEqual(by_due_date(task), band)
+
+    def test_by_recent_modification(self) -> None:
+        cases = [
+            (NOW - timedelta(minutes=5), 0),
+            (NOW - timedelta(hours=5), 1),
+            (NOW - timedelta(days=5), 2),
+            (None, 2),
+        ]
+        for modified_at, band in cases:
+            with self.subTest(modified_at=modified_at):
+                task = f.task(modified_at=modified_at)
+                self.assertEqual(by_recent_modification(task), band)
+
+    def test_most_urgent(self) -> None:
+        priority = most_urgent(by_due_date, by_recent_modification)
+        self.assertEqual(priority(f.task(modified_at=NOW)), 0)
+        self.assertEqual(priority(f.task(due_on=date(2019, 1, 2))), 1)
+        self.assertEqual(priority(f.task()), 2)
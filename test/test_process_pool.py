@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from test import fixtures as f
+from typing import Any
+from unittest import TestCase
+from unittest.mock import Mock, create_autospec, patch
+
+from archie import Triager, _process_pool
+from archie._process_pool import any_in_process, call_in_process, process_pool
+from archie.actions import Action
+from archie.asana.client import Client
+from archie.predicates import HasDescription
+from archie.sources import TaskSource
+
+
+def running_pool() -> ProcessPoolExecutor:
+    pool = process_pool()
+    if pool is None:
+        raise AssertionError("No process pool")
+    return pool
+
+
+class TestProcessPool(TestCase):
+    def test_shared(self) -> None:
+        self.assertIs(process_pool(), process_pool())
+
+    def test_not_forked(self) -> None:
+        self.assertIsNot(running_pool()._mp_context, get_context("fork"))
+
+    def test_call(self) -> None:
+        self.assertEqual(call_in_process(len, "abc"), 3)
+
+    def test_any(self) -> None:
+        self.assertTrue(any_in_process(str.isupper, ["a", "B", "c"]))
+        self.assertFalse(any_in_process(str.isupper, ["a", "b"]))
+        self.assertFalse(any_in_process(str.isupper, []))
+
+
+class TestBrokenProcessPool(TestCase):
+    def setUp(self) -> None:
+        for name in ["_pool", "_disabled"]:
+            patcher = patch.object(_process_pool, name, getattr(_process_pool, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        _process_pool._pool, _process_pool._disabled = None, False
+
+    def test_restarted(self) -> None:
+        self.assertEqual(call_in_process(len, "abc"), 3)
+        broken = running_pool()
+        # Kill a worker, which breaks the whole pool
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+        with self.assertLogs("archie._process_pool", "WARNING"):
+            self.assertEqual(call_in_process(len, "abcd"), 4)
+        # Later work goes to a new pool
+        self.assertTrue(any_in_process(str.isupper, ["a", "B"]))
+        self.assertIsNotNone(process_pool())
+        self.assertIsNot(process_pool(), broken)
+
+    @patch("archie._process_pool.ProcessPoolExecutor")
+    def test_workers_fail_to_start(self, executor_class: Mock) -> None:
+        executor_class.return_value.submit.side_effect = BrokenProcessPool()
+        executor_class.return_value.map.side_effect = BrokenProcessPool()
+        with self.assertLogs("archie._process_pool", "ERROR") as logs:
+            self.assertEqual(call_in_process(len, "abc"), 3)
+        self.assertIn('__name__ == "__main__"', logs.output[0])
+        # No more pools are started, and work runs in the calling thread instead
+        self.assertIsNone(process_pool())
+        self.assertTrue(any_in_process(str.isupper, ["a", "B"]))
+        executor_class.assert_called_once()
+        executor_class.return_value.map.assert_not_called()
+
+    @patch("archie._process_pool.ProcessPoolExecutor")
+    def test_replaced_concurrently(self, executor_class: Mock) -> None:
+        replacement = _process_pool._Pool(Mock())
+
+        def break_pool(*args: Any) -> None:
+            # Another thread finds the pool broken and replaces it first
+            _process_pool._pool = replacement
+            raise BrokenProcessPool()
+
+        executor_class.return_value.submit.side_effect = break_pool
+        self.assertEqual(call_in_process(len, "abc"), 3)
+        self.assertIs(_process_pool._pool, replacement)
+        self.assertFalse(_process_pool._disabled)
+
+    @patch("archie.triager.Client")
+    def test_triage_recovers(self, client_mock: Mock) -> None:
+        client = client_mock.return_value = create_autospec(Client)
+        client.project_by_gid.return_value = project = f.project()
+        source = create_autospec(TaskSource)
+        source.project_gid = project.gid
+        source.iterator.return_value = [f.task(notes="URGENT")]
+        triager = Triager("access_token", source)
+        action = create_autospec(Action)
+        triager.when(HasDescription(str.isupper, cpu_bound=True))(lambda task: [action])
+        call_in_process(len, "abc")
+        # Kill a worker, so the rule's predicate finds the pool broken
+        with self.assertRaises(BrokenProcessPool):
+            running_pool().submit(os._exit, 1).result()
+        with self.assertLogs("archie._process_pool", "WARNING"):
+            triager.triage()
+        action.assert_called_once()
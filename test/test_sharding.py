@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+from test import fixtures as f
+from threading import Event
+from unittest import TestCase
+from unittest.mock import Mock, create_autospec
+
+from freezegun import freeze_time
+
+from archie.asana.client import Client
+from archie.metrics import metrics
+from archie.sharding import HashRing, ShardedSource, SQLiteMembership
+from archie.sources import TaskSource
+
+
+class TestHashRing(TestCase):
+    def setUp(self) -> None:
+        self.keys = [str(gid) for gid in range(3000)]
+
+    def test_single_member(self) -> None:
+        ring = HashRing(["a"])
+        self.assertTrue(all(ring.owner(key) == "a" for key in self.keys))
+
+    def test_even_spread(self) -> None:
+        ring = HashRing(["a", "b", "c"])
+        owners = [ring.owner(key) for key in self.keys]
+        for member in ring.members:
+            self.assertGreater(owners.count(member), 700)
+
+    def test_only_removed_keys_move(self) -> None:
+        before, after = HashRing(["a", "b", "c"]), HashRing(["a", "b"])
+        for key in self.keys:
+            if before.owner(key) != "c":
+                self.assertEqual(after.owner(key), before.owner(key))
+
+    def test_no_members(self) -> None:
+        with self.assertRaises(ValueError):
+            HashRing([])
+
+
+class TestSQLiteMembership(TestCase):
+    def test_members(self) -> None:
+        with freeze_time(datetime(2019, 1, 1, 12, 0, 0)) as clock:
+            membership = SQLiteMembership(":memory:", ttl="1m")
+            membership.heartbeat("b")
+            membership.heartbeat("a")
+            self.assertListEqual(membership.members(), ["a", "b"])
+            clock.tick(timedelta(seconds=90))
+            membership.heartbeat("a")
+            self.assertListEqual(membership.members(), ["a"])
+            membership.leave("a")
+            self.assertListEqual(membership.members(), [])
+            membership.close()
+
+
+class TestShardedSource(TestCase):
+    def setUp(self) -> None:
+        self.client = create_autospec(Client)
+        self.tasks = [f.task(gid=str(gid)) for gid in range(20)]
+        self.inner = create_autospec(TaskSource)
+        self.inner.project_gid = "project-gid"
+        self.inner.iterator.side_effect = lambda client: iter(self.tasks)
+        self.membership = SQLiteMembership(":memory:")
+
+    def tearDown(self) -> None:
+        self.membership.close()
+
+    def test_split(self) -> None:
+        self.membership.heartbeat("a")
+        self.membership.heartbeat("b")
+        first = ShardedSource(self.inner, "a", self.membership)
+        second = ShardedSource(self.inner, "b", self.membership)
+        first_tasks = [task for task in self.tasks if first.owns(task)]
+        second_tasks = list(second.iterator(self.client))
+        self.assertTrue(first_tasks)
+        self.assertTrue(second_tasks)
+        self.assertListEqual(
+            sorted(first_tasks + second_tasks, key=lambda task: int(task.gid)),
+            self.tasks,
+        )
+        # Tasks owned by the other worker are acknowledged without being processed
+        self.assertEqual(self.inner.ack.call_count, len(first_tasks))
+        self.assertEqual(metrics.gauge("sharding.members", project="project-gid"), 2)
+        # Workers leave once they've finished iterating
+        self.assertListEqual(self.membership.members(), ["a"])
+
+    def test_refresh(self) -> None:
+        source = ShardedSource(self.inner, "a", self.membership, refresh_every="0m")
+        self.assertTrue(all(source.owns(task) for task in self.tasks))
+        self.membership.heartbeat("b")
+        self.assertFalse(all(source.owns(task) for task in self.tasks))
+
+    def test_heartbeats(self) -> None:
+        membership, stop = Mock(), Event()
+        membership.heartbeat.side_effect = lambda member_id: stop.set()
+        source = ShardedSource(self.inner, "a", membership, refresh_every="0m")
+        source._send_heartbeats(stop)
+        membership.heartbeat.assert_called_once_with("a")
+
+    def test_failed_heartbeat(self) -> None:
+        membership, stop = Mock(), Event()
+
+        def heartbeat(member_id: str) -> None:
+            if membership.heartbeat.call_count == 1:
+                raise Exception("Failed")
+            stop.set()
+
+        membership.heartbeat.side_effect = heartbeat
+        source = ShardedSource(self.inner, "a", membership, refresh_every="0m")
+        before = metrics.counter("sharding.heartbeat_errors", project="project-gid")
+        with self.assertLogs("archie.sharding", "WARNING"):
+            source._send_heartbeats(stop)
+        # The thread keeps sending heartbeats after one fails
+        self.assertEqual(membership.heartbeat.call_count, 2)
+        self.assertEqual(
+            metrics.counter("sharding.heartbeat_errors", project="project-gid"),
+            before + 1,
+        )
+
+    def test_failed_members(self) -> None:
+        membership = Mock()
+        membership.members.return_value = ["b"]
+        source = ShardedSource(self.inner, "a", membership, refresh_every="0m")
+        owned = [task for task in self.tasks if source.owns(task)]
+        membership.members.side_effect = Exception("Failed")
+        before = metrics.counter("sharding.membership_errors", project="project-gid")
+        with self.assertLogs("archie.sharding", "WARNING"):
+            # The last known workers are kept
+            self.assertListEqual(
+                [task for task in self.tasks if source.owns(task)], owned
+            )
+        self.assertLess(len(owned), len(self.tasks))
+        self.assertEqual(
+            metrics.counter("sharding.membership_errors", project="project-gid"),
+            before + len(self.tasks),
+        )
+
+    def test_failed_first_members(self) -> None:
+        membership = Mock()
+        membership.members.side_effect = Exception("Failed")
+        source = ShardedSource(self.inner, "a", membership)
+        with self.assertLogs("archie.sharding", "WARNING"):
+            self.assertTrue(all(source.owns(task) for task in self.tasks))
+        # Failures are only retried once the ring is due to be refreshed
+        membership.members.assert_called_once()
+
+    def test_delegate(self) -> None:
+        source = ShardedSource(self.inner, "a", self.membership)
+        task, at = f.task(), datetime(2019, 1, 1, tzinfo=timezone.utc)
+        source.schedule_wakeup(task, at)
+        self.inner.schedule_wakeup.assert_called_once_with(task, at)
+        source.ack(task, failed=True)
+        self.inner.ack.assert_called_once_with(task, failed=True)
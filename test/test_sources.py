@@ -1,13 +1,19 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from test import fixtures as f
-from typing import Iterator
+from typing import Any, Iterator, List
 from unittest import TestCase
 from unittest.mock import create_autospec, patch
 
+from asana.error import NotFoundError  # type: ignore
 from freezegun import freeze_time
 
 from archie.asana.client import Client
 from archie.asana.models import Task
+from archie.checkpoints import CheckpointStore
+from archie.metrics import metrics
+from archie.mirror import TaskMirror
+from archie.polling import AdaptiveInterval
 from archie.sources import ModifiedSinceSource, PollingSource, TaskSource
 
 
@@ -59,6 +65,193 @@ class TestPollingSource(TestCase):
             self.project, only_incomplete=True
         )
         self.assertIs(next(iterator), task4)
+        source.ack(task4)
+
+    @patch("archie.sources.ModifiedSinceSource.POLLING_DELAY", timedelta())
+    @freeze_time(datetime(2019, 1, 1, 12, 0, 0))
+    def test_checkpoints(self) -> None:
+        checkpoints = create_autospec(CheckpointStore)
+        checkpoints.load.return_value = datetime(2019, 1, 1, 11, 0, 0)
+        source = ModifiedSinceSource(self.project.gid, checkpoints=checkpoints)
+        checkpoints.load.assert_called_once_with(self.project.gid)
+        task1, task2, task3 = f.task(gid="1"), f.task(gid="2"), f.task(gid="3")
+        self.client.tasks_by_project.side_effect = [[task1, task2], [task3]]
+        iterator = source.iterator(self.client)
+        self.assertIs(next(iterator), task1)
+        self.client.tasks_by_project.assert_called_once_with(
+            self.project,
+            only_incomplete=False,
+            modified_since=datetime(2019, 1, 1, 11, 0, 0),
+        )
+        self.assertIs(next(iterator), task2)
+        source.ack(task2)
+        self.assertIs(next(iterator), task3)
+        # The second poll is done, but the first still has a task outstanding
+        source.ack(task3)
+        checkpoints.save.assert_not_called()
+        source.ack(task1)
+        checkpoints.save.assert_called_once_with(
+            self.project.gid, datetime(2019, 1, 1, 12, 0, 0)
+        )
+        # Acknowledging a task that isn't outstanding does nothing
+        source.ack(task1)
+        checkpoints.save.assert_called_once()
+
+    @patch("archie.sources.ModifiedSinceSource.POLLING_DELAY", timedelta())
+    def test_checkpoints_with_debounce(self) -> None:
+        with freeze_time(datetime(2019, 1, 1, 12, 0, 0)) as clock:
+            checkpoints = create_autospec(CheckpointStore)
+            checkpoints.load.return_value = None
+            source = ModifiedSinceSource(
+                self.project.gid, debounce="1m", checkpoints=checkpoints
+            )
+            task = f.task(gid="1")
+            polls = iter([[task], []])
+
+            def poll(*args: Any, **kwargs: Any) -> List[Task]:
+                tasks = next(polls)
+                clock.tick(timedelta(minutes=1))
+                return tasks
+
+            self.client.tasks_by_project.side_effect = poll
+            self.assertIs(next(source.iterator(self.client)), task)
+            # The poll that found the task can't be checkpointed until it's processed
+            checkpoints.save.assert_not_called()
+            source.ack(task)
+            checkpoints.save.assert_called_once_with(
+                self.project.gid, datetime(2019, 1, 1, 12, 1, 0)
+            )
+
+    def test_wakeup(self) -> None:
+        source = PollingSource(
+            self.project.gid, repeat_after=timedelta(milliseconds=50)
+        )
+        iterator = self.check_first_poll(source, only_incomplete=True)
+        task = f.task(gid="1")
+        source.schedule_wakeup(task, datetime.now(timezone.utc))
+        refreshed = f.task(gid="1", name="New", memberships=[f.task_membership()])
+        self.client.task_by_gid.return_value = refreshed
+        self.assertIs(next(iterator), refreshed)
+        self.client.task_by_gid.assert_called_once_with("1")
+
+        # Once no more wakeups are due, the source polls again
+        self.client.tasks_by_project.return_value = [task3] = [f.task(gid="3")]
+        self.assertIs(next(iterator), task3)
+
+    def test_dropped_wakeups(self) -> None:
+        source = PollingSource(
+            self.project.gid, repeat_after=timedelta(milliseconds=50)
+        )
+        iterator = self.check_first_poll(source, only_incomplete=True)
+        membership = f.task_membership()
+        tasks = {
+            "moved": f.task(gid="moved"),
+            "completed": f.task(
+                gid="completed", completed=True, memberships=[membership]
+            ),
+            "due": f.task(gid="due", memberships=[membership]),
+        }
+
+        def task_by_gid(gid: str) -> Task:
+            if gid == "deleted":
+                raise NotFoundError("task not found")
+            return tasks[gid]
+
+        self.client.task_by_gid.side_effect = task_by_gid
+        now = datetime.now(timezone.utc)
+        for gid in ["deleted", "moved", "completed"]:
+            source.schedule_wakeup(f.task(gid=gid), now)
+        source.schedule_wakeup(tasks["due"], now + timedelta(milliseconds=10))
+        with self.assertLogs("archie.sources", "INFO") as logs:
+            self.assertIs(next(iterator), tasks["due"])
+        self.assertEqual(len(logs.records), 3)
+        self.assertIn("task deleted", "".join(logs.output))
+
+    def test_skip_unchanged(self) -> None:
+        source = PollingSource(
+            self.project.gid, repeat_after="0m", skip_unchanged=True, full_pass_every=3
+        )
+        unchanged, changed = f.task(gid="1"), f.task(gid="2")
+        due = f.task(gid="3")
+        self.client.tasks_by_project.return_value = [unchanged, changed, due]
+        iterator = source.iterator(self.client)
+        self.assertListEqual(list(islice(iterator, 3)), [unchanged, changed, due])
+
+        edited = f.task(gid="2", name="Edited")
+        self.client.tasks_by_project.return_value = [unchanged, edited, due]
+        source._wakeups.schedule(due.gid, datetime.now(timezone.utc))
+        self.assertListEqual(list(islice(iterator, 2)), [edited, due])
+        self.assertEqual(
+            metrics.gauge("source.skip_ratio", project="project-gid"), 1 / 3
+        )
+
+        # The third poll is a full pass, after which unchanged tasks are skipped again
+        self.assertListEqual(list(islice(iterator, 3)), [unchanged, edited, due])
+        self.client.tasks_by_project.return_value = [unchanged, new] = [
+            unchanged,
+            f.task(gid="4"),
+        ]
+        self.assertIs(next(iterator), new)
+
+    def test_retry_failed(self) -> None:
+        source = PollingSource(self.project.gid, repeat_after="0m", skip_unchanged=True)
+        failed, succeeded = f.task(gid="1"), f.task(gid="2")
+        self.client.tasks_by_project.return_value = [failed, succeeded]
+        iterator = source.iterator(self.client)
+        self.assertListEqual(list(islice(iterator, 2)), [failed, succeeded])
+        source.ack(failed, failed=True)
+        source.ack(succeeded)
+        # Only the task that failed is provided again, despite being unchanged
+        self.assertIs(next(iterator), failed)
+        source.ack(failed)
+        self.client.tasks_by_project.return_value = [failed, succeeded, new] = [
+            failed,
+            succeeded,
+            f.task(gid="3"),
+        ]
+        self.assertIs(next(iterator), new)
+
+    def test_forget_fingerprints(self) -> None:
+        source = PollingSource(
+            self.project.gid, repeat_after="0m", skip_unchanged=True, max_fingerprints=1
+        )
+        tasks = [f.task(gid="1"), f.task(gid="2")]
+        self.client.tasks_by_project.return_value = tasks
+        iterator = source.iterator(self.client)
+        self.assertListEqual(list(islice(iterator, 3)), [*tasks, tasks[0]])
+
+    def test_adaptive_interval(self) -> None:
+        interval = AdaptiveInterval(timedelta(), timedelta(), busy_threshold=1)
+        source = PollingSource(self.project.gid, repeat_after=interval)
+        iterator = self.check_first_poll(source, only_incomplete=True)
+        self.client.tasks_by_project.return_value = [task3] = [f.task(gid="3")]
+        self.assertIs(next(iterator), task3)
+        self.assertEqual(
+            metrics.gauge("polling.interval_seconds", project=self.project.gid), 0
+        )
+
+    def test_mirror(self) -> None:
+        mirror = create_autospec(TaskMirror)
+        mirror.tasks.return_value = tasks = [f.task(gid="1")]
+        source = PollingSource(self.project.gid, mirror=mirror)
+        self.assertListEqual(list(source.iterator(self.client)), tasks)
+        mirror.sync.assert_called_once_with(self.client, self.project)
+        mirror.tasks.assert_called_once_with(self.project)
+        self.client.tasks_by_project.assert_not_called()
+
+    def test_mirror_with_complete_tasks(self) -> None:
+        with self.assertRaises(ValueError):
+            PollingSource(self.project.gid, only_incomplete=False, mirror=TaskMirror())
+
+
+class TestTaskSource(TestCase):
+    def test_ignore_wakeups(self) -> None:
+        source = create_autospec(TaskSource)
+        TaskSource.schedule_wakeup(source, f.task(), datetime.now(timezone.utc))
+
+    def test_ignore_acks(self) -> None:
+        source = create_autospec(TaskSource)
+        TaskSource.ack(source, f.task())
 
 
 class TestModifiedSinceSource(TestCase):
@@ -97,3 +290,97 @@ class TestModifiedSinceSource(TestCase):
             modified_since=datetime(2019, 1, 1, 12, 1, 0),
         )
         self.assertIs(next(iterator), task4)
+        source.ack(task4)
+
+    @patch("archie.sources.ModifiedSinceSource.POLLING_DELAY", timedelta())
+    @freeze_time(datetime(2019, 1, 1, 12, 0, 0))
+    def test_checkpoints(self) -> None:
+        checkpoints = create_autospec(CheckpointStore)
+        checkpoints.load.return_value = datetime(2019, 1, 1, 11, 0, 0)
+        source = ModifiedSinceSource(self.project.gid, checkpoints=checkpoints)
+        checkpoints.load.assert_called_once_with(self.project.gid)
+        task1, task2, task3 = f.task(gid="1"), f.task(gid="2"), f.task(gid="3")
+        self.client.tasks_by_project.side_effect = [[task1, task2], [task3]]
+        iterator = source.iterator(self.client)
+        self.assertIs(next(iterator), task1)
+        self.client.tasks_by_project.assert_called_once_with(
+            self.project,
+            only_incomplete=False,
+            modified_since=datetime(2019, 1, 1, 11, 0, 0),
+        )
+        self.assertIs(next(iterator), task2)
+        source.ack(task2)
+        self.assertIs(next(iterator), task3)
+        # The second poll is done, but the first still has a task outstanding
+        source.ack(task3)
+        checkpoints.save.assert_not_called()
+        source.ack(task1)
+        checkpoints.save.assert_called_once_with(
+            self.project.gid, datetime(2019, 1, 1, 12, 0, 0)
+        )
+        # Acknowledging a task that isn't outstanding does nothing
+        source.ack(task1)
+        checkpoints.save.assert_called_once()
+
+    @patch("archie.sources.ModifiedSinceSource.POLLING_DELAY", timedelta())
+    def test_checkpoints_with_debounce(self) -> None:
+        with freeze_time(datetime(2019, 1, 1, 12, 0, 0)) as clock:
+            checkpoints = create_autospec(CheckpointStore)
+            checkpoints.load.return_value = None
+            source = ModifiedSinceSource(
+                self.project.gid, debounce="1m", checkpoints=checkpoints
+            )
+            task = f.task(gid="1")
+            polls = iter([[task], []])
+
+            def poll(*args: Any, **kwargs: Any) -> List[Task]:
+                tasks = next(polls)
+                clock.tick(timedelta(minutes=1))
+                return tasks
+
+            self.client.tasks_by_project.side_effect = poll
+            self.assertIs(next(source.iterator(self.client)), task)
+            # The poll that found the task can't be checkpointed until it's processed
+            checkpoints.save.assert_not_called()
+            source.ack(task)
+            checkpoints.save.assert_called_once_with(
+                self.project.gid, datetime(2019, 1, 1, 12, 1, 0)
+            )
+
+    @patch("archie.sources.ModifiedSinceSource.POLLING_DELAY", timedelta())
+    def test_debounce(self) -> None:
+        with freeze_time(datetime(2019, 1, 1, 12, 0, 0, tzinfo=timezone.utc)) as clock:
+            source = ModifiedSinceSource(self.project.gid, debounce="2m")
+            edited = f.task(
+                gid="1", modified_at=datetime(2019, 1, 1, 11, 59, tzinfo=timezone.utc)
+            )
+            typing, still_typing = f.task(gid="2"), f.task(gid="2", name="Edited")
+            polls = iter([[edited, typing], [still_typing], [], []])
+
+            def poll(*args: Any, **kwargs: Any) -> List[Task]:
+                tasks = next(polls)
+                clock.tick(timedelta(minutes=1))
+                return tasks
+
+            self.client.tasks_by_project.side_effect = poll
+            iterator = source.iterator(self.client)
+            self.assertIs(next(iterator), edited)
+            self.assertEqual(
+                metrics.gauge("source.debounced_tasks", project=self.project.gid), 1
+            )
+            self.assertIs(next(iterator), still_typing)
+            self.assertEqual(self.client.tasks_by_project.call_count, 4)
+
+    def test_polling_delay(self) -> None:
+        self.assertEqual(
+            ModifiedSinceSource(self.project.gid, polling_delay="5m").polling_delay,
+            timedelta(minutes=5),
+        )
+        interval = AdaptiveInterval(timedelta(), timedelta())
+        source = ModifiedSinceSource(self.project.gid, polling_delay=interval)
+        task = f.task()
+        self.client.tasks_by_project.side_effect = [[], [task]]
+        self.assertIs(next(source.iterator(self.client)), task)
+        self.assertEqual(
+            metrics.gauge("polling.delay_seconds", project=self.project.gid), 0
+        )
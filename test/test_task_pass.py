@@ -0,0 +1,115 @@
+from test import fixtures as f
+from typing import List, Optional
+from unittest import TestCase
+from unittest.mock import Mock
+
+import attr
+from freezegun import freeze_time
+
+from archie._task_pass import (
+    TaskBudgetExceeded,
+    current_pass,
+    current_view,
+    defer_write,
+    flush_writes,
+    remaining_budget,
+    replace_view,
+    task_pass,
+    update_view,
+)
+from archie.asana.models import Task
+
+
+def _unchanged(view: Task) -> Task:
+    return view
+
+
+class TestTaskPass(TestCase):
+    def test_no_pass(self) -> None:
+        self.assertIsNone(current_pass(f.task()))
+
+    def test_pass(self) -> None:
+        task = f.task(gid="1")
+        with task_pass(task) as current:
+            self.assertEqual(current.task_gid, task.gid)
+            self.assertIs(current_pass(task), current)
+            self.assertIsNone(current_pass(f.task(gid="2")))
+        self.assertIsNone(current_pass(task))
+
+    def test_nested_passes(self) -> None:
+        outer_task, inner_task = f.task(gid="1"), f.task(gid="2")
+        with task_pass(outer_task) as outer:
+            with task_pass(inner_task) as inner:
+                self.assertIs(current_pass(inner_task), inner)
+            self.assertIs(current_pass(outer_task), outer)
+
+    def test_budget(self) -> None:
+        task = f.task(gid="1")
+        self.assertIsNone(remaining_budget())
+        with task_pass(task):
+            self.assertIsNone(remaining_budget())
+        with freeze_time() as frozen_time:
+            with task_pass(task, budget=10) as current:
+                self.assertEqual(remaining_budget(), 10)
+                frozen_time.tick(4)
+                self.assertEqual(remaining_budget(), 6)
+                frozen_time.tick(6)
+                with self.assertRaisesRegex(TaskBudgetExceeded, current.task_gid):
+                    remaining_budget()
+
+    def test_view(self) -> None:
+        task = f.task(gid="1")
+        renamed = attr.evolve(task, name="Renamed")
+        update_view(task, lambda _: renamed)
+        self.assertIs(current_view(task), task)
+        with task_pass(task):
+            self.assertIs(current_view(task), task)
+            update_view(task, lambda view: attr.evolve(view, name="Renamed"))
+            update_view(task, lambda view: attr.evolve(view, completed=True))
+            self.assertEqual(current_view(task), attr.evolve(renamed, completed=True))
+            self.assertEqual(current_view(f.task(gid="2")).gid, "2")
+
+    def test_deferred_writes(self) -> None:
+        task = f.task()
+        first, second, third = Mock(), Mock(), Mock()
+        self.assertFalse(defer_write(task, "external", first, _unchanged))
+        with task_pass(task):
+            self.assertTrue(defer_write(task, "external", first, _unchanged))
+            self.assertTrue(defer_write(task, "notes", second, _unchanged))
+            # A later write to the same field replaces the earlier one
+            self.assertTrue(defer_write(task, "external", third, _unchanged))
+            first.assert_not_called()
+            flush_writes(task)
+            second.assert_called_once_with()
+            third.assert_called_once_with()
+            defer_write(task, "external", first, _unchanged)
+        first.assert_called_once_with()
+        self.assertEqual(third.call_count, 1)
+
+    def test_deferred_view(self) -> None:
+        task = f.task(gid="1")
+        with task_pass(task):
+            defer_write(
+                task, "name", Mock(), lambda view: attr.evolve(view, name="Renamed")
+            )
+            self.assertEqual(current_view(task).name, "Renamed")
+            # A fresh copy of the task doesn't include the deferred write yet
+            replace_view(task, attr.evolve(task, completed=True))
+            self.assertEqual(
+                current_view(task), attr.evolve(task, name="Renamed", completed=True)
+            )
+        replace_view(task, f.task(gid="2"))
+        self.assertIs(current_view(task), task)
+
+    @freeze_time("2019-01-01", auto_tick_seconds=60)
+    def test_deferred_writes_on_error(self) -> None:
+        task = f.task()
+        remaining: List[Optional[float]] = []
+        write = Mock(side_effect=lambda: remaining.append(remaining_budget()))
+        with self.assertRaises(TaskBudgetExceeded):
+            with task_pass(task, budget=1):
+                defer_write(task, "external", write, _unchanged)
+                remaining_budget()
+        # Writes already treated as made are still sent, even past the deadline
+        write.assert_called_once_with()
+        self.assertListEqual(remaining, [None])
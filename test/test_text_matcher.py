@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from archie._text_matcher import TextMatcher
+
+
+class TestTextMatcher(TestCase):
+    def test_overlapping_patterns(self) -> None:
+        matcher = TextMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.matches("ushers"), {"he", "she", "hers"})
+        self.assertEqual(matcher.matches("this"), {"his"})
+        self.assertEqual(matcher.matches("nothing"), set())
+
+    def test_fallback_to_shorter_pattern(self) -> None:
+        matcher = TextMatcher(["abcd", "bcx", "c"])
+        self.assertEqual(matcher.matches("abcx"), {"bcx", "c"})
+
+    def test_matches_brute_force(self) -> None:
+        patterns = ["a", "ab", "bab", "bc", "bca", "c", "caa"]
+        matcher = TextMatcher(patterns)
+        for text in ["abccab", "bcaab", "cabcaab", ""]:
+            with self.subTest(text=text):
+                expected = {pattern for pattern in patterns if pattern in text}
+                self.assertEqual(matcher.matches(text), expected)
+
+    def test_empty_pattern(self) -> None:
+        matcher = TextMatcher(["", "a"])
+        self.assertEqual(matcher.matches(""), {""})
+        self.assertEqual(matcher.matches("a"), {"", "a"})
+
+    def test_no_patterns(self) -> None:
+        self.assertEqual(TextMatcher([]).matches("text"), set())
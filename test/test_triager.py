@@ -1,15 +1,31 @@
 import logging
+from datetime import datetime, timedelta, timezone
 from test import fixtures as f
-from typing import List
+from threading import Event
+from typing import Iterator, List, Set
 from unittest import TestCase
 from unittest.mock import Mock, call, create_autospec, patch
 
-from archie import Triager
+import attr
+from freezegun import freeze_time
+
+from archie import Triager, TriagerGroup
+from archie._task_pass import (
+    TaskBudgetExceeded,
+    defer_write,
+    remaining_budget,
+    update_view,
+)
 from archie.actions import Action
+from archie.asana._stories import stories_by_task
 from archie.asana.client import Client
 from archie.asana.models import Task
-from archie.predicates import Predicate
-from archie.sorters import Sorter
+from archie.dependencies import Dependencies
+from archie.ledger import SQLiteActionLedger
+from archie.metrics import metrics
+from archie.mirror import TaskMirror
+from archie.predicates import HasComment, HasDescription, Predicate
+from archie.sorters import LikeSorter, Sorter
 from archie.sources import TaskSource
 
 
@@ -72,6 +88,33 @@ class TestSorting(TestWithTriager):
             tasks[1], self.project, tasks[0], "before"
         )
 
+    def test_sort_section_with_mirror(self) -> None:
+        sorter = create_autospec(Sorter)
+        self.triager._mirror = mirror = create_autospec(TaskMirror)
+        mirror.sections.return_value = [self.section]
+        self.triager.order("Section 2", sorter)
+        membership = f.task_membership(section=self.section)
+        tasks = [
+            f.task(gid="1", memberships=[membership]),
+            f.task(gid="2"),
+            f.task(gid="3", memberships=[membership]),
+        ]
+        mirror.tasks.return_value = tasks
+        self.client.task_gids_by_project.return_value = order = ["3", "2", "1"]
+        sorter.sort.return_value = [tasks[2], tasks[0]]
+        self.triager.sort()
+        mirror.sync.assert_called_once_with(self.client, self.project)
+        mirror.tasks.assert_called_once_with(self.project, order)
+        sorter.sort.assert_called_once_with([tasks[0], tasks[2]])
+        self.client.tasks_by_section.assert_not_called()
+        self.client.sections_by_project.assert_not_called()
+
+    def test_empty_mirror_sections(self) -> None:
+        self.triager._mirror = mirror = create_autospec(TaskMirror)
+        mirror.sections.return_value = []
+        self.triager.order("Section 2", create_autospec(Sorter))
+        self.client.sections_by_project.assert_called_once_with(self.project)
+
     def test_missing_section(self) -> None:
         sorter = create_autospec(Sorter)
         logger = logging.getLogger("archie.triager")
@@ -97,11 +140,100 @@ class TestSorting(TestWithTriager):
         )
 
 
+class TestIncrementalSorting(TestWithTriager):
+    def setUp(self) -> None:
+        super().setUp()
+        self.section = f.section(gid="1", name="Section")
+        self.triager._mirror = self.mirror = create_autospec(TaskMirror)
+        self.mirror.sections.return_value = [self.section]
+        self.membership = f.task_membership(section=self.section)
+        self.tasks = [self.task(str(gid), gid * 10) for gid in range(1, 4)]
+        self.mirror.tasks.side_effect = lambda project, order=None: self.tasks
+        self.client.task_gids_by_project.return_value = ["1", "2", "3"]
+        self.mirror.sync.return_value = []
+
+    def task(self, gid: str, likes: int) -> Task:
+        return f.task(gid=gid, num_likes=likes, memberships=[self.membership])
+
+    def order(self, full_sort_every: timedelta = timedelta(hours=1)) -> None:
+        sorter = LikeSorter(ascending=True)
+        self.triager.order("Section", sorter, full_sort_every=full_sort_every)
+
+    def resort(self) -> None:
+        self.client.reset_mock()
+        self.triager.sort()
+
+    def test_requires_mirror(self) -> None:
+        self.triager._mirror = None
+        with self.assertRaises(ValueError):
+            self.order()
+
+    def test_changed_task(self) -> None:
+        before = metrics.counter(
+            "triager.sorts", project=self.project.gid, mode="incremental"
+        )
+        self.order()
+        self.triager.sort()
+        self.client.reorder_in_project.assert_not_called()
+        # The first task now has the most likes, and the new task the fewest. The sync
+        # doesn't report them, as if a source sharing the mirror had already synced it.
+        self.tasks = [self.task("1", 40), *self.tasks[1:], self.task("4", 0)]
+        self.resort()
+        self.client.task_gids_by_project.assert_not_called()
+        self.assertListEqual(
+            self.client.reorder_in_project.call_args_list,
+            [
+                call(self.tasks[3], self.project, self.tasks[1], "before"),
+                call(self.tasks[0], self.project, self.tasks[2], "after"),
+            ],
+        )
+        self.assertEqual(
+            metrics.counter(
+                "triager.sorts", project=self.project.gid, mode="incremental"
+            ),
+            before + 1,
+        )
+
+    def test_unchanged_key(self) -> None:
+        self.order()
+        self.triager.sort()
+        self.tasks[1] = attr.evolve(self.tasks[1], name="Renamed")
+        self.resort()
+        self.client.reorder_in_project.assert_not_called()
+
+    def test_only_task(self) -> None:
+        self.order()
+        self.tasks = []
+        self.triager.sort()
+        self.tasks = [self.task("1", 10)]
+        self.resort()
+        self.client.reorder_in_project.assert_not_called()
+
+    def test_full_sort_due(self) -> None:
+        self.order(timedelta())
+        self.triager.sort()
+        self.resort()
+        self.client.task_gids_by_project.assert_called_once_with(self.project)
+
+    def test_failed_move(self) -> None:
+        self.order()
+        self.triager.sort()
+        self.tasks = [*self.tasks[1:], self.task("1", 40)]
+        self.client.reorder_in_project.side_effect = Exception("Failed")
+        with self.assertLogs("archie._executor", logging.ERROR):
+            self.resort()
+        self.client.reorder_in_project.side_effect = None
+        # The section's order is unknown, so the whole section is sorted again
+        self.resort()
+        self.client.task_gids_by_project.assert_called_once_with(self.project)
+
+
 class TestTriaging(TestWithTriager):
     def setUp(self) -> None:
         super().setUp()
         self.task_source.iterator.return_value = (self.task,) = [f.task(gid="1")]
         self.predicate = create_autospec(Predicate, return_value=True)
+        self.predicate.next_change = Mock(return_value=None)
         self.action = create_autospec(Action)
 
     def sample_rule(self, task: Task) -> List[Action]:
@@ -114,8 +246,33 @@ class TestTriaging(TestWithTriager):
         self.predicate.assert_called_once_with(self.task, self.client)
         self.action.assert_called_once_with(self.task, self.client)
 
+    def test_shared_stories(self) -> None:
+        stories_predicate = Mock(
+            side_effect=lambda task, client: bool(stories_by_task(task, client))
+        )
+        stories_predicate.next_change.return_value = None
+        self.triager.when(stories_predicate)(self.sample_rule)
+        self.triager.when(stories_predicate)(self.sample_rule)
+        self.client.stories_by_task.return_value = [f.story()]
+
+        self.triager.triage()
+        self.client.stories_by_task.assert_called_once_with(self.task)
+        self.assertEqual(self.action.call_count, 2)
+
+    def test_wakeup(self) -> None:
+        ignore_predicate = create_autospec(Predicate, return_value=False)
+        earlier, later = datetime(2020, 1, 1), datetime(2020, 1, 2)
+        ignore_predicate.next_change = Mock(return_value=later)
+        self.predicate.next_change = Mock(return_value=earlier)
+        self.triager.ignore(ignore_predicate)
+        self.triager.when(self.predicate)(self.sample_rule)
+
+        self.triager.triage()
+        self.task_source.schedule_wakeup.assert_called_once_with(self.task, earlier)
+
     def test_ignore(self) -> None:
         ignore_predicate = create_autospec(Predicate, return_value=True)
+        ignore_predicate.next_change = Mock(return_value=None)
         self.triager.ignore(ignore_predicate)
         self.triager.when(self.predicate)(self.sample_rule)
 
@@ -125,6 +282,233 @@ class TestTriaging(TestWithTriager):
         self.action.assert_not_called()
 
 
+class TestCoalescing(TestWithTriager):
+    def setUp(self) -> None:
+        super().setUp()
+        self.versions = [f.task(gid="1", name=str(i)) for i in range(3)]
+        self.started, self.release = Event(), Event()
+        self.task_source.iterator.side_effect = self.iterator
+
+    def iterator(self, client: Client) -> Iterator[Task]:
+        first, *rest = self.versions
+        yield first
+        self.started.wait(5)
+        yield from rest
+        self.release.set()
+
+    def block_first(self, task: Task, client: Client) -> bool:
+        if task is self.versions[0]:
+            self.started.set()
+            self.release.wait(5)
+        return True
+
+    def test_coalesce(self) -> None:
+        predicate = Mock(side_effect=self.block_first)
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(lambda task: [])
+        self.triager.triage()
+        self.assertListEqual(
+            predicate.call_args_list,
+            [call(self.versions[0], self.client), call(self.versions[2], self.client)],
+        )
+        # The replaced follow-up is acknowledged as soon as it's superseded
+        self.assertListEqual(
+            self.task_source.ack.call_args_list,
+            [
+                call(self.versions[1]),
+                call(self.versions[0], failed=False),
+                call(self.versions[2], failed=False),
+            ],
+        )
+
+    def test_follow_up_after_failure(self) -> None:
+        def fail_first(task: Task, client: Client) -> None:
+            self.block_first(task, client)
+            if task is self.versions[0]:
+                raise Exception("Failed")
+
+        workflow = Mock(side_effect=fail_first)
+        workflow.next_change.return_value = None
+        with self.assertLogs("archie.triager", logging.ERROR):
+            self.triager.apply(workflow)
+        self.assertEqual(workflow.call_count, 2)
+        self.assertEqual(self.task_source.ack.call_count, 3)
+
+
+class TestTextMatching(TestWithTriager):
+    @patch("archie.triager.MIN_PATTERNS", 3)
+    def test_patterns_compiled(self) -> None:
+        self.task_source.iterator.return_value = [task] = [f.task(notes="Urgent: fix")]
+        self.client.stories_by_task.return_value = [
+            f.story(resource_subtype="comment_added", text="Still blocked")
+        ]
+        urgent, blocked = create_autospec(Action), create_autospec(Action)
+        self.triager.ignore(HasComment("wontfix"))
+        self.triager.when(HasDescription("Urgent"))(lambda task: [urgent])
+        self.triager.when(HasComment("unblocked"))(lambda task: [blocked])
+        self.triager.triage()
+        assert self.triager._text_matcher is not None
+        self.assertSetEqual(
+            set(self.triager._text_matcher.patterns), {"wontfix", "Urgent", "unblocked"}
+        )
+        urgent.assert_called_once_with(task, self.client)
+        blocked.assert_not_called()
+
+    def test_few_patterns(self) -> None:
+        self.task_source.iterator.return_value = []
+        self.triager.when(HasComment("unblocked"))(lambda task: [])
+        self.triager.when(HasDescription("Urgent"))(lambda task: [])
+        self.triager.triage()
+        self.assertIsNone(self.triager._text_matcher)
+
+
+class TestPriorities(TestWithTriager):
+    @patch("archie.triager.Client")
+    def setUp(self, client_mock: Mock) -> None:
+        super().setUp()
+        client_mock.return_value = self.client
+        self.priority = Mock(return_value=2)
+        self.triager = Triager("access_token", self.task_source, priority=self.priority)
+        self.action = create_autospec(Action)
+
+    def test_time_to_first_action(self) -> None:
+        self.task_source.iterator.return_value = [task] = [f.task(gid="1")]
+        predicate = Mock(return_value=True)
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(lambda task: [self.action, self.action])
+        self.triager.triage()
+        self.priority.assert_called_once_with(task)
+        self.assertEqual(self.action.call_count, 2)
+        snapshot = metrics.snapshot()
+        key = (
+            "triager.time_to_first_action_seconds_count"
+            f"{{band=2,project={self.project.gid}}}"
+        )
+        self.assertEqual(snapshot[key], 1)
+        self.assertDictEqual(self.triager._queued, {})
+
+    def test_failed_tasks_first(self) -> None:
+        task = f.task(gid="1")
+        predicate = Mock(side_effect=[Exception("Failed"), False, False])
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(lambda task: [])
+        for _ in range(3):
+            self.task_source.iterator.return_value = [task]
+            with self.assertLogs("archie.triager", logging.DEBUG):
+                self.triager.triage()
+        # The retry after the failure skips the priority, but the run after doesn't
+        self.assertEqual(self.priority.call_count, 2)
+
+
+class TestLedger(TestWithTriager):
+    @patch("archie.triager.Client")
+    def setUp(self, client_mock: Mock) -> None:
+        super().setUp()
+        client_mock.return_value = self.client
+        self.ledger = SQLiteActionLedger(":memory:")
+        self.triager = Triager("access_token", self.task_source, ledger=self.ledger)
+        self.task = f.task(gid="1")
+        self.predicate = Mock(return_value=True)
+        self.predicate.next_change.return_value = None
+        self.action = create_autospec(Action)
+
+    def tearDown(self) -> None:
+        self.ledger.close()
+
+    def triage(self) -> None:
+        self.task_source.iterator.return_value = [self.task]
+        self.triager.triage()
+
+    def rule(self, task: Task) -> List[Action]:
+        return [self.action]
+
+    def test_once(self) -> None:
+        before = metrics.counter("triager.actions_suppressed", project=self.project.gid)
+        self.triager.when(self.predicate, once=True)(self.rule)
+        with freeze_time("2019-01-01"):
+            self.triage()
+        with freeze_time("2020-01-01"):
+            self.triage()
+        self.action.assert_called_once_with(self.task, self.client)
+        after = metrics.counter("triager.actions_suppressed", project=self.project.gid)
+        self.assertEqual(after, before + 1)
+        rule = f"{__name__}.TestLedger.rule"
+        self.assertEqual(
+            self.ledger.last_applied("1", rule, str(self.action)),
+            datetime(2019, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def test_every(self) -> None:
+        self.triager.when(self.predicate, every="1h", name="rule")(
+            lambda _: [self.action]
+        )
+        for now in ["2019-01-01 12:00", "2019-01-01 12:59", "2019-01-01 13:00"]:
+            with freeze_time(now):
+                self.triage()
+        self.assertEqual(self.action.call_count, 2)
+
+    def test_unlimited(self) -> None:
+        self.triager.when(self.predicate)(self.rule)
+        self.triage()
+        self.triage()
+        self.assertEqual(self.action.call_count, 2)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            self.triager.when(self.predicate, once=True, every="1h")
+        triager = Triager("access_token", self.task_source, client=self.client)
+        with self.assertRaises(ValueError):
+            triager.when(self.predicate, once=True)
+
+
+class TestTaskBudget(TestWithTriager):
+    @patch("archie.triager.Client")
+    def setUp(self, client_mock: Mock) -> None:
+        super().setUp()
+        client_mock.return_value = self.client
+        self.triager = Triager(
+            "access_token", self.task_source, task_budget=timedelta(seconds=10)
+        )
+        self.task_source.iterator.return_value = [self.task] = [f.task(gid="1")]
+        self.action = create_autospec(Action)
+
+    def test_budget(self) -> None:
+        remaining: List[float] = []
+        predicate = Mock(
+            side_effect=lambda *_: remaining.append(remaining_budget() or 0)
+        )
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(Mock(return_value=[self.action]))
+        self.triager.triage()
+        self.assertEqual(len(remaining), 1)
+        self.assertTrue(0 < remaining[0] <= 10)
+        self.assertIsNone(remaining_budget())
+
+    def test_budget_exceeded(self) -> None:
+        before = metrics.counter("triager.budget_exceeded", project=self.project.gid)
+        predicate = Mock(side_effect=TaskBudgetExceeded())
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(Mock(return_value=[self.action]))
+        with self.assertLogs("archie.triager", logging.WARNING):
+            self.triager.triage()
+        self.action.assert_not_called()
+        self.task_source.ack.assert_called_once_with(self.task, failed=True)
+        self.assertSetEqual(self.triager._failed, {self.task.gid})
+        self.assertEqual(
+            metrics.counter("triager.budget_exceeded", project=self.project.gid),
+            before + 1,
+        )
+
+    def test_workflow_budget(self) -> None:
+        remaining: List[float] = []
+        workflow = Mock(
+            side_effect=lambda *_: remaining.append(remaining_budget() or 0)
+        )
+        workflow.next_change.return_value = None
+        self.triager.apply(workflow)
+        self.assertTrue(0 < remaining[0] <= 10)
+
+
 class TestWorkflow(TestWithTriager):
     def test_workflow(self) -> None:
         self.task_source.iterator.return_value = task1, task2 = [
@@ -132,7 +516,283 @@ class TestWorkflow(TestWithTriager):
             f.task(gid="2"),
         ]
         workflow = Mock()
+        workflow.next_change.return_value = None
         self.triager.apply(workflow)
         workflow.assert_has_calls(
             [call(task1, self.client), call(task2, self.client)], any_order=True
         )
+
+    def test_workflow_wakeup(self) -> None:
+        self.task_source.iterator.return_value = [task] = [f.task(gid="1")]
+        workflow = Mock()
+        workflow.next_change.return_value = at = datetime(2020, 1, 1)
+        self.triager.apply(workflow)
+        self.task_source.schedule_wakeup.assert_called_once_with(task, at)
+
+    def test_workflows(self) -> None:
+        self.task_source.iterator.return_value = [task] = [f.task(gid="1")]
+        completed = f.task(gid="1", completed=True)
+        first = Mock(
+            side_effect=lambda task, client: update_view(task, lambda _: completed)
+        )
+        first.next_change.return_value = datetime(2020, 1, 2)
+        second = Mock(side_effect=lambda task, client: stories_by_task(task, client))
+        second.next_change.return_value = at = datetime(2020, 1, 1)
+        self.triager.apply(first, second)
+        self.task_source.iterator.assert_called_once_with(self.client)
+        first.assert_called_once_with(task, self.client)
+        second.assert_called_once_with(task, self.client)
+        # Both workflows see the writes made by either of them
+        first.next_change.assert_called_once_with(completed, self.client)
+        second.next_change.assert_called_once_with(completed, self.client)
+        self.task_source.schedule_wakeup.assert_called_once_with(task, at)
+
+    def test_run(self) -> None:
+        self.task_source.iterator.return_value = [task] = [f.task(gid="1")]
+        self.client.sections_by_project.return_value = [f.section(name="Section")]
+        self.client.tasks_by_section.return_value = []
+        sorter = create_autospec(Sorter)
+        sorter.sort.return_value = []
+        self.triager.order("Section", sorter)
+        action = create_autospec(Action)
+        predicate = Mock(return_value=True)
+        predicate.next_change.return_value = None
+        self.triager.when(predicate)(lambda task: [action])
+        workflow = Mock(side_effect=lambda task, client: action.assert_called_once())
+        workflow.next_change.return_value = at = datetime(2020, 1, 1)
+        self.triager.run(workflow)
+        self.task_source.iterator.assert_called_once_with(self.client)
+        workflow.assert_called_once_with(task, self.client)
+        sorter.sort.assert_called_once_with([])
+        self.task_source.schedule_wakeup.assert_called_once_with(task, at)
+
+
+class TestChangeTracking(TestWithTriager):
+    @patch("archie.triager.Client")
+    def setUp(self, client_mock: Mock) -> None:
+        super().setUp()
+        client_mock.return_value = self.client
+        self.triager = Triager("access_token", self.task_source, track_changes=True)
+        self.task = f.task(gid="1")
+        self.predicate = self.mock_predicate({"assignee"}, True)
+        self.action = create_autospec(Action)
+        self.action.dependencies.return_value = Dependencies()
+        self.triager.when(self.predicate)(lambda task: [self.action])
+
+    @staticmethod
+    def mock_predicate(fields: Set[str], result: bool) -> Mock:
+        predicate = Mock(return_value=result)
+        predicate.next_change.return_value = None
+        predicate.dependencies.return_value = Dependencies(fields=fields)
+        return predicate
+
+    def triage(self, *tasks: Task) -> None:
+        for task in tasks:
+            self.task_source.iterator.return_value = [task]
+            self.triager.triage()
+
+    def test_unchanged(self) -> None:
+        self.triage(self.task, self.task)
+        self.predicate.assert_called_once_with(self.task, self.client)
+        self.action.assert_called_once_with(self.task, self.client)
+
+    def test_changed(self) -> None:
+        self.triage(self.task, f.task(gid="1", assignee=f.user()))
+        self.assertEqual(self.predicate.call_count, 2)
+
+    def test_later_actions_see_writes(self) -> None:
+        assigned = f.task(gid="1", assignee=f.user())
+        self.action.side_effect = lambda task, client: update_view(
+            task, lambda _: assigned
+        )
+        self.triager.when(self.predicate)(lambda task: [self.action])
+        self.triage(self.task)
+        self.action.assert_has_calls(
+            [call(self.task, self.client), call(assigned, self.client)]
+        )
+
+    def test_unmatched(self) -> None:
+        self.predicate.return_value = False
+        self.triage(self.task)
+        self.action.assert_not_called()
+
+    def test_unrelated_change(self) -> None:
+        self.triage(self.task, f.task(gid="1", notes="Changed"))
+        self.predicate.assert_called_once()
+
+    def test_action_dependencies(self) -> None:
+        self.action.dependencies.return_value = Dependencies(fields={"notes"})
+        self.triage(self.task, f.task(gid="1", notes="Changed"))
+        self.assertEqual(self.predicate.call_count, 2)
+
+    def test_ignored_predicate_changed(self) -> None:
+        ignore_predicate = self.mock_predicate({"completed"}, False)
+        self.triager.ignore(ignore_predicate)
+        self.triage(self.task, f.task(gid="1", completed=True))
+        self.assertEqual(ignore_predicate.call_count, 2)
+        self.assertEqual(self.predicate.call_count, 2)
+
+    def test_ignored(self) -> None:
+        ignore_predicate = self.mock_predicate({"completed"}, True)
+        self.triager.ignore(ignore_predicate)
+        self.triage(self.task, f.task(gid="1", assignee=f.user()))
+        self.assertEqual(ignore_predicate.call_count, 2)
+        self.predicate.assert_not_called()
+
+    def test_failure_not_recorded(self) -> None:
+        self.action.side_effect = [Exception("Failed"), None]
+        with self.assertLogs("archie.triager", logging.ERROR):
+            self.triage(self.task)
+        self.triage(self.task)
+        self.assertEqual(self.action.call_count, 2)
+
+    def test_own_writes(self) -> None:
+        assigned = f.task(gid="1", assignee=f.user())
+        self.action.side_effect = lambda task, client: update_view(
+            task, lambda _: assigned
+        )
+        self.triage(self.task, assigned)
+        # The triager's own write isn't a change the next time the task is seen
+        self.predicate.assert_called_once_with(self.task, self.client)
+        self.predicate.next_change.assert_called_once_with(assigned, self.client)
+
+    def test_workflow_writes(self) -> None:
+        completed = f.task(gid="1", completed=True)
+        workflow = Mock(
+            side_effect=lambda task, client: update_view(task, lambda _: completed)
+        )
+        workflow.next_change.return_value = None
+        workflow.dependencies.return_value = Dependencies(fields={"completed"})
+        for task in [self.task, completed]:
+            self.task_source.iterator.return_value = [task]
+            self.triager.apply(workflow)
+        workflow.assert_called_once_with(self.task, self.client)
+        workflow.next_change.assert_called_once_with(completed, self.client)
+
+    def test_failed_deferred_write(self) -> None:
+        write = Mock(side_effect=Exception("Failed"))
+        workflow = Mock(
+            side_effect=lambda task, client: defer_write(
+                task, "external", write, lambda view: view
+            )
+        )
+        workflow.next_change.return_value = None
+        workflow.dependencies.return_value = Dependencies(fields={"completed"})
+        self.task_source.iterator.return_value = [self.task]
+        with self.assertLogs("archie.triager", logging.ERROR):
+            self.triager.apply(workflow)
+            self.triager.apply(workflow)
+        # The task isn't recorded as processed until its writes have been made
+        self.assertEqual(workflow.call_count, 2)
+
+    def test_workflow_sees_rule_writes(self) -> None:
+        completed = f.task(gid="1", completed=True)
+        self.action.side_effect = lambda task, client: update_view(
+            task, lambda _: completed
+        )
+        workflow = Mock()
+        workflow.next_change.return_value = None
+        workflow.dependencies.return_value = Dependencies(fields={"completed"})
+        self.task_source.iterator.return_value = [self.task]
+        self.triager.apply(workflow)
+        self.triager.run(workflow)
+        # The rule completing the task is a change for the workflow
+        self.assertEqual(workflow.call_count, 2)
+
+    def test_workflow(self) -> None:
+        workflow = Mock()
+        workflow.next_change.return_value = None
+        workflow.dependencies.return_value = Dependencies(fields={"completed"})
+        for task in [self.task, self.task, f.task(gid="1", completed=True)]:
+            self.task_source.iterator.return_value = [task]
+            self.triager.apply(workflow)
+        self.assertEqual(workflow.call_count, 2)
+        self.assertEqual(self.task_source.ack.call_count, 3)
+
+
+class TestTriagerGroup(TestCase):
+    @patch("archie.triager.Client")
+    def setUp(self, client_mock: Mock) -> None:
+        self.client = client_mock.return_value = create_autospec(Client)
+        self.client_mock = client_mock
+        self.group = TriagerGroup("access_token", requests_per_minute=600)
+        self.sources = [create_autospec(TaskSource) for _ in range(2)]
+        self.projects = [f.project(gid="1"), f.project(gid="2")]
+        self.client.project_by_gid.side_effect = self.projects
+        for source, project in zip(self.sources, self.projects):
+            source.project_gid = project.gid
+        self.triagers = [self.group.add(source) for source in self.sources]
+
+    @patch("archie.triager.Client")
+    def test_ledger(self, client_mock: Mock) -> None:
+        client_mock.return_value = self.client
+        self.client.project_by_gid.side_effect = [self.projects[0]]
+        ledger = SQLiteActionLedger(":memory:")
+        group = TriagerGroup("access_token", ledger=ledger)
+        self.assertIs(group.add(self.sources[0])._ledger, ledger)
+        ledger.close()
+
+    def test_task_budget(self) -> None:
+        self.client.project_by_gid.side_effect = [self.projects[0]]
+        triager = self.group.add(self.sources[0], task_budget=timedelta(seconds=30))
+        self.assertEqual(triager._task_budget, 30)
+
+    def test_shared_client(self) -> None:
+        self.client_mock.assert_called_once_with(
+            "access_token", story_store=None, requests_per_minute=600
+        )
+        self.assertListEqual(self.group.triagers, self.triagers)
+        for triager, project in zip(self.triagers, self.projects):
+            self.assertIs(triager._client, self.client)
+            self.assertEqual(triager.project, project)
+            self.assertIs(triager._fair_executor, self.group._executor)
+
+    def test_triage(self) -> None:
+        tasks = [f.task(gid="1"), f.task(gid="2")]
+        predicate = Mock(return_value=True)
+        predicate.next_change.return_value = None
+        actions = []
+        for source, task, triager in zip(self.sources, tasks, self.triagers):
+            source.iterator.return_value = [task]
+            action = create_autospec(Action)
+            triager.when(predicate)(Mock(return_value=[action]))
+            actions.append(action)
+        self.group.triage()
+        for action, task in zip(actions, tasks):
+            action.assert_called_once_with(task, self.client)
+
+    def test_sort(self) -> None:
+        self.client.sections_by_project.return_value = [f.section(name="Section")]
+        self.client.tasks_by_section.return_value = []
+        sorter = create_autospec(Sorter)
+        sorter.sort.return_value = []
+        for triager in self.triagers:
+            triager.order("Section", sorter)
+        self.group.sort()
+        self.assertEqual(sorter.sort.call_count, 2)
+
+    def test_apply(self) -> None:
+        tasks = [f.task(gid="1"), f.task(gid="2")]
+        workflow = Mock()
+        workflow.next_change.return_value = None
+        for source, task in zip(self.sources, tasks):
+            source.iterator.return_value = [task]
+        self.group.apply(workflow)
+        self.assertCountEqual(
+            workflow.call_args_list, [call(task, self.client) for task in tasks]
+        )
+
+    def test_run(self) -> None:
+        tasks = [f.task(gid="1"), f.task(gid="2")]
+        workflow = Mock()
+        workflow.next_change.return_value = None
+        for source, task in zip(self.sources, tasks):
+            source.iterator.return_value = [task]
+        self.group.run(workflow)
+        self.assertCountEqual(
+            workflow.call_args_list, [call(task, self.client) for task in tasks]
+        )
+
+    @patch("archie.triager.Client")
+    def test_empty(self, client_mock: Mock) -> None:
+        TriagerGroup("access_token").triage()
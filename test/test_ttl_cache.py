@@ -0,0 +1,34 @@
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from archie._ttl_cache import TTLCache
+
+
+class TestTTLCache(TestCase):
+    def setUp(self) -> None:
+        self.cache: TTLCache[str, int] = TTLCache(timedelta(minutes=1))
+        self.load = Mock(side_effect=[1, 2])
+
+    @patch("archie._ttl_cache.monotonic")
+    def test_fresh(self, monotonic: Mock) -> None:
+        monotonic.side_effect = [0.0, 59.0]
+        self.assertEqual(self.cache.get("key", self.load), 1)
+        self.assertEqual(self.cache.get("key", self.load), 1)
+        self.load.assert_called_once_with()
+
+    @patch("archie._ttl_cache.monotonic")
+    def test_expired(self, monotonic: Mock) -> None:
+        monotonic.side_effect = [0.0, 60.0]
+        self.assertEqual(self.cache.get("key", self.load), 1)
+        self.assertEqual(self.cache.get("key", self.load), 2)
+
+    def test_keys(self) -> None:
+        self.assertEqual(self.cache.get("first", self.load), 1)
+        self.assertEqual(self.cache.get("second", self.load), 2)
+
+    def test_invalidate(self) -> None:
+        self.assertEqual(self.cache.get("key", self.load), 1)
+        self.cache.invalidate("key")
+        self.cache.invalidate("missing")
+        self.assertEqual(self.cache.get("key", self.load), 2)
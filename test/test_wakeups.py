@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+from threading import Timer
+from unittest import TestCase
+
+from archie._wakeups import WakeupScheduler
+
+
+def _in(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+class TestWakeupScheduler(TestCase):
+    def setUp(self) -> None:
+        self.scheduler = WakeupScheduler()
+
+    def test_due(self) -> None:
+        self.scheduler.schedule("1", _in(-2))
+        self.scheduler.schedule("2", _in(-1))
+        self.scheduler.schedule("3", _in(60))
+        self.assertListEqual(self.scheduler.wait(0), ["1", "2"])
+        self.assertEqual(len(self.scheduler), 1)
+
+    def test_timeout(self) -> None:
+        self.scheduler.schedule("1", _in(60))
+        self.assertListEqual(self.scheduler.wait(0.01), [])
+
+    def test_earlier_replaces_later(self) -> None:
+        self.scheduler.schedule("1", _in(60))
+        self.scheduler.schedule("1", _in(-1))
+        self.scheduler.schedule("1", _in(120))
+        self.assertListEqual(self.scheduler.wait(0), ["1"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_comes_due_while_waiting(self) -> None:
+        self.scheduler.schedule("1", _in(0.05))
+        self.assertListEqual(self.scheduler.wait(5), ["1"])
+
+    def test_scheduled_while_waiting(self) -> None:
+        timer = Timer(0.05, self.scheduler.schedule, ["1", _in(-1)])
+        timer.start()
+        self.assertListEqual(self.scheduler.wait(5), ["1"])
+        timer.join()
+
+    def test_take_due(self) -> None:
+        self.scheduler.schedule("1", _in(-1))
+        self.scheduler.schedule("2", _in(60))
+        self.assertTrue(self.scheduler.take_due("1"))
+        self.assertFalse(self.scheduler.take_due("1"))
+        self.assertFalse(self.scheduler.take_due("2"))
+        self.assertListEqual(self.scheduler.wait(0), [])
@@ -5,6 +5,7 @@ from unittest.mock import create_autospec
 
 from archie.asana.client import Client
 from archie.asana.models import CustomField
+from archie.dependencies import Dependencies
 from archie.predicates import Predicate
 from archie.workflows import EnumCustomFieldWorkflow, WorkflowStage
 from archie.workflows.enum import (
@@ -19,6 +20,7 @@ predicate_b = create_autospec(Predicate)
 stages = [WorkflowStage("A", predicate_a), WorkflowStage("B", predicate_b)]
 enum_options = [f.enum_option(name="A"), f.enum_option(name="B")]
 custom_field = f.custom_field(name="Custom Field", enum_options=enum_options)
+options_by_name = {"A": enum_options[0], "B": enum_options[1]}
 
 
 class TestEnumCustomFieldWorkflow(TestCase):
@@ -60,7 +62,7 @@ class TestEnumCustomFieldWorkflow(TestCase):
         task = f.task(custom_fields=[custom_field])
         stage, context = self.manager.get_current_stage(task)
         expected_context = _EnumCustomFieldWorkflowGetStageContext(
-            custom_field, enum_options
+            custom_field, options_by_name
         )
         self.assertIsNone(stage)
         self.assertEqual(expected_context, context)
@@ -72,21 +74,36 @@ class TestEnumCustomFieldWorkflow(TestCase):
         task = f.task(custom_fields=[set_custom_field])
         stage, context = self.manager.get_current_stage(task)
         expected_context = _EnumCustomFieldWorkflowGetStageContext(
-            set_custom_field, enum_options
+            set_custom_field, options_by_name
         )
         self.assertIs(stage, stages[0])
         self.assertEqual(expected_context, context)
 
+    def test_options_from_task(self) -> None:
+        option = f.enum_option(name="C")
+        renamed = f.custom_field(
+            gid=custom_field.gid, name="Custom Field", enum_options=[option]
+        )
+        self.manager.get_current_stage(f.task(custom_fields=[custom_field]))
+        # The options are always those of the task just read, never earlier ones
+        expected_context = _EnumCustomFieldWorkflowGetStageContext(
+            renamed, {"C": option}
+        )
+        self.assertEqual(
+            self.manager.get_current_stage(f.task(custom_fields=[renamed])),
+            (None, expected_context),
+        )
+
     def test_can_set_stage_missing_enum_option(self) -> None:
         client = create_autospec(Client)
-        get_context = _EnumCustomFieldWorkflowGetStageContext(custom_field, [])
+        get_context = _EnumCustomFieldWorkflowGetStageContext(custom_field, {})
         warning = self.manager.can_set_stage(stages[0], client, get_context)
         self.assertEqual("Unable to find enum option 'A'", warning)
 
     def test_can_set_stage_matching_enum_option(self) -> None:
         client = create_autospec(Client)
         get_context = _EnumCustomFieldWorkflowGetStageContext(
-            custom_field, enum_options
+            custom_field, options_by_name
         )
         set_context = self.manager.can_set_stage(stages[0], client, get_context)
         expected_context = _EnumCustomFieldWorkflowSetStageContext(
@@ -103,8 +120,21 @@ class TestEnumCustomFieldWorkflow(TestCase):
             task, custom_field, enum_options[0]
         )
 
+    def test_set_stage_unchanged(self) -> None:
+        field = f.custom_field(enum_options=enum_options, enum_value=enum_options[0])
+        task = f.task(custom_fields=[field])
+        client = create_autospec(Client)
+        context = _EnumCustomFieldWorkflowSetStageContext(field, enum_options[0])
+        self.manager.set_stage(task, client, context)
+        client.set_enum_custom_field.assert_not_called()
+
     def test_correct_manager(self) -> None:
         workflow = EnumCustomFieldWorkflow("name", [])
         self.assertIsInstance(
             workflow._stage_manager, _EnumCustomFieldWorkflowStageManager
         )
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(
+            self.manager.dependencies(), Dependencies(fields={"custom_fields"})
+        )
@@ -3,9 +3,13 @@ from typing import Mapping
 from unittest import TestCase
 from unittest.mock import create_autospec
 
+import attr
+
+from archie._task_pass import task_pass, update_view
 from archie.asana.client import Client
 from archie.asana.models import External
-from archie.predicates import Predicate
+from archie.dependencies import Dependencies
+from archie.predicates import AlwaysTrue, Predicate
 from archie.workflows import WorkflowStage
 from archie.workflows.external import (
     ExternalDataWorkflow,
@@ -76,24 +80,20 @@ class TestExternalDataWorkflow(TestCase):
         client = create_autospec(Client)
         get_context = _ExternalDataWorkflowGetStageContext(external, workflow_data)
         set_context = self.manager.can_set_stage(stages[0], client, get_context)
-        expected_context = _ExternalDataWorkflowSetStageContext(
-            external, workflow_data, "A"
-        )
+        expected_context = _ExternalDataWorkflowSetStageContext("A")
         self.assertEqual(expected_context, set_context)
 
     def expect_set(self, original_workflow_data: Mapping[str, str]) -> None:
         external = f.external(data={"workflows": original_workflow_data})
         task = f.task(external=external)
         client = create_autospec(Client)
-        context = _ExternalDataWorkflowSetStageContext(
-            external, original_workflow_data, "new stage name"
-        )
+        context = _ExternalDataWorkflowSetStageContext("new stage name")
         client.set_external.return_value = None
         self.manager.set_stage(task, client, context)
         client.set_external.assert_called_once_with(
             task,
             External(
-                context.external.gid,
+                external.gid,
                 {
                     "workflows": {
                         "External workflow": "new stage name",
@@ -114,8 +114,48 @@ class TestExternalDataWorkflow(TestCase):
         }
         self.expect_set(original_workflow_data)
 
+    def test_set_stage_unchanged(self) -> None:
+        workflows = {"External workflow": "A"}
+        external = f.external(data={"workflows": workflows})
+        task = f.task(external=external)
+        client = create_autospec(Client)
+        context = _ExternalDataWorkflowSetStageContext("A")
+        self.manager.set_stage(task, client, context)
+        client.set_external.assert_not_called()
+
+    def test_set_stage_without_external(self) -> None:
+        task = f.task(external=None)
+        client = create_autospec(Client)
+        context = _ExternalDataWorkflowSetStageContext("A")
+        self.manager.set_stage(task, client, context)
+        client.set_external.assert_called_once_with(
+            task, External(None, {"workflows": {"External workflow": "A"}})
+        )
+
+    def test_workflows_in_pass(self) -> None:
+        task = f.task(external=None)
+        client = create_autospec(Client)
+        client.set_external.side_effect = lambda task, external: update_view(
+            task, lambda view: attr.evolve(view, external=external)
+        )
+        workflows = [
+            ExternalDataWorkflow(name, [WorkflowStage("A", AlwaysTrue())])
+            for name in ["First", "Second"]
+        ]
+        with task_pass(task):
+            for workflow in workflows:
+                workflow(task, client)
+        # The second workflow keeps the stage recorded by the first
+        _, external = client.set_external.call_args[0]
+        self.assertEqual(
+            external, External(None, {"workflows": {"First": "A", "Second": "A"}})
+        )
+
     def test_correct_manager(self) -> None:
         workflow = ExternalDataWorkflow("name", [])
         self.assertIsInstance(
             workflow._stage_manager, _ExternalDataWorkflowStageManager
         )
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(self.manager.dependencies(), Dependencies(fields={"external"}))
@@ -3,6 +3,7 @@ from unittest import TestCase
 from unittest.mock import create_autospec
 
 from archie.asana.client import Client
+from archie.dependencies import Dependencies
 from archie.predicates import Predicate
 from archie.workflows import SectionWorkflow, WorkflowStage
 from archie.workflows.section import (
@@ -52,9 +53,23 @@ class TestSectionWorkflow(TestCase):
         warning = self.manager.can_set_stage(
             WorkflowStage("B", predicate), client, get_context
         )
-        client.sections_by_project.assert_called_once_with(project)
+        # The sections are fetched again in case the section was just added
+        self.assertEqual(client.sections_by_project.call_count, 2)
         self.assertEqual("Unable to find section 'B' in 'Project'", warning)
 
+    def test_can_set_stage_added_section(self) -> None:
+        client = create_autospec(Client)
+        get_context = _SectionWorkflowGetStageContext(project)
+        client.sections_by_project.return_value = sections
+        self.manager.can_set_stage(stages[0], client, get_context)
+        added = f.section(gid="2", name="B")
+        client.sections_by_project.return_value = [*sections, added]
+        set_context = self.manager.can_set_stage(
+            WorkflowStage("B", predicate), client, get_context
+        )
+        self.assertEqual(_SectionWorkflowSetStageContext(added), set_context)
+        self.assertEqual(client.sections_by_project.call_count, 2)
+
     def test_can_set_stage_matching_section(self) -> None:
         client = create_autospec(Client)
         get_context = _SectionWorkflowGetStageContext(project)
@@ -66,6 +81,14 @@ class TestSectionWorkflow(TestCase):
         client.sections_by_project.assert_called_once_with(project)
         self.assertEqual(expected_context, set_context)
 
+    def test_sections_cached(self) -> None:
+        client = create_autospec(Client)
+        get_context = _SectionWorkflowGetStageContext(project)
+        client.sections_by_project.return_value = sections
+        for _ in range(2):
+            self.manager.can_set_stage(stages[0], client, get_context)
+        client.sections_by_project.assert_called_once_with(project)
+
     def test_set_stage(self) -> None:
         task = f.task()
         client = create_autospec(Client)
@@ -74,6 +97,18 @@ class TestSectionWorkflow(TestCase):
         self.manager.set_stage(task, client, context)
         client.add_to_section.assert_called_once_with(task, sections[0])
 
+    def test_set_stage_unchanged(self) -> None:
+        task = f.task(memberships=[f.task_membership(project, sections[0])])
+        client = create_autospec(Client)
+        context = _SectionWorkflowSetStageContext(sections[0])
+        self.manager.set_stage(task, client, context)
+        client.add_to_section.assert_not_called()
+
     def test_correct_manager(self) -> None:
         workflow = SectionWorkflow("name", [])
         self.assertIsInstance(workflow._stage_manager, _SectionWorkflowStageManager)
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(
+            self.manager.dependencies(), Dependencies(fields={"memberships"})
+        )
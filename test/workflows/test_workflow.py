@@ -1,13 +1,18 @@
 import logging
+from datetime import datetime
 from test import fixtures as f
 from typing import List, Tuple
 from unittest import TestCase
-from unittest.mock import Mock, create_autospec
+from unittest.mock import Mock, call, create_autospec
 
-from archie.actions import Action
+import attr
+
+from archie._task_pass import task_pass, update_view
+from archie.actions import Action, AddComment, SetEnumCustomField
 from archie.asana.client import Client
-from archie.predicates import Predicate
-from archie.workflows import Workflow, WorkflowStage
+from archie.dependencies import EVERYTHING, Dependencies
+from archie.predicates import AlwaysTrue, Assigned, IsComplete, Predicate
+from archie.workflows import ExternalDataWorkflow, Workflow, WorkflowStage
 from archie.workflows.workflow import (
     WorkflowGetStageContext,
     WorkflowSetStageContext,
@@ -113,3 +118,94 @@ class TestWorkflow(TestCase):
 
     def test_advance_multiple(self) -> None:
         self.expect_set_stage((True, True), self.stages[1], self.actions)
+
+    def test_equal_stage(self) -> None:
+        copy = attr.evolve(self.stages[0])
+        self.manager.get_current_stage.return_value = copy, get_context
+        self.manager.can_set_stage.return_value = set_context
+        self.set_predicates(True, True)
+        self.workflow(task, client)
+        self.manager.can_set_stage.assert_called_once_with(
+            self.stages[1], client, get_context
+        )
+
+    def test_writes_in_pass(self) -> None:
+        renamed = attr.evolve(task, name="Renamed")
+        self.actions[0].side_effect = lambda task, client: update_view(
+            task, lambda _: renamed
+        )
+        self.manager.get_current_stage.return_value = None, get_context
+        self.manager.can_set_stage.return_value = set_context
+        self.set_predicates(True, True)
+        with task_pass(task):
+            self.workflow(task, client)
+        self.actions[0].assert_called_once_with(task, client)
+        self.actions[1].assert_called_once_with(renamed, client)
+        self.manager.set_stage.assert_has_calls([call(renamed, client, set_context)])
+
+
+class TestWorkflowsInPass(TestCase):
+    def test_later_workflow_sees_writes(self) -> None:
+        completed = attr.evolve(task, completed=True)
+        complete = create_autospec(Action)
+        complete.side_effect = lambda task, client: update_view(
+            task, lambda _: completed
+        )
+        first: Workflow = ExternalDataWorkflow(
+            "First", [WorkflowStage("Started", AlwaysTrue(), [complete])]
+        )
+        later = create_autospec(Predicate)
+        later.next_change.return_value = None
+        second: Workflow = ExternalDataWorkflow(
+            "Second",
+            [WorkflowStage("Done", IsComplete()), WorkflowStage("Later", later)],
+        )
+        client = create_autospec(Client)
+        later.return_value = False
+        with task_pass(task):
+            first(task, client)
+            second(task, client)
+            second.next_change(task, client)
+        # The second workflow's predicates see the task completed by the first
+        self.assertEqual(client.set_external.call_count, 2)
+        _, external = client.set_external.call_args[0]
+        self.assertEqual(external.data, {"workflows": {"Second": "Done"}})
+        later.assert_called_once_with(completed, client)
+        later.next_change.assert_called_once_with(completed, client)
+
+
+class TestDependencies(TestCase):
+    def setUp(self) -> None:
+        self.stages = [
+            WorkflowStage("A", Assigned(), [AddComment("Assigned")]),
+            WorkflowStage("B", IsComplete(), [SetEnumCustomField("Field", "B")]),
+        ]
+
+    def test_stage(self) -> None:
+        self.assertEqual(
+            self.stages[1].dependencies(),
+            Dependencies(fields={"completed", "custom_fields"}),
+        )
+
+    def test_workflow(self) -> None:
+        manager = create_autospec(WorkflowStageManager)
+        manager.dependencies.return_value = Dependencies(fields={"external"})
+        workflow: Workflow = Workflow("Workflow", self.stages, manager)
+        self.assertEqual(
+            workflow.dependencies(),
+            Dependencies(fields={"assignee", "completed", "custom_fields", "external"}),
+        )
+
+    def test_next_change(self) -> None:
+        first, second = datetime(2020, 1, 1), datetime(2020, 1, 2)
+        predicates = [create_autospec(Predicate) for _ in range(3)]
+        for predicate, change in zip(predicates, [second, None, first]):
+            predicate.next_change = Mock(return_value=change)
+        stages = [WorkflowStage(str(i), p) for i, p in enumerate(predicates)]
+        manager = create_autospec(WorkflowStageManager)
+        workflow: Workflow = Workflow("Workflow", stages, manager)
+        self.assertEqual(workflow.next_change(task, client), first)
+
+    def test_undeclared_manager(self) -> None:
+        manager = create_autospec(WorkflowStageManager)
+        self.assertEqual(WorkflowStageManager.dependencies(manager), EVERYTHING)